@@ -0,0 +1,44 @@
+"""added metrics freshness
+
+Revision ID: 23
+Revises: 22
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '23'
+down_revision: Union[str, None] = '22'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+METRIC_TABLES = (
+    'basic_metrics',
+    'investing_metrics',
+    'social_metrics',
+    'tokenomics',
+    'funds_profit',
+    'top_and_bottom',
+    'market_metrics',
+    'manipulative_metrics',
+    'network_metrics',
+)
+
+
+def upgrade() -> None:
+    for table in METRIC_TABLES:
+        op.add_column(table, sa.Column('fetched_at', sa.DateTime(), nullable=True))
+        op.add_column(table, sa.Column('source', sa.String(length=50), nullable=True))
+        op.create_index(f'ix_{table}_fetched_at', table, ['fetched_at'])
+
+
+def downgrade() -> None:
+    for table in METRIC_TABLES:
+        op.drop_index(f'ix_{table}_fetched_at', table_name=table)
+        op.drop_column(table, 'source')
+        op.drop_column(table, 'fetched_at')
@@ -0,0 +1,35 @@
+"""added provider ids
+
+Revision ID: 24
+Revises: 23
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '24'
+down_revision: Union[str, None] = '23'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'provider_id',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('provider', sa.String(length=50), nullable=False),
+        sa.Column('symbol', sa.String(length=100), nullable=False),
+        sa.Column('provider_id', sa.String(length=255), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('provider', 'symbol', name='uq_provider_id_provider_symbol'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('provider_id')
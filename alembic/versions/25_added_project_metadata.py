@@ -0,0 +1,39 @@
+"""added project metadata
+
+Revision ID: 25
+Revises: 24
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '25'
+down_revision: Union[str, None] = '24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'project_metadata',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('symbol', sa.String(length=100), nullable=False),
+        sa.Column('name', sa.String(length=255), nullable=True),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('twitter_links', sa.JSON(), nullable=True),
+        sa.Column('categories', sa.JSON(), nullable=True),
+        sa.Column('fetched_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('symbol'),
+    )
+    op.create_index('ix_project_metadata_fetched_at', 'project_metadata', ['fetched_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_project_metadata_fetched_at', table_name='project_metadata')
+    op.drop_table('project_metadata')
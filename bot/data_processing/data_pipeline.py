@@ -1,10 +1,21 @@
 import asyncio
 import logging
 
+from datetime import datetime
+
+from typing import Any, Iterable, Optional
+
 from tenacity import retry, stop_after_attempt, wait_fixed
 
-from bot.utils.resources.files_worker.google_doc import load_document_for_garbage_list
-from bot.database.db_operations import get_one, update_or_create, get_or_create, update_or_create_token, get_all
+from bot.data_processing.work_queue import enqueue_job, run_worker
+from bot.utils.resources.files_worker.google_doc import get_reference_lists
+from bot.database.db_operations import (
+    get_one,
+    update_or_create,
+    get_or_create,
+    bulk_upsert_tokens,
+    get_stale_projects,
+)
 from bot.utils.common.params import get_header_params, get_cryptocompare_params_with_full_name, get_cryptocompare_params
 from bot.database.models import (
     Project,
@@ -21,21 +32,26 @@ from bot.database.models import (
 )
 from bot.utils.common.consts import (
     EXPECTED_KEYS,
-    START_TITLE_FOR_GARBAGE_CATEGORIES,
-    END_TITLE_FOR_GARBAGE_CATEGORIES,
-    START_TITLE_FOR_STABLECOINS,
-    START_TITLE_FOR_FUNDAMENTAL,
-    START_TITLE_FOR_SCAM_TOKENS,
-    END_TITLE_FOR_STABLECOINS,
-    END_TITLE_FOR_FUNDAMENTAL,
     REPLACED_PROJECT_TWITTER,
+    PIPELINE_PROJECTS_LIMIT,
+    CMC_LISTINGS_LIMIT,
+    CMC_QUOTES_BATCH_SIZE,
+    REFRESH_GROUP_NODES,
+    REFRESH_GROUP_INTERVALS,
+    METRIC_REFRESH_GROUPS,
+    METRIC_SOURCES,
+    METRIC_NO_DATA_SOURCE,
+    MODEL_MAPPING,
 )
+from bot.utils.provider_ids import get_provider_id
+from bot.utils.project_metadata import get_projects_metadata
 from bot.utils.project_data import (
     get_twitter_link_by_symbol,
     get_lower_name,
     fetch_fundraise_data,
     get_percentage_data,
     fetch_coinmarketcap_data,
+    fetch_coinmarketcap_quotes,
     fetch_coingecko_data,
     fetch_twitter_data,
     fetch_top_100_wallets,
@@ -46,535 +62,540 @@ from bot.utils.project_data import (
 )
 
 
-@retry(stop=stop_after_attempt(2), wait=wait_fixed(3))
-async def update_static_data():
+class ProjectRefreshGraph:
     """
-    Обновление данных, которые меняются редко (раз в 3 месяца).
+    Граф задач обновления одного проекта.
+    Каждый узел (метаданные, котировка, история цен, скрапинг) выполняется не более одного раза,
+    а его результат используется всеми группами метрик, которым он нужен.
     """
-    while True:
-        try:
-            logging.info("Запуск обновления статических данных...")
 
-            projects = await get_all(Project)
+    def __init__(self, project: Project, cmc_quotes: Optional[dict[str, dict]] = None):
+        self.project = project
+        self.symbol = project.coin_name
+        # Котировки CoinMarketCap, заранее полученные пакетным запросом на весь цикл
+        self.cmc_quotes = cmc_quotes
+        self._nodes: dict[str, asyncio.Future] = {}
 
-            # Загружаем списки мусорных токенов
-            stablecoins = set(load_document_for_garbage_list(START_TITLE_FOR_STABLECOINS, END_TITLE_FOR_STABLECOINS))
-            fundamental = set(load_document_for_garbage_list(START_TITLE_FOR_FUNDAMENTAL, END_TITLE_FOR_FUNDAMENTAL))
-            scam_tokens = set(load_document_for_garbage_list(START_TITLE_FOR_SCAM_TOKENS))
+    async def get(self, node_name: str) -> Any:
+        """
+        Возвращает результат узла, запуская его при первом обращении.
+        Ошибка узла логируется, а вместо результата возвращается None.
+        """
 
-            # Фильтруем токены
-            valid_projects = [
-                project
-                for project in projects
-                if project.coin_name not in stablecoins
-                and project.coin_name not in fundamental
-                and project.coin_name not in scam_tokens
-            ]
+        if node_name not in self._nodes:
+            self._nodes[node_name] = asyncio.ensure_future(self._run_node(node_name))
 
-            # Ограничиваем список до 1000 проектов
-            top_1000_projects = valid_projects[:1000]
+        return await self._nodes[node_name]
 
-            for project in top_1000_projects:
-                success = await fetch_static_data(project.coin_name)
+    async def _run_node(self, node_name: str) -> Any:
+        try:
+            return await REFRESH_NODES[node_name](self)
+        except Exception as e:
+            logging.error(f"[{self.symbol}] Ошибка узла {node_name}: {e}")
+            return None
 
-                await asyncio.sleep(20)
 
-                if not success:
-                    logging.error(f"Skipping {project.coin_name} due to static data fetch error")
+async def metadata_node(graph: ProjectRefreshGraph) -> dict:
+    """
+    Ссылка на Twitter, описание, полное название и категории токена.
+    """
 
-            logging.info("Обновление статических данных завершено. Ожидание 3 месяца...")
-        except Exception as e:
-            logging.error(f"Critical error in update_static_data: {e}")
+    twitter_name, description, lower_name, categories = await get_twitter_link_by_symbol(graph.symbol)
+    if not lower_name:
+        lower_name = await get_lower_name(graph.symbol)
 
-        await asyncio.sleep(60 * 60 * 24 * 30 * 3)
+    return {
+        "twitter_name": twitter_name,
+        "twitter_link": REPLACED_PROJECT_TWITTER.get(twitter_name, twitter_name),
+        "description": description,
+        "lower_name": lower_name,
+        "categories": categories,
+    }
 
 
-@retry(stop=stop_after_attempt(2), wait=wait_fixed(3))
-async def update_weekly_data():
+async def quote_node(graph: ProjectRefreshGraph) -> Optional[dict]:
     """
-    Обновление данных, которые меняются раз в неделю.
+    Котировка токена с CoinMarketCap, при её отсутствии - с CoinGecko.
+    Если котировки уже получены пакетным запросом, отдельный запрос к CoinMarketCap не выполняется.
     """
-    while True:
-        try:
-            logging.info("Запуск обновления недельных данных...")
 
-            projects = await get_all(Project)
-
-            # Загружаем списки мусорных токенов
-            stablecoins = set(load_document_for_garbage_list(START_TITLE_FOR_STABLECOINS, END_TITLE_FOR_STABLECOINS))
-            fundamental = set(load_document_for_garbage_list(START_TITLE_FOR_FUNDAMENTAL, END_TITLE_FOR_FUNDAMENTAL))
-            scam_tokens = set(load_document_for_garbage_list(START_TITLE_FOR_SCAM_TOKENS))
+    if graph.cmc_quotes is not None:
+        data = graph.cmc_quotes.get(graph.symbol)
+    else:
+        try:
+            data = await fetch_coinmarketcap_data(user_coin_name=graph.symbol, **get_header_params(graph.symbol))
+        except Exception as e:
+            logging.warning(f"CoinMarketCap не вернул данные для {graph.symbol}: {e}")
+            data = None
 
-            # Фильтруем токены
-            valid_projects = [
-                project
-                for project in projects
-                if project.coin_name not in stablecoins
-                and project.coin_name not in fundamental
-                and project.coin_name not in scam_tokens
-            ]
+    source = "coinmarketcap"
+    if not data or not isinstance(data, dict) or "price" not in data:
+        logging.warning(f"CoinMarketCap не дал цену для {graph.symbol}, пробуем CoinGecko...")
+        data = await fetch_coingecko_data(graph.symbol)
+        source = "coingecko"
 
-            # Ограничиваем список до 1000 проектов
-            top_1000_projects = valid_projects[:1000]
+    if not data or not isinstance(data, dict):
+        logging.error(f"Invalid data returned for {graph.symbol}: {data}")
+        return None
 
-            for project in top_1000_projects:
-                success = await fetch_weekly_data(project.coin_name)
+    return {**data, "source": source}
 
-                await asyncio.sleep(20)
 
-                if not success:
-                    logging.error(f"Skipping {project.coin_name} due to weekly data fetch error")
+async def price_node(graph: ProjectRefreshGraph) -> Optional[float]:
+    """
+    Актуальная цена токена: из котировки, а если её нет - последняя сохранённая в базе.
+    """
 
-            logging.info("Обновление недельных данных завершено. Ожидание 7 дней...")
-        except Exception as e:
-            logging.error(f"Critical error in update_weekly_data: {e}")
+    quote = await graph.get("quote")
+    if quote and quote.get("price"):
+        return quote["price"]
 
-        # Ожидание 7 дней перед следующим запуском
-        await asyncio.sleep(60 * 60 * 24 * 7)
+    basic_metrics = await get_one(BasicMetrics, project_id=graph.project.id)
+    return basic_metrics.market_price if basic_metrics else None
 
 
-@retry(stop=stop_after_attempt(2), wait=wait_fixed(3))
-async def update_dynamic_data():
+async def history_node(graph: ProjectRefreshGraph) -> Optional[tuple]:
     """
-    Обновление динамических данных (ежедневно).
+    Исторические максимум и минимум цены и рассчитанные от них fail_high и growth_low.
     """
-    while True:
-        try:
-            logging.info("Запуск обновления ежедневных данных...")
 
-            projects = await get_all(Project)
+    metadata, price = await asyncio.gather(graph.get("metadata"), graph.get("price"))
+    if not price:
+        return None
 
-            # Загружаем списки мусорных токенов
-            stablecoins = set(load_document_for_garbage_list(START_TITLE_FOR_STABLECOINS, END_TITLE_FOR_STABLECOINS))
-            fundamental = set(load_document_for_garbage_list(START_TITLE_FOR_FUNDAMENTAL, END_TITLE_FOR_FUNDAMENTAL))
-            scam_tokens = set(load_document_for_garbage_list(START_TITLE_FOR_SCAM_TOKENS))
+    lower_name = (metadata or {}).get("lower_name") or graph.symbol
 
-            # Фильтруем токены
-            valid_projects = [
-                project
-                for project in projects
-                if project.coin_name not in stablecoins
-                and project.coin_name not in fundamental
-                and project.coin_name not in scam_tokens
-            ]
+    return await fetch_cryptocompare_data(
+        get_cryptocompare_params(graph.symbol),
+        get_cryptocompare_params_with_full_name(lower_name.upper()),
+        price,
+    )
 
-            # Ограничиваем список до 1000 проектов
-            top_1000_projects = valid_projects[:1000]
 
-            for project in top_1000_projects:
-                try:
-                    success = await fetch_dynamic_data(project.coin_name)
+async def fundraise_node(graph: ProjectRefreshGraph) -> tuple:
+    metadata = await graph.get("metadata") or {}
+    return await fetch_fundraise_data(graph.symbol, metadata.get("lower_name"))
 
-                    await asyncio.sleep(20)
 
-                    if not success:
-                        logging.error(f"Skipping {project.coin_name} due to data fetch error")
+async def distribution_node(graph: ProjectRefreshGraph) -> Optional[list]:
+    metadata = await graph.get("metadata") or {}
+    return await get_percentage_data(metadata.get("lower_name") or metadata.get("twitter_name"), graph.symbol)
 
-                except Exception as error:
-                    logging.error(f"Error processing dynamic data for {project.coin_name}: {error}")
 
-            logging.info("Обновление ежедневных данных завершено. Ожидание 24 часа...")
-        except Exception as e:
-            logging.error(f"Critical error in update_dynamic_data: {e}")
+async def twitter_node(graph: ProjectRefreshGraph) -> Optional[tuple]:
+    metadata = await graph.get("metadata") or {}
+    if not metadata.get("twitter_link"):
+        return None
 
-        # Ожидание 24 часа перед следующим запуском
-        await asyncio.sleep(60 * 60 * 24)
+    return await fetch_twitter_data(metadata["twitter_link"])
 
 
-@retry(stop=stop_after_attempt(2), wait=wait_fixed(3))
-async def update_current_price():
+async def top_100_wallets_node(graph: ProjectRefreshGraph) -> Optional[float]:
+    slug = await get_provider_id("coincarp", graph.symbol)
+    return await fetch_top_100_wallets(slug or graph.symbol.lower())
+
+
+async def tvl_node(graph: ProjectRefreshGraph) -> Optional[float]:
+    slug = await get_provider_id("defillama", graph.symbol)
+    return await fetch_tvl_data(slug or graph.symbol.lower())
+
+
+REFRESH_NODES = {
+    "metadata": metadata_node,
+    "quote": quote_node,
+    "price": price_node,
+    "history": history_node,
+    "fundraise": fundraise_node,
+    "distribution": distribution_node,
+    "twitter": twitter_node,
+    "top_100_wallets": top_100_wallets_node,
+    "tvl": tvl_node,
+}
+
+
+def freshness(model_name: str, source: Optional[str] = None) -> dict:
     """
-    Обновление текущей и максимальной цен раз в 6 часов.
+    Поля свежести для записи в таблицу метрик: время получения данных и их источник.
     """
-    while True:
-        try:
-            logging.info("Запуск обновления ежедневных данных...")
 
-            projects = await get_all(Project)
+    return {"fetched_at": datetime.now(), "source": source or METRIC_SOURCES.get(model_name)}
 
-            # Загружаем списки мусорных токенов
-            stablecoins = set(load_document_for_garbage_list(START_TITLE_FOR_STABLECOINS, END_TITLE_FOR_STABLECOINS))
-            fundamental = set(load_document_for_garbage_list(START_TITLE_FOR_FUNDAMENTAL, END_TITLE_FOR_FUNDAMENTAL))
-            scam_tokens = set(load_document_for_garbage_list(START_TITLE_FOR_SCAM_TOKENS))
 
-            # Фильтруем токены
-            valid_projects = [
-                project
-                for project in projects
-                if project.coin_name not in stablecoins
-                and project.coin_name not in fundamental
-                and project.coin_name not in scam_tokens
-            ]
+async def persist_static_data(graph: ProjectRefreshGraph) -> bool:
+    """
+    Сохраняет статические данные: фандрейз, распределение токенов и total supply.
+    """
 
-            # Ограничиваем список до 1000 проектов
-            top_1000_projects = valid_projects[:1000]
+    quote = await graph.get("quote")
+    if not quote:
+        return False
 
-            for project in top_1000_projects:
-                try:
-                    success = await fetch_current_price(project.coin_name)
+    fundraise = await graph.get("fundraise")
+    if fundraise:
+        fundraising_data, investors = fundraise
+        await update_or_create(
+            InvestingMetrics,
+            project_id=graph.project.id,
+            defaults={"fundraise": fundraising_data, "fund_level": investors, **freshness("investing_metrics")},
+        )
+    else:
+        # Фандрейза нет - сохранённые значения не трогаем, отмечаем только время попытки
+        await update_or_create(
+            InvestingMetrics,
+            project_id=graph.project.id,
+            defaults=freshness("investing_metrics", METRIC_NO_DATA_SOURCE),
+        )
 
-                    await asyncio.sleep(20)
+    tokenomics_percentage_data = await graph.get("distribution")
+    await update_or_create(
+        FundsProfit,
+        project_id=graph.project.id,
+        defaults={
+            "distribution": "\n".join(tokenomics_percentage_data) if tokenomics_percentage_data else "-",
+            **freshness("funds_profit"),
+        },
+    )
 
-                    if not success:
-                        logging.error(f"Skipping {project.coin_name} due to data fetch error")
-                        continue
+    await update_or_create(
+        Tokenomics,
+        project_id=graph.project.id,
+        defaults={"total_supply": quote["total_supply"]},
+    )
 
-                except Exception as error:
-                    logging.error(f"Error processing dynamic data for {project.coin_name}: {error}")
+    return True
 
-            logging.info("Обновление ежедневных данных завершено. Ожидание 24 часа...")
-        except Exception as e:
-            logging.error(f"Critical error in update_dynamic_data: {e}")
 
-        # Ожидание 24 часа перед следующим запуском
-        await asyncio.sleep(60 * 60 * 12)
+async def persist_weekly_data(graph: ProjectRefreshGraph) -> bool:
+    """
+    Сохраняет еженедельные данные: соц. метрики, топ-100 кошельков, TVL и исторический минимум цены.
+    """
 
+    twitter, twitterscore = await graph.get("twitter") or (None, None)
 
-@retry(stop=stop_after_attempt(2), wait=wait_fixed(3))
-async def fetch_static_data(symbol: str) -> bool:
-    """
-    Получает и обновляет статические данные (раз в 3 месяца).
+    history = await graph.get("history")
+    if history:
+        fail_high, growth_low, max_price, min_price = history
 
-    Возвращает:
-    - True, если данные успешно обновлены.
-    - False, если возникла ошибка.
+        if growth_low and min_price:
+            await update_or_create(
+                TopAndBottom,
+                project_id=graph.project.id,
+                defaults={"lower_threshold": min_price, **freshness("top_and_bottom")},
+            )
+            await update_or_create(
+                MarketMetrics,
+                project_id=graph.project.id,
+                defaults={"growth_low": growth_low, **freshness("market_metrics")},
+            )
+
+    await update_or_create(
+        SocialMetrics,
+        project_id=graph.project.id,
+        defaults={"twitter": twitter, "twitterscore": twitterscore, **freshness("social_metrics")},
+    )
+
+    await update_or_create(
+        ManipulativeMetrics,
+        project_id=graph.project.id,
+        defaults={"top_100_wallet": await graph.get("top_100_wallets"), **freshness("manipulative_metrics")},
+    )
+
+    await update_or_create(
+        NetworkMetrics,
+        project_id=graph.project.id,
+        defaults={"tvl": await graph.get("tvl"), **freshness("network_metrics")},
+    )
+
+    return True
+
+
+async def persist_dynamic_data(graph: ProjectRefreshGraph) -> bool:
     """
-    try:
-        project = await get_one(Project, coin_name=symbol)
-        if not project:
-            logging.error(f"Project not found for {symbol}")
-            return False
+    Сохраняет капитализацию и FDV.
+    """
+
+    quote = await graph.get("quote")
+    if not quote:
+        return False
+
+    if not all(key in quote for key in EXPECTED_KEYS):
+        logging.warning(f"Missing required keys in data for {graph.symbol}: {quote}")
+        return False
 
-        twitter_name, description, lower_name, categories = await get_twitter_link_by_symbol(symbol)
+    await update_or_create(
+        Tokenomics,
+        project_id=graph.project.id,
+        defaults={
+            "capitalization": quote.get("capitalization"),
+            "fdv": quote.get("coin_fdv"),
+            **freshness("tokenomics", quote["source"]),
+        },
+    )
 
-        header_params = get_header_params(symbol)
+    return True
 
-        fundraising_data, investors = await fetch_fundraise_data(symbol)
-        tokenomics_percentage_data = await get_percentage_data(twitter_name, symbol)
-        output_string = "\n".join(tokenomics_percentage_data) if tokenomics_percentage_data else "-"
 
-        coin_data = await fetch_coinmarketcap_data(user_coin_name=symbol, **header_params)
-        if not coin_data:
-            coin_data = await fetch_coingecko_data(symbol)
+async def persist_current_price(graph: ProjectRefreshGraph) -> bool:
+    """
+    Сохраняет текущую цену, исторический максимум и fail_high.
+    """
 
-        if not coin_data or not isinstance(coin_data, dict):
-            logging.error(f"Invalid data returned for {symbol}: {coin_data}")
-            return False
+    quote = await graph.get("quote")
+    price = quote.get("price") if quote else None
+    if not price:
+        logging.error(f"Не удалось получить цену для {graph.symbol}: {quote}")
+        return False
 
-        total_supply = coin_data["total_supply"]
+    await update_or_create(
+        BasicMetrics,
+        project_id=graph.project.id,
+        defaults={"market_price": round(float(price), 4), **freshness("basic_metrics", quote["source"])},
+    )
 
-        # Обновление Fundraising
-        await update_or_create(
-            InvestingMetrics,
-            project_id=project.id,
-            defaults={"fundraise": fundraising_data, "fund_level": investors},
-        )
+    fail_high, growth_low, max_price, min_price = await graph.get("history") or (None, None, None, None)
 
-        # Обновление распределения токенов
+    if max_price and fail_high:
         await update_or_create(
-            FundsProfit,
-            project_id=project.id,
-            defaults={"distribution": output_string},
+            TopAndBottom,
+            project_id=graph.project.id,
+            defaults={"upper_threshold": max_price, **freshness("top_and_bottom")},
         )
-
-        # Обновление Total Supply
         await update_or_create(
-            Tokenomics,
-            project_id=project.id,
-            defaults={"total_supply": total_supply},
+            MarketMetrics,
+            project_id=graph.project.id,
+            defaults={"fail_high": fail_high, **freshness("market_metrics")},
         )
+    else:
+        # Истории цены нет - сохранённые значения не трогаем, отмечаем только время попытки
+        for model, model_name in ((TopAndBottom, "top_and_bottom"), (MarketMetrics, "market_metrics")):
+            await update_or_create(
+                model,
+                project_id=graph.project.id,
+                defaults=freshness(model_name, METRIC_NO_DATA_SOURCE),
+            )
 
-        return True
+    return True
 
-    except Exception as error:
-        logging.error(f"Error processing static data for {symbol}: {error}")
-        return False
 
+REFRESH_GROUP_PERSISTERS = {
+    "static": persist_static_data,
+    "weekly": persist_weekly_data,
+    "dynamic": persist_dynamic_data,
+    "current_price": persist_current_price,
+}
 
-@retry(stop=stop_after_attempt(2), wait=wait_fixed(3))
-async def fetch_weekly_data(symbol: str) -> bool:
+
+def get_refresh_nodes(groups: Iterable[str]) -> set[str]:
     """
-    Получает и обновляет еженедельные данные.
+    Возвращает узлы графа, нужные для обновления указанных групп метрик.
+    """
+
+    return {node for group in groups for node in REFRESH_GROUP_NODES[group]}
+
+
+async def refresh_project(symbol: str, groups: Iterable[str], cmc_quotes: Optional[dict[str, dict]] = None) -> bool:
+    """
+    Обновляет указанные группы метрик одного проекта.
+    Сначала параллельно выполняются все нужные узлы графа, затем группы сохраняются по очереди.
 
     Возвращает:
-    - True, если данные успешно обновлены.
-    - False, если возникла ошибка.
+    - True, если все группы успешно обновлены.
+    - False, если хотя бы одна группа не обновлена.
     """
-    try:
-        project = await get_one(Project, coin_name=symbol)
-        if not project:
-            logging.error(f"Project not found for {symbol}")
-            return False
 
-        basic_metrics = await get_one(BasicMetrics, project_id=project.id)
+    project = await get_one(Project, coin_name=symbol)
+    if not project:
+        logging.error(f"Project not found for {symbol}")
+        return False
 
-        twitter_name, description, lower_name, categories = await get_twitter_link_by_symbol(symbol)
-        if not lower_name:
-            lower_name = await get_lower_name(symbol)
+    graph = ProjectRefreshGraph(project, cmc_quotes)
+    groups = list(groups)
 
-        twitter_link = REPLACED_PROJECT_TWITTER.get(twitter_name, twitter_name)
+    await asyncio.gather(*(graph.get(node) for node in get_refresh_nodes(groups)))
 
-        twitter, twitterscore = await fetch_twitter_data(twitter_link)
-        top_100_wallets = await fetch_top_100_wallets(symbol.lower())
-        tvl = await fetch_tvl_data(symbol.lower())
+    success = True
+    for group in groups:
+        try:
+            group_success = await REFRESH_GROUP_PERSISTERS[group](graph)
+        except Exception as e:
+            logging.error(f"[{group}] Ошибка при сохранении данных {symbol}: {e}")
+            group_success = False
 
-        cryptocompare_params = get_cryptocompare_params(symbol)
-        cryptocompare_params_with_full_coin_name = get_cryptocompare_params_with_full_name(lower_name.upper())
+        if not group_success:
+            logging.error(f"[{group}] Данные {symbol} не обновлены")
+            success = False
 
-        if basic_metrics and basic_metrics.market_price:
-            result = await fetch_cryptocompare_data(
-                cryptocompare_params,
-                cryptocompare_params_with_full_coin_name,
-                basic_metrics.market_price,
-                "top_and_bottom",
-            )
+    return success
 
-            fail_high, growth_low, max_price, min_price = result
-
-            if growth_low and min_price:
-                await update_or_create(
-                    TopAndBottom,
-                    project_id=project.id,
-                    defaults={"min_price": min_price},
-                )
-                await update_or_create(
-                    MarketMetrics,
-                    project_id=project.id,
-                    defaults={"growth_low": growth_low},
-                )
-
-        # Обновление соц. метрик
-        await update_or_create(
-            SocialMetrics,
-            project_id=project.id,
-            defaults={"twitter": twitter, "twitterscore": twitterscore},
-        )
 
-        # Обновление манипулятивных метрик
-        await update_or_create(
-            ManipulativeMetrics,
-            project_id=project.id,
-            defaults={"top_100_wallet": top_100_wallets},
-        )
+async def prefetch_cmc_quotes(symbols: list[str]) -> dict[str, dict]:
+    """
+    Получает котировки CoinMarketCap для списка символов.
+    Для большого списка основной источник - листинг (listings/latest), пакетные запросы quotes/latest
+    выполняются только для символов, которых в листинге нет.
+    """
 
-        # Обновление сетевых метрик
-        await update_or_create(
-            NetworkMetrics,
-            project_id=project.id,
-            defaults={"tvl": tvl},
-        )
+    cmc_quotes = {}
 
-        return True
+    if len(symbols) > CMC_QUOTES_BATCH_SIZE:
+        try:
+            for token in await fetch_top_tokens(limit=CMC_LISTINGS_LIMIT):
+                if "price" in token:
+                    cmc_quotes.setdefault(token["symbol"], token)
+        except Exception as e:
+            logging.error(f"Ошибка при получении листинга CoinMarketCap: {e}")
 
-    except Exception as error:
-        logging.error(f"Error processing weekly data for {symbol}: {error}")
-        return False
+    missing_symbols = [symbol for symbol in symbols if symbol not in cmc_quotes]
+    if missing_symbols:
+        cmc_quotes.update(await fetch_coinmarketcap_quotes(missing_symbols))
 
+    return cmc_quotes
 
-@retry(stop=stop_after_attempt(2), wait=wait_fixed(3))
-async def fetch_current_price(symbol: str):
+
+async def enqueue_refresh_jobs(stale_groups: dict[str, list[str]], cmc_quotes: Optional[dict[str, dict]] = None):
     """
-    Получает/обновляет текущую и максимальную цены для указанного токена.
+    Ставит в очередь задачи обновления проектов.
+    Котировки CoinMarketCap запрашиваются заранее на весь список (или передаются в cmc_quotes)
+    и передаются в задачах, а не запрашиваются отдельно для каждого проекта. Так же заранее
+    сохраняются описания токенов.
     """
-    try:
-        # Получаем объект проекта
-        project = await get_one(Project, coin_name=symbol)
-        if not project:
-            logging.error(f"Project not found for {symbol}")
-            return False
 
-        header_params = get_header_params(symbol)
+    if cmc_quotes is None and any("quote" in get_refresh_nodes(groups) for groups in stale_groups.values()):
+        cmc_quotes = await prefetch_cmc_quotes(list(stale_groups))
 
-        # Пробуем получить цену с CoinMarketCap
-        data = await fetch_coinmarketcap_data(user_coin_name=symbol, **header_params)
+    # Описания токенов запрашиваются пакетами заранее, узлы metadata читают их из базы
+    metadata_symbols = [symbol for symbol, groups in stale_groups.items() if "metadata" in get_refresh_nodes(groups)]
+    if metadata_symbols:
+        await get_projects_metadata(metadata_symbols)
 
-        if not data or not isinstance(data, dict) or "price" not in data:
-            logging.warning(f"CoinMarketCap не дал цену для {symbol}, пробуем CoinGecko...")
-            data = await fetch_coingecko_data(symbol)
+    enqueued = 0
+    for symbol, groups in stale_groups.items():
+        quote = (cmc_quotes or {}).get(symbol) if "quote" in get_refresh_nodes(groups) else None
+        if await enqueue_job(symbol, groups, quote):
+            enqueued += 1
 
-        # Получаем дополнительные данные о проекте
-        twitter_name, description, lower_name, categories = await get_twitter_link_by_symbol(symbol)
-        if not lower_name:
-            lower_name = await get_lower_name(symbol)
+    logging.info(f"В очередь поставлено задач обновления: {enqueued} из {len(stale_groups)}")
 
-        # Подготавливаем параметры для API-запросов
-        cryptocompare_params = get_cryptocompare_params(symbol)
-        cryptocompare_params_with_full_coin_name = get_cryptocompare_params_with_full_name(lower_name.upper())
 
-        price = data.get("price")
+async def handle_refresh_job(symbol: str, groups: list[str], quote: Optional[dict]) -> bool:
+    """
+    Обработчик задачи обновления проекта из очереди.
+    Запросы ограничиваются квотами сервисов при каждом обращении: HTTP-запросы - в limited_request,
+    страницы в браузере - в browser_page.
+    """
 
-        # Получаем границы рынка
-        result = await fetch_cryptocompare_data(
-            cryptocompare_params,
-            cryptocompare_params_with_full_coin_name,
-            price,
-            "top_and_bottom",
-        )
+    return await refresh_project(symbol, groups, {symbol: quote} if quote else None)
 
-        if result is None:
-            result = (None, None, None, None)
 
-        fail_high, growth_low, max_price, min_price = result
+async def run_pipeline_worker():
+    """
+    Фоновая задача обработки очереди обновления проектов.
+    """
 
-        if price:
-            await update_or_create(
-                BasicMetrics,
-                project_id=project.id,
-                defaults={"market_price": round(float(price), 4)},
-            )
+    await run_worker(handle_refresh_job)
 
-        # Обновление границ рынка
-        if max_price and fail_high:
-            await update_or_create(
-                TopAndBottom,
-                project_id=project.id,
-                defaults={"upper_threshold": max_price},
-            )
-            await update_or_create(
-                MarketMetrics,
-                project_id=project.id,
-                defaults={"fail_high": fail_high},
-            )
 
-        logging.error(f"Не удалось получить цену для {symbol}: {data}")
+def get_group_models(group: str) -> list:
+    """
+    Возвращает таблицы метрик, по свежести которых определяется, пора ли обновлять группу.
+    """
 
-    except Exception as e:
-        logging.error(f"Ошибка при получении цены {symbol}: {e}")
+    return [MODEL_MAPPING[name] for name, model_group in METRIC_REFRESH_GROUPS.items() if model_group == group]
 
 
-@retry(stop=stop_after_attempt(2), wait=wait_fixed(3))
-async def fetch_dynamic_data(symbol: str) -> bool:
+async def get_stale_groups() -> dict[str, list[str]]:
     """
-    Получает и обновляет данные о проекте.
+    Определяет, какие группы метрик каких проектов устарели.
 
     Возвращает:
-    - True, если все прошло успешно.
-    - False, если возникла ошибка.
+    - Словарь {символ: [группы]} в порядке устаревания данных и cmc_rank.
     """
-    try:
-        # Получаем объект проекта
-        project = await get_one(Project, coin_name=symbol)
-        if not project:
-            logging.error(f"Project not found for {symbol}")
-            return False
 
-        # Подготавливаем параметры для API-запросов
-        header_params = get_header_params(symbol)
+    reference_lists = await get_reference_lists()
+    stale_groups = {}
 
-        # Получаем данные с CoinMarketCap или CoinGecko
-        data = await fetch_coinmarketcap_data(user_coin_name=symbol, **header_params)
-        if not data:
-            data = await fetch_coingecko_data(symbol)
+    for group, interval in REFRESH_GROUP_INTERVALS.items():
+        projects = await get_stale_projects(get_group_models(group), interval, limit=PIPELINE_PROJECTS_LIMIT)
 
-        if not data or not isinstance(data, dict):
-            logging.error(f"Invalid data returned for {symbol}: {data}")
-            return False
+        for project in projects:
+            if reference_lists.is_excluded_token(project.coin_name):
+                continue
 
-        if not all(key in data for key in EXPECTED_KEYS):
-            logging.warning(f"Missing required keys in data for {symbol}: {data}")
-            return False
+            stale_groups.setdefault(project.coin_name, []).append(group)
 
-        # Данные о цене и капитализации
-        capitalization = data.get("capitalization")
-        fdv = data.get("coin_fdv")
+    return stale_groups
 
-        # Обновление капитализации и цены
-        await update_or_create(
-            Tokenomics,
-            project_id=project.id,
-            defaults={"capitalization": capitalization, "fdv": fdv},
-        )
 
-        logging.info(f"Successfully updated project data for {symbol}")
-        return True
+async def run_refresh_cycle():
+    """
+    Один цикл обновления: в очередь ставятся задачи только по устаревшим группам метрик
+    (старше интервала своей группы, REFRESH_GROUP_INTERVALS). Проекты, задачи которых уже стоят в очереди,
+    пропускаются. Запускается планировщиком раз в REFRESH_ORCHESTRATOR_TICK.
+    """
 
-    except Exception as e:
-        logging.error(f"Error fetching data for {symbol}: {e}")
-        return False
+    stale_groups = await get_stale_groups()
+    if stale_groups:
+        await enqueue_refresh_jobs(stale_groups)
 
 
 @retry(stop=stop_after_attempt(2), wait=wait_fixed(3))
 async def parse_categories_weekly():
     """
-    Еженедельно парсит категории криптовалют и сохраняет только не-мусорные категории.
+    Парсит категории криптовалют и сохраняет только не-мусорные категории.
+    Запускается планировщиком раз в неделю.
     """
-    while True:
-        logging.info("Запуск еженедельного обновления категорий...")
-        try:
-            all_categories = await fetch_categories()
-            garbage_categories = load_document_for_garbage_list(
-                START_TITLE_FOR_GARBAGE_CATEGORIES,
-                END_TITLE_FOR_GARBAGE_CATEGORIES,
-            )
+    logging.info("Запуск еженедельного обновления категорий...")
 
-            valid_categories = [category for category in all_categories if category not in garbage_categories]
+    all_categories = await fetch_categories()
+    reference_lists = await get_reference_lists()
 
-            for category in valid_categories:
-                await get_or_create(Category, category_name=category)
+    valid_categories = [category for category in all_categories if not reference_lists.is_garbage_category(category)]
 
-            logging.info("Обновление категорий завершено.")
-        except Exception as e:
-            logging.error(f"Ошибка при обновлении категорий: {e}")
+    for category in valid_categories:
+        await get_or_create(Category, category_name=category)
 
-        # Ожидание 7 дней
-        await asyncio.sleep(7 * 24 * 60 * 60)
+    logging.info("Обновление категорий завершено.")
 
 
 @retry(stop=stop_after_attempt(2), wait=wait_fixed(3))
 async def parse_tokens_weekly():
     """
-    Еженедельно парсит топ-1000 токенов CoinMarketCap, исключая стейблкоины и скам-токены.
-    Обновляет поле cmc_rank, если токен с данным символом уже существует в базе,
-    иначе создаёт новую запись.
+    Парсит топ-1000 токенов CoinMarketCap, исключая стейблкоины и скам-токены.
+    Обновляет поле cmc_rank и рыночные данные (цена, предложение, капитализация, FDV),
+    если токен с данным символом уже существует в базе, иначе создаёт новую запись.
+    Запускается планировщиком раз в неделю.
     """
-    while True:
-        logging.info("Запуск еженедельного обновления списка токенов...")
-        try:
-            all_tokens = await fetch_top_tokens(limit=1500)
-
-            stablecoins = set(load_document_for_garbage_list(START_TITLE_FOR_STABLECOINS, END_TITLE_FOR_STABLECOINS))
-            fundamental = set(load_document_for_garbage_list(START_TITLE_FOR_FUNDAMENTAL, END_TITLE_FOR_FUNDAMENTAL))
-            scam_tokens = set(load_document_for_garbage_list(START_TITLE_FOR_SCAM_TOKENS))
-
-            # Исключаем мусорные токены
-            filtered_tokens = [
-                token
-                for token in all_tokens
-                if token["symbol"] not in stablecoins
-                and token["symbol"] not in fundamental
-                and token["symbol"] not in scam_tokens
-            ]
-            # Проверяем, хватает ли 1000 токенов
-            if len(filtered_tokens) < 1000:
-                remaining_tokens = [token for token in all_tokens if token not in filtered_tokens][
-                    : 1000 - len(filtered_tokens)
-                ]
-                filtered_tokens.extend(remaining_tokens)
-
-            # Оставляем ровно 1000 токенов
-            top_1000_tokens = filtered_tokens[:1000]
-
-            for token in top_1000_tokens:
-                instance, bool_type = await update_or_create_token(
-                    token_data=token,
-                )
-
-                if bool_type:
-                    # Выполняем парсинг для новых проектов
-                    static_data_success = await fetch_static_data(token["symbol"])
-                    weekly_data_success = await fetch_weekly_data(token["symbol"])
-
-                    if not static_data_success:
-                        logging.error(f"Static data fetch failed for {token}")
-
-                    if not weekly_data_success:
-                        logging.error(f"Weekly data fetch failed for {token}")
-
-                    await asyncio.sleep(15)
-
-            logging.info("Обновление списка токенов завершено. В базе 1000 отфильтрованных токенов.")
-        except Exception as e:
-            logging.error(f"Ошибка при обновлении списка токенов: {e}")
+    logging.info("Запуск еженедельного обновления списка токенов...")
+
+    all_tokens = await fetch_top_tokens(limit=CMC_LISTINGS_LIMIT)
+
+    reference_lists = await get_reference_lists()
+
+    # Исключаем мусорные токены
+    filtered_tokens = [token for token in all_tokens if not reference_lists.is_excluded_token(token["symbol"])]
+    # Проверяем, хватает ли 1000 токенов
+    if len(filtered_tokens) < 1000:
+        remaining_tokens = [token for token in all_tokens if token not in filtered_tokens][
+            : 1000 - len(filtered_tokens)
+        ]
+        filtered_tokens.extend(remaining_tokens)
+
+    # Оставляем ровно 1000 токенов
+    top_1000_tokens = filtered_tokens[:1000]
+
+    # Рейтинг и рыночные данные всех токенов листинга записываются одной транзакцией,
+    # новые проекты создаются только для отобранных 1000 токенов
+    new_symbols = await bulk_upsert_tokens(
+        all_tokens,
+        create_symbols={token["symbol"] for token in top_1000_tokens},
+    )
+
+    # Выполняем парсинг для новых проектов
+    if new_symbols:
+        cmc_quotes = {token["symbol"]: token for token in all_tokens if "price" in token}
+        await enqueue_refresh_jobs(
+            {symbol: list(REFRESH_GROUP_INTERVALS) for symbol in new_symbols},
+            cmc_quotes,
+        )
 
-        # Ожидание 7 дней
-        await asyncio.sleep(7 * 24 * 60 * 60)
+    logging.info("Обновление списка токенов завершено. В базе 1000 отфильтрованных токенов.")
@@ -8,12 +8,8 @@ from tenacity import retry, stop_after_attempt, wait_fixed
 
 from bot.utils.resources.files_worker.pdf_worker import generate_pdf
 from bot.utils.resources.gpt.gpt import agent_handler
-from bot.data_processing.data_pipeline import (
-    update_static_data,
-    update_weekly_data,
-    update_dynamic_data,
-    update_current_price,
-)
+from bot.utils.common.cluster import owns_project
+from bot.data_processing.data_pipeline import run_pipeline_worker
 from bot.database.db_operations import (
     get_one,
     update_or_create,
@@ -29,8 +25,6 @@ from bot.utils.common.consts import (
     DATA_FOR_ANALYSIS_TEXT,
     ALL_DATA_STRING_FUNDS_AGENT,
     ALL_DATA_STRING_FLAGS_AGENT,
-    START_TITLE_FOR_GARBAGE_CATEGORIES,
-    END_TITLE_FOR_GARBAGE_CATEGORIES,
 )
 from bot.utils.metrics.metrics_evaluation import (
     determine_project_tier,
@@ -55,7 +49,7 @@ from bot.utils.resources.bot_phrases.bot_phrase_strings import (
     calculations_choices,
 )
 from bot.utils.resources.files_worker.google_doc import (
-    load_document_for_garbage_list,
+    get_reference_lists,
 )
 from bot.utils.validations import (
     extract_red_green_flags,
@@ -72,20 +66,14 @@ current_day = datetime.datetime.now(datetime.timezone.utc).day
 async def fetch_crypto_data():
     """
     Асинхронный эндпоинт для получения данных о криптопроектах.
-    Запускает три фоновых обновления:
-    - `update_static_data` (раз в 3 месяца)
-    - `update_weekly_data` (раз в неделю)
-    - `update_dynamic_data` (ежедневно)
-    - `update_current_price` (раз в 6 часов)
+    Запускает обработчик очереди задач обновления проектов (`run_pipeline_worker`).
+    Постановкой задач в очередь (`run_refresh_cycle`) и обновлением ответов агентов (`update_agent_answers`)
+    управляет планировщик (см. bot/data_processing/scheduler.py).
     """
     try:
         logging.info("Starting fetch_crypto_data...")
 
-        asyncio.create_task(update_static_data())
-        asyncio.create_task(update_weekly_data())
-        asyncio.create_task(update_dynamic_data())
-        asyncio.create_task(periodically_update_answers())
-        asyncio.create_task(update_current_price())
+        asyncio.create_task(run_pipeline_worker())
 
         logging.info("All update tasks started successfully.")
 
@@ -119,17 +107,16 @@ async def update_agent_answers():
 
     # Загружаем мусорные категории
     logging.info("Загружаем список категорий (garbage_categories)...")
-    garbage_categories = load_document_for_garbage_list(
-        START_TITLE_FOR_GARBAGE_CATEGORIES,
-        END_TITLE_FOR_GARBAGE_CATEGORIES,
-    )
-    logging.info(f"garbage_categories загружено, размер: {len(garbage_categories)}")
+    reference_lists = await get_reference_lists()
+    logging.info(f"garbage_categories загружено, размер: {len(reference_lists.garbage_categories)}")
 
     logging.info("Получаем все устаревшие AgentAnswer (outdated_answers)...")
     outdated_answers = await get_all(
         AgentAnswer,
         updated_at=lambda col: col <= last_edit
     )
+    # Каждая реплика обновляет ответы только по своим проектам
+    outdated_answers = [agent_answer for agent_answer in outdated_answers if owns_project(agent_answer.project_id)]
     logging.info(f"Найдено {len(outdated_answers)} устаревших ответов для обновления")
 
     for agent_answer in outdated_answers:
@@ -173,7 +160,7 @@ async def update_agent_answers():
         category_instances = []
         logging.info(f"[{project.coin_name}] Обрабатываем {len(categories)} категорий...")
         for category_name in categories:
-            if category_name not in garbage_categories:
+            if not reference_lists.is_garbage_category(category_name):
                 category_instance, _ = await get_or_create(Category, category_name=category_name)
                 category_instances.append(category_instance)
 
@@ -185,7 +172,7 @@ async def update_agent_answers():
         project_info = await get_user_project_info(project.coin_name)
         logging.info(f"[{project.coin_name}] Получен project_info: {list(project_info.keys())}")
 
-        twitter_link = await get_twitter_link_by_symbol(project.coin_name)
+        twitter_link = (twitter_name, description, lower_name, categories)
         tokenomics_data = project_info.get("tokenomics_data")
         basic_metrics = project_info.get("basic_metrics")
         investing_metrics = project_info.get("investing_metrics")
@@ -606,23 +593,6 @@ async def update_agent_answers():
             },
         )
 
-        logging.info(f"[{project.coin_name}] Успешно обновлён agent_answer, ждём 10 сек...")
-        await asyncio.sleep(10)
+        logging.info(f"[{project.coin_name}] Успешно обновлён agent_answer")
 
     logging.info("=== update_agent_answers() завершена ===")
-
-
-async def periodically_update_answers():
-    """
-    Задача обновления ответов модели. Выполняется раз в 12 часов
-    """
-
-    while True:
-        try:
-            logging.info("Обновление ответов")
-            await update_agent_answers()
-            logging.info("Конец обновления")
-        except Exception as e:
-            logging.error(f"Ошибка при обновлении ответов агентов: {e}")
-
-        await asyncio.sleep(60 * 60 * 12)
\ No newline at end of file
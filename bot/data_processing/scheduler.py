@@ -0,0 +1,126 @@
+import time
+import random
+import logging
+
+from typing import Awaitable, Callable, Optional
+from datetime import datetime, timezone
+
+from apscheduler.triggers.interval import IntervalTrigger
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+from bot.utils.common.cluster import is_leader
+from bot.utils.common.sessions import redis_client
+from bot.utils.common.consts import (
+    SCHEDULED_JOBS,
+    SINGLETON_JOBS,
+    SCHEDULER_REDIS_PREFIX,
+    SCHEDULER_START_JITTER,
+    SCHEDULER_JITTER,
+    SCHEDULER_MISFIRE_GRACE_TIME,
+)
+
+scheduler = AsyncIOScheduler(
+    timezone=timezone.utc,
+    job_defaults={"coalesce": True, "max_instances": 1, "misfire_grace_time": SCHEDULER_MISFIRE_GRACE_TIME},
+)
+
+
+def last_run_key(job_id: str) -> str:
+    """
+    Формирует ключ Redis со временем последнего успешного запуска задачи.
+    """
+
+    return f"{SCHEDULER_REDIS_PREFIX}:last_run:{job_id}"
+
+
+async def get_last_run(job_id: str) -> Optional[float]:
+    """
+    Возвращает время последнего успешного запуска задачи (unix time) или None, если задача ещё не запускалась.
+    """
+
+    try:
+        last_run = await redis_client.get(last_run_key(job_id))
+    except Exception as e:
+        logging.error(f"Ошибка при получении времени последнего запуска {job_id}: {e}")
+        return None
+
+    return float(last_run) if last_run else None
+
+
+async def get_next_run_time(job_id: str, interval: int) -> datetime:
+    """
+    Рассчитывает время первого запуска задачи после старта процесса.
+    Если задача ещё не должна выполняться, запуск переносится на время последнего запуска + интервал,
+    а просроченные задачи стартуют в случайный момент окна SCHEDULER_START_JITTER, а не все сразу.
+    """
+
+    now = time.time()
+    last_run = await get_last_run(job_id)
+
+    if last_run and last_run + interval > now:
+        next_run = last_run + interval
+    else:
+        next_run = now + random.uniform(0, SCHEDULER_START_JITTER)
+
+    return datetime.fromtimestamp(next_run, tz=timezone.utc)
+
+
+def scheduled_job(job_id: str, func: Callable[[], Awaitable]) -> Callable[[], Awaitable]:
+    """
+    Оборачивает задачу: логирует запуск и сохраняет время успешного выполнения в Redis.
+    Если задача завершилась ошибкой, время не сохраняется и после перезапуска она считается просроченной.
+    Задачи из SINGLETON_JOBS выполняются только на реплике-лидере.
+    """
+
+    async def run_job():
+        if job_id in SINGLETON_JOBS and not is_leader():
+            logging.info(f"[scheduler] Задача {job_id} пропущена: реплика не является лидером")
+            return
+
+        logging.info(f"[scheduler] Запуск задачи {job_id}")
+        started_at = time.time()
+
+        try:
+            await func()
+        except Exception as e:
+            logging.error(f"[scheduler] Ошибка в задаче {job_id}: {e}")
+            return
+
+        try:
+            await redis_client.set(last_run_key(job_id), started_at)
+        except Exception as e:
+            logging.error(f"[scheduler] Не удалось сохранить время запуска {job_id}: {e}")
+
+        logging.info(f"[scheduler] Задача {job_id} выполнена за {time.time() - started_at:.0f} с")
+
+    return run_job
+
+
+async def start_scheduler(jobs: dict[str, Callable[[], Awaitable]]):
+    """
+    Регистрирует задачи с интервалами из SCHEDULED_JOBS и запускает планировщик.
+    """
+
+    for job_id, func in jobs.items():
+        interval = SCHEDULED_JOBS[job_id]
+        next_run_time = await get_next_run_time(job_id, interval)
+
+        # Сетка запусков отсчитывается от первого запуска, чтобы интервал между запусками сохранялся
+        scheduler.add_job(
+            scheduled_job(job_id, func),
+            IntervalTrigger(seconds=interval, start_date=next_run_time, jitter=SCHEDULER_JITTER, timezone=timezone.utc),
+            id=job_id,
+            replace_existing=True,
+        )
+        logging.info(f"[scheduler] Задача {job_id}: следующий запуск {next_run_time.isoformat()}")
+
+    scheduler.start()
+
+
+def shutdown_scheduler():
+    """
+    Останавливает планировщик, не дожидаясь выполняющихся задач.
+    """
+
+    if scheduler.running:
+        scheduler.shutdown(wait=False)
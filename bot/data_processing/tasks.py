@@ -1,16 +1,9 @@
-import asyncio
 import logging
 
 from bot.database.backups import create_backup
 
 
 async def backup_database():
-    """Создаёт бэкап базы данных каждый день."""
-    while True:
-        try:
-            await create_backup()
-            logging.info(f"Бэкап создан")
-        except Exception as e:
-            logging.error(f"Ошибка при создании бэкапа: {e}")
-
-        await asyncio.sleep(60 * 60 * 24)
+    """Создаёт бэкап базы данных. Запускается планировщиком раз в день."""
+    await create_backup()
+    logging.info(f"Бэкап создан")
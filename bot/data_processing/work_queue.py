@@ -0,0 +1,217 @@
+import json
+import asyncio
+import logging
+
+from typing import Any, Awaitable, Callable, Optional
+from redis.exceptions import ResponseError
+
+from bot.utils.common.config import REPLICA_ID
+from bot.utils.common.sessions import redis_client
+from bot.utils.common.consts import (
+    PIPELINE_STREAM,
+    PIPELINE_DEAD_LETTER_STREAM,
+    PIPELINE_CONSUMER_GROUP,
+    PIPELINE_STREAM_MAXLEN,
+    PIPELINE_JOB_MAX_ATTEMPTS,
+    PIPELINE_JOB_CLAIM_IDLE,
+    PIPELINE_JOB_DEDUP_TTL,
+    PIPELINE_WORKER_BLOCK,
+    PIPELINE_CONCURRENCY,
+    REFRESH_FAILURE_BACKOFF,
+)
+
+# Обработчик задачи: (символ, группы метрик, котировка) -> успешно ли обновлены данные
+JobHandler = Callable[[str, list[str], Optional[dict]], Awaitable[bool]]
+
+
+def job_key(symbol: str) -> str:
+    """
+    Формирует ключ отметки о том, что задача проекта уже стоит в очереди.
+    """
+
+    return f"{PIPELINE_STREAM}:queued:{symbol}"
+
+
+async def ensure_consumer_group():
+    """
+    Создаёт поток задач и группу обработчиков, если их ещё нет.
+    """
+
+    try:
+        await redis_client.xgroup_create(PIPELINE_STREAM, PIPELINE_CONSUMER_GROUP, id="0", mkstream=True)
+    except ResponseError as e:
+        if "BUSYGROUP" not in str(e):
+            raise
+
+
+async def enqueue_job(symbol: str, groups: list[str], quote: Optional[dict] = None) -> bool:
+    """
+    Ставит в очередь задачу обновления групп метрик проекта.
+    Если задача проекта уже стоит в очереди (или недавно окончательно завершилась ошибкой), новая не ставится.
+
+    Возвращает:
+    - True, если задача поставлена в очередь.
+    - False, если такая задача уже есть.
+    """
+
+    if not await redis_client.set(job_key(symbol), "queued", nx=True, ex=PIPELINE_JOB_DEDUP_TTL):
+        return False
+
+    await redis_client.xadd(
+        PIPELINE_STREAM,
+        {"symbol": symbol, "groups": ",".join(groups), "quote": json.dumps(quote) if quote else "", "attempts": 0},
+        maxlen=PIPELINE_STREAM_MAXLEN,
+        approximate=True,
+    )
+
+    return True
+
+
+async def process_message(message_id: str, fields: dict[str, Any], handler: JobHandler) -> bool:
+    """
+    Выполняет задачу из очереди и подтверждает её.
+    Неуспешная задача ставится в очередь повторно, а после PIPELINE_JOB_MAX_ATTEMPTS попыток
+    переносится в очередь "мёртвых" задач. Повторная постановка такой задачи возможна через REFRESH_FAILURE_BACKOFF.
+    """
+
+    if not fields:
+        # Задача была удалена из потока при обрезке
+        await redis_client.xack(PIPELINE_STREAM, PIPELINE_CONSUMER_GROUP, message_id)
+        return False
+
+    symbol = fields["symbol"]
+    groups = fields["groups"].split(",")
+    quote = json.loads(fields["quote"]) if fields.get("quote") else None
+    attempts = int(fields.get("attempts", 0)) + 1
+
+    try:
+        success = await handler(symbol, groups, quote)
+    except Exception as e:
+        logging.error(f"[queue] Ошибка при обновлении {symbol} ({fields['groups']}): {e}")
+        success = False
+
+    async with redis_client.pipeline(transaction=True) as pipe:
+        if success is not False:
+            pipe.delete(job_key(symbol))
+        elif attempts < PIPELINE_JOB_MAX_ATTEMPTS:
+            logging.warning(f"[queue] Повтор задачи {symbol} ({fields['groups']}), попытка {attempts + 1}")
+            pipe.xadd(
+                PIPELINE_STREAM,
+                {**fields, "attempts": attempts},
+                maxlen=PIPELINE_STREAM_MAXLEN,
+                approximate=True,
+            )
+        else:
+            logging.error(f"[queue] Задача {symbol} ({fields['groups']}) не выполнена за {attempts} попыток")
+            pipe.xadd(
+                PIPELINE_DEAD_LETTER_STREAM,
+                {**fields, "attempts": attempts},
+                maxlen=PIPELINE_STREAM_MAXLEN,
+                approximate=True,
+            )
+            pipe.set(job_key(symbol), "dead", ex=REFRESH_FAILURE_BACKOFF)
+
+        pipe.xack(PIPELINE_STREAM, PIPELINE_CONSUMER_GROUP, message_id)
+        await pipe.execute()
+
+    return success is not False
+
+
+async def read_messages(
+    consumer: str, pending_from: Optional[str], count: int, block: bool = True
+) -> list[tuple[str, dict]]:
+    """
+    Читает задачи для обработчика: свои неподтверждённые после pending_from (если он задан),
+    зависшие у других обработчиков или новые. Если block=False, новых задач не ждёт.
+    """
+
+    if pending_from is not None:
+        response = await redis_client.xreadgroup(
+            PIPELINE_CONSUMER_GROUP, consumer, {PIPELINE_STREAM: pending_from}, count=count
+        )
+        return response[0][1] if response else []
+
+    # Redis 7 возвращает (курсор, задачи, удалённые ID), Redis 6.2 - только (курсор, задачи)
+    result = await redis_client.xautoclaim(
+        PIPELINE_STREAM,
+        PIPELINE_CONSUMER_GROUP,
+        consumer,
+        min_idle_time=PIPELINE_JOB_CLAIM_IDLE,
+        start_id="0-0",
+        count=count,
+    )
+    claimed = result[1]
+    if claimed:
+        return claimed
+
+    response = await redis_client.xreadgroup(
+        PIPELINE_CONSUMER_GROUP,
+        consumer,
+        {PIPELINE_STREAM: ">"},
+        count=count,
+        block=PIPELINE_WORKER_BLOCK if block else None,
+    )
+    return response[0][1] if response else []
+
+
+def log_result(task: asyncio.Task):
+    """
+    Записывает в лог задачу, завершившуюся неперехваченной ошибкой.
+    """
+
+    if not task.cancelled() and task.exception() is not None:
+        logging.error(f"[queue] Ошибка при обработке задачи: {task.exception()}")
+
+
+async def run_worker(handler: JobHandler, consumer: str = REPLICA_ID, concurrency: int = PIPELINE_CONCURRENCY):
+    """
+    Фоновый обработчик очереди задач.
+    После перезапуска сначала дорабатывает свои неподтверждённые задачи, затем забирает задачи,
+    зависшие у остановленных обработчиков, и только потом читает новые.
+    Одновременно выполняется не больше concurrency задач; новые задачи читаются по мере освобождения мест,
+    поэтому одна долгая задача не задерживает остальные.
+    """
+
+    running: dict[str, asyncio.Task] = {}
+    pending_from: Optional[str] = "0"
+
+    try:
+        while True:
+            try:
+                if len(running) >= concurrency:
+                    await asyncio.wait(running.values(), return_when=asyncio.FIRST_COMPLETED)
+                    continue
+
+                await ensure_consumer_group()
+                messages = await read_messages(consumer, pending_from, concurrency - len(running), block=not running)
+
+                if pending_from is not None:
+                    if messages:
+                        pending_from = messages[-1][0]
+                    else:
+                        pending_from = None
+                        continue
+
+                for message_id, fields in messages:
+                    # Задача, которую этот обработчик ещё выполняет, могла быть забрана повторно
+                    if message_id in running:
+                        continue
+                    task = asyncio.create_task(process_message(message_id, fields, handler))
+                    task.add_done_callback(log_result)
+                    task.add_done_callback(lambda _, message_id=message_id: running.pop(message_id, None))
+                    running[message_id] = task
+
+                if not messages and running:
+                    await asyncio.wait(
+                        running.values(), timeout=PIPELINE_WORKER_BLOCK / 1000, return_when=asyncio.FIRST_COMPLETED
+                    )
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"[queue] Ошибка обработчика очереди: {e}")
+                await asyncio.sleep(PIPELINE_WORKER_BLOCK / 1000)
+    finally:
+        # Неподтверждённые задачи останутся в очереди и будут доработаны после перезапуска
+        for task in running.values():
+            task.cancel()
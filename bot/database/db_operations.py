@@ -1,13 +1,16 @@
 import logging
 
+from datetime import datetime, timedelta
 from sqlalchemy.future import select
-from sqlalchemy import Table, insert
+from sqlalchemy import Table, insert, update, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, Type, Any, Tuple, Dict, Union, Callable
 
-from bot.database.models import User, Project
+from bot.database.models import User, Project, Tokenomics, BasicMetrics, ProviderId, ProjectMetadata
 from bot.utils.common.sessions import redis_client
+from bot.utils.common.consts import PROVIDER_IDS_UPSERT_BATCH
 from bot.utils.common.decorators import save_execute
 from bot.utils.resources.exceptions.exceptions import (
     DatabaseError,
@@ -158,6 +161,250 @@ async def update_or_create_token(session: AsyncSession, token_data: dict) -> Tup
         return new_instance, True
 
 
+@save_execute
+async def get_stale_projects(
+    session: AsyncSession,
+    models: list[Type[Any]],
+    max_age: int,
+    limit: Optional[int] = None,
+) -> list[Any]:
+    """
+    Получить проекты, у которых данные хотя бы в одной из таблиц метрик устарели.
+
+    Аргументы:
+    - `models`: Модели метрик, свежесть которых проверяется (по полю fetched_at).
+    - `max_age`: Допустимый возраст данных в секундах.
+    - `limit`: Ограничение количества возвращаемых проектов.
+
+    Возвращает:
+    - Список проектов, у которых запись метрик отсутствует, не имеет отметки времени или старше max_age.
+      Сначала идут проекты с самыми старыми данными, при равенстве - с лучшим cmc_rank.
+    """
+    try:
+        threshold = datetime.now() - timedelta(seconds=max_age)
+        query = select(Project)
+
+        fetched_at_columns = []
+        for model in models:
+            query = query.outerjoin(model, model.project_id == Project.id)
+            fetched_at_columns.append(func.coalesce(model.fetched_at, datetime.min))
+
+        oldest_fetched_at = func.least(*fetched_at_columns)
+        query = (
+            query.filter(oldest_fetched_at < threshold)
+            .order_by(oldest_fetched_at.asc(), Project.cmc_rank.asc().nullslast())
+            .limit(limit)
+        )
+
+        result = await session.execute(query)
+        return result.scalars().all()
+    except SQLAlchemyError as e:
+        raise DatabaseFetchError(str(e))
+
+
+@save_execute
+async def bulk_upsert_tokens(session: AsyncSession, tokens: list[dict], create_symbols: set[str]) -> list[str]:
+    """
+    Массово обновляет рейтинг и рыночные данные токенов из ответа listings/latest одной транзакцией.
+
+    Аргументы:
+    - session: Сессия SQLAlchemy.
+    - tokens: Список словарей токенов в формате fetch_top_tokens (symbol, cmc_rank и рыночные данные).
+    - create_symbols: Символы, для которых создаётся проект, если его ещё нет в базе.
+      Для остальных токенов обновляются только уже существующие проекты.
+
+    Возвращает:
+    - Список символов созданных проектов.
+    """
+    try:
+        # При повторе символа в выдаче оставляем токен с лучшим рейтингом (он идёт первым)
+        tokens_by_symbol = {}
+        for token in tokens:
+            tokens_by_symbol.setdefault(token["symbol"], token)
+
+        result = await session.execute(select(Project).filter(Project.coin_name.in_(list(tokens_by_symbol))))
+        project_ids = {project.coin_name: project.id for project in result.scalars().all()}
+
+        if project_ids:
+            await session.execute(
+                update(Project),
+                [
+                    {"id": project_id, "cmc_rank": tokens_by_symbol[symbol].get("cmc_rank")}
+                    for symbol, project_id in project_ids.items()
+                ],
+            )
+
+        new_symbols = [symbol for symbol in tokens_by_symbol if symbol in create_symbols and symbol not in project_ids]
+        if new_symbols:
+            result = await session.execute(
+                insert(Project)
+                .values(
+                    [
+                        {"coin_name": symbol, "cmc_rank": tokens_by_symbol[symbol].get("cmc_rank")}
+                        for symbol in new_symbols
+                    ]
+                )
+                .returning(Project.id, Project.coin_name)
+            )
+            project_ids.update({coin_name: project_id for project_id, coin_name in result.all()})
+
+        fetched_at = datetime.now()
+        tokenomics_rows = []
+        basic_metrics_rows = []
+        for symbol, project_id in project_ids.items():
+            token = tokens_by_symbol[symbol]
+            if "price" not in token:
+                continue
+
+            tokenomics_rows.append(
+                {
+                    "project_id": project_id,
+                    "circ_supply": token.get("circulating_supply"),
+                    "total_supply": token.get("total_supply"),
+                    "capitalization": token.get("capitalization"),
+                    "fdv": token.get("coin_fdv"),
+                    "fetched_at": fetched_at,
+                    "source": "coinmarketcap",
+                }
+            )
+            if token["price"]:
+                basic_metrics_rows.append(
+                    {
+                        "project_id": project_id,
+                        "market_price": round(float(token["price"]), 4),
+                        "fetched_at": fetched_at,
+                        "source": "coinmarketcap",
+                    }
+                )
+
+        if tokenomics_rows:
+            statement = pg_insert(Tokenomics).values(tokenomics_rows)
+            await session.execute(
+                statement.on_conflict_do_update(
+                    index_elements=[Tokenomics.project_id],
+                    set_={
+                        "circ_supply": statement.excluded.circ_supply,
+                        "total_supply": statement.excluded.total_supply,
+                        "capitalization": statement.excluded.capitalization,
+                        "fdv": statement.excluded.fdv,
+                        "fetched_at": statement.excluded.fetched_at,
+                        "source": statement.excluded.source,
+                    },
+                )
+            )
+
+        if basic_metrics_rows:
+            statement = pg_insert(BasicMetrics).values(basic_metrics_rows)
+            await session.execute(
+                statement.on_conflict_do_update(
+                    index_elements=[BasicMetrics.project_id],
+                    set_={
+                        "market_price": statement.excluded.market_price,
+                        "fetched_at": statement.excluded.fetched_at,
+                        "source": statement.excluded.source,
+                    },
+                )
+            )
+
+        await session.commit()
+
+        logging.info(
+            f"Обновлены данные {len(project_ids)} токенов из листинга CoinMarketCap, "
+            f"создано проектов: {len(new_symbols)}"
+        )
+        return new_symbols
+    except SQLAlchemyError as e:
+        await session.rollback()
+        raise DatabaseError(str(e))
+
+
+@save_execute
+async def bulk_upsert_provider_ids(session: AsyncSession, provider: str, ids: dict[str, str]) -> int:
+    """
+    Массово записывает идентификаторы токенов одного сервиса в справочник provider_id.
+
+    Аргументы:
+    - session: Сессия SQLAlchemy.
+    - provider: Название сервиса.
+    - ids: Словарь {символ токена: идентификатор токена в сервисе}.
+
+    Возвращает:
+    - Количество записанных строк.
+    """
+    try:
+        rows = [
+            {"provider": provider, "symbol": symbol, "provider_id": provider_id}
+            for symbol, provider_id in ids.items()
+        ]
+
+        for start in range(0, len(rows), PROVIDER_IDS_UPSERT_BATCH):
+            statement = pg_insert(ProviderId).values(rows[start : start + PROVIDER_IDS_UPSERT_BATCH])
+            await session.execute(
+                statement.on_conflict_do_update(
+                    constraint="uq_provider_id_provider_symbol",
+                    set_={"provider_id": statement.excluded.provider_id, "updated_at": func.now()},
+                )
+            )
+
+        await session.commit()
+        return len(rows)
+    except SQLAlchemyError as e:
+        await session.rollback()
+        raise DatabaseError(str(e))
+
+
+@save_execute
+async def get_provider_ids(session: AsyncSession) -> list[Tuple[str, str, str]]:
+    """
+    Получить весь справочник идентификаторов токенов в виде строк (сервис, символ, идентификатор).
+    """
+    try:
+        result = await session.execute(select(ProviderId.provider, ProviderId.symbol, ProviderId.provider_id))
+        return [tuple(row) for row in result.all()]
+    except SQLAlchemyError as e:
+        raise DatabaseFetchError(str(e))
+
+
+@save_execute
+async def get_stored_projects_metadata(session: AsyncSession, symbols: list[str]) -> dict[str, dict]:
+    """
+    Получить сохранённые описания токенов из CoinMarketCap по списку символов.
+
+    Возвращает:
+    - Словарь {символ: описание токена в формате ProjectMetadata.to_dict()}.
+    """
+    try:
+        result = await session.execute(select(ProjectMetadata).filter(ProjectMetadata.symbol.in_(symbols)))
+        return {metadata.symbol: metadata.to_dict() for metadata in result.scalars().all()}
+    except SQLAlchemyError as e:
+        raise DatabaseFetchError(str(e))
+
+
+@save_execute
+async def bulk_upsert_projects_metadata(session: AsyncSession, rows: list[dict]):
+    """
+    Массово сохраняет описания токенов из CoinMarketCap (одна строка на символ).
+    """
+    try:
+        statement = pg_insert(ProjectMetadata).values(rows)
+        await session.execute(
+            statement.on_conflict_do_update(
+                index_elements=[ProjectMetadata.symbol],
+                set_={
+                    "name": statement.excluded.name,
+                    "description": statement.excluded.description,
+                    "twitter_links": statement.excluded.twitter_links,
+                    "categories": statement.excluded.categories,
+                    "fetched_at": statement.excluded.fetched_at,
+                },
+            )
+        )
+        await session.commit()
+    except SQLAlchemyError as e:
+        await session.rollback()
+        raise DatabaseError(str(e))
+
+
 @save_execute
 async def get_user_from_redis_or_db(session: AsyncSession, user_id: int) -> Optional[Dict[str, str]]:
     """
@@ -11,6 +11,8 @@ from sqlalchemy import (
     Text,
     BigInteger,
     Table,
+    UniqueConstraint,
+    JSON,
 )
 
 Base = declarative_base()
@@ -75,6 +77,49 @@ class Project(Base):
         }
 
 
+class ProviderId(Base):
+    __tablename__ = "provider_id"
+    __table_args__ = (UniqueConstraint("provider", "symbol", name="uq_provider_id_provider_symbol"),)
+
+    id = Column(Integer, primary_key=True, autoincrement=True, nullable=False)
+    provider = Column(String(50), nullable=False)
+    symbol = Column(String(100), nullable=False)
+    provider_id = Column(String(255), nullable=False)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "provider": self.provider,
+            "symbol": self.symbol,
+            "provider_id": self.provider_id,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+        }
+
+
+class ProjectMetadata(Base):
+    __tablename__ = "project_metadata"
+
+    id = Column(Integer, primary_key=True, autoincrement=True, nullable=False)
+    symbol = Column(String(100), unique=True, nullable=False)
+    name = Column(String(255), nullable=True)
+    description = Column(Text, nullable=True)
+    twitter_links = Column(JSON, nullable=True)
+    categories = Column(JSON, nullable=True)
+    fetched_at = Column(DateTime, nullable=True, index=True)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "symbol": self.symbol,
+            "name": self.name,
+            "description": self.description,
+            "twitter_links": self.twitter_links or [],
+            "categories": self.categories or [],
+            "fetched_at": self.fetched_at.isoformat() if self.fetched_at else None,
+        }
+
+
 class Category(Base):
     __tablename__ = "category"
 
@@ -117,6 +162,8 @@ class BasicMetrics(Base):
     project_id = Column(Integer, ForeignKey("project.id"), nullable=False, unique=True)
     entry_price = Column(Float, nullable=True)
     market_price = Column(Float, nullable=True)
+    fetched_at = Column(DateTime, nullable=True, index=True)
+    source = Column(String(50), nullable=True)
 
     project = relationship("Project", back_populates="basic_metrics")
 
@@ -136,6 +183,8 @@ class InvestingMetrics(Base):
     project_id = Column(Integer, ForeignKey("project.id"), nullable=False, unique=True)
     fundraise = Column(Float, nullable=True)
     fund_level = Column(Text, nullable=True)
+    fetched_at = Column(DateTime, nullable=True, index=True)
+    source = Column(String(50), nullable=True)
 
     project = relationship("Project", back_populates="investing_metrics")
 
@@ -155,6 +204,8 @@ class SocialMetrics(Base):
     project_id = Column(Integer, ForeignKey("project.id"), nullable=False, unique=True)
     twitter = Column(Text, nullable=True)
     twitterscore = Column(Integer, nullable=True)
+    fetched_at = Column(DateTime, nullable=True, index=True)
+    source = Column(String(50), nullable=True)
 
     project = relationship("Project", back_populates="social_metrics")
 
@@ -176,6 +227,8 @@ class Tokenomics(Base):
     total_supply = Column(Float, nullable=True)
     capitalization = Column(Float, nullable=True)
     fdv = Column(Float, nullable=True)
+    fetched_at = Column(DateTime, nullable=True, index=True)
+    source = Column(String(50), nullable=True)
 
     project = relationship("Project", back_populates="tokenomics")
 
@@ -196,6 +249,8 @@ class FundsProfit(Base):
     id = Column(Integer, primary_key=True, autoincrement=True, nullable=False)
     project_id = Column(Integer, ForeignKey("project.id"), nullable=False, unique=True)
     distribution = Column(Text, nullable=True)
+    fetched_at = Column(DateTime, nullable=True, index=True)
+    source = Column(String(50), nullable=True)
 
     project = relationship("Project", back_populates="funds_profit")
 
@@ -214,6 +269,8 @@ class TopAndBottom(Base):
     project_id = Column(Integer, ForeignKey("project.id"), nullable=False, unique=True)
     lower_threshold = Column(Float, nullable=True)
     upper_threshold = Column(Float, nullable=True)
+    fetched_at = Column(DateTime, nullable=True, index=True)
+    source = Column(String(50), nullable=True)
 
     project = relationship("Project", back_populates="top_and_bottom")
 
@@ -233,6 +290,8 @@ class MarketMetrics(Base):
     project_id = Column(Integer, ForeignKey("project.id"), nullable=False, unique=True)
     fail_high = Column(Float, nullable=True)
     growth_low = Column(Float, nullable=True)
+    fetched_at = Column(DateTime, nullable=True, index=True)
+    source = Column(String(50), nullable=True)
 
     project = relationship("Project", back_populates="market_metrics")
 
@@ -251,6 +310,8 @@ class ManipulativeMetrics(Base):
     id = Column(Integer, primary_key=True, autoincrement=True, nullable=False)
     project_id = Column(Integer, ForeignKey("project.id"), nullable=False, unique=True)
     top_100_wallet = Column(Float, nullable=True)
+    fetched_at = Column(DateTime, nullable=True, index=True)
+    source = Column(String(50), nullable=True)
 
     project = relationship("Project", back_populates="manipulative_metrics")
 
@@ -268,6 +329,8 @@ class NetworkMetrics(Base):
     id = Column(Integer, primary_key=True, autoincrement=True, nullable=False)
     project_id = Column(Integer, ForeignKey("project.id"), nullable=False, unique=True)
     tvl = Column(Float, nullable=True)
+    fetched_at = Column(DateTime, nullable=True, index=True)
+    source = Column(String(50), nullable=True)
 
     project = relationship("Project", back_populates="network_metrics")
 
@@ -41,8 +41,6 @@ from bot.utils.common.consts import (
     LISTING_PRICE_BETA_ENG,
     LIST_OF_TEXT_FOR_REBALANCING_BLOCK,
     LIST_OF_TEXT_FOR_ANALYSIS_BLOCK,
-    START_TITLE_FOR_GARBAGE_CATEGORIES,
-    END_TITLE_FOR_GARBAGE_CATEGORIES,
     LIST_OF_PROJECT_UPDATE_OR_CREATE,
 )
 from bot.utils.common.params import get_header_params
@@ -68,7 +66,7 @@ from bot.utils.resources.exceptions.exceptions import (
     ValueProcessingError,
     ExceptionError,
 )
-from bot.utils.resources.files_worker.google_doc import load_document_for_garbage_list
+from bot.utils.resources.files_worker.google_doc import get_reference_lists
 from bot.utils.resources.gpt.gpt import agent_handler
 from bot.utils.validations import validate_user_input
 
@@ -149,9 +147,7 @@ async def receive_basic_data(message: types.Message, state: FSMContext):
 
     user_coin_name = message.text.upper().replace(" ", "")
     user_data = await get_user_from_redis_or_db(message.from_user.id)
-    garbage_categories = load_document_for_garbage_list(
-        START_TITLE_FOR_GARBAGE_CATEGORIES, END_TITLE_FOR_GARBAGE_CATEGORIES
-    )
+    reference_lists = await get_reference_lists()
     language = user_data.get("language", "ENG")
 
     validate_answer = await validate_user_input(user_coin_name, message, state)
@@ -184,7 +180,7 @@ async def receive_basic_data(message: types.Message, state: FSMContext):
     # Получаем или создаём категории в БД
     category_instances = []
     for category_name in categories:
-        if category_name not in garbage_categories:
+        if not reference_lists.is_garbage_category(category_name):
             category_instance, _ = await get_or_create(Category, category_name=category_name)
             print("category_instance: ", category_instance.category_name)
             category_instances.append(category_instance)
@@ -416,9 +412,7 @@ async def receive_data(message: types.Message, state: FSMContext):
     fundraise = None
     calculation_record = None
     user_data = await get_user_from_redis_or_db(message.from_user.id)
-    garbage_categories = load_document_for_garbage_list(
-        START_TITLE_FOR_GARBAGE_CATEGORIES, END_TITLE_FOR_GARBAGE_CATEGORIES
-    )
+    reference_lists = await get_reference_lists()
     language = user_data.get("language", "ENG")
 
     validate_answer = await validate_user_input(user_coin_name, message, state)
@@ -451,7 +445,7 @@ async def receive_data(message: types.Message, state: FSMContext):
     # Получаем или создаём категории в БД
     category_instances = []
     for category_name in categories:
-        if category_name not in garbage_categories:
+        if not reference_lists.is_garbage_category(category_name):
             category_instance, _ = await get_or_create(Category, category_name=category_name)
             category_instances.append(category_instance)
 
@@ -489,7 +483,6 @@ async def receive_data(message: types.Message, state: FSMContext):
     network_metrics = project_info.get("network_metrics")
 
     header_params = get_header_params(coin_name=user_coin_name)
-    twitter_name, description, lower_name, categories = await get_twitter_link_by_symbol(user_coin_name)
     twitter_link = REPLACED_PROJECT_TWITTER.get(twitter_name, twitter_name)
 
     try:
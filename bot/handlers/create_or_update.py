@@ -7,7 +7,7 @@ from bot.database.models import Project
 from bot.database.db_operations import get_one
 from bot.utils.common.bot_states import UpdateOrCreateProject
 from bot.utils.resources.bot_phrases.bot_phrase_handler import phrase_by_user
-from bot.utils.resources.files_worker.google_doc import load_document_for_garbage_list
+from bot.utils.resources.files_worker.google_doc import get_reference_lists
 from bot.utils.project_data import save_or_update_full_project_data, fetch_token_quote, fetch_categories
 from bot.utils.validations import (
     is_float,
@@ -20,8 +20,6 @@ from bot.utils.validations import (
 from bot.utils.common.consts import (
     LIST_OF_TEXT_FOR_UPDATE,
     LIST_OF_TEXT_FOR_CREATE,
-    START_TITLE_FOR_GARBAGE_CATEGORIES,
-    END_TITLE_FOR_GARBAGE_CATEGORIES,
 )
 
 create_or_update_router = Router()
@@ -91,11 +89,8 @@ async def get_categories(message: types.Message, state: FSMContext):
             categories = message.text.split("\n")
 
         all_categories = await fetch_categories()
-        garbage_categories = load_document_for_garbage_list(
-            START_TITLE_FOR_GARBAGE_CATEGORIES,
-            END_TITLE_FOR_GARBAGE_CATEGORIES,
-        )
-        valid_categories = [cat for cat in all_categories if cat not in garbage_categories]
+        reference_lists = await get_reference_lists()
+        valid_categories = [cat for cat in all_categories if not reference_lists.is_garbage_category(cat)]
         valid_project_categories = [cat for cat in categories if cat in valid_categories]
         await state.update_data(categories=valid_project_categories)
     await message.answer(await phrase_by_user("input_market_price", message.from_user.id))
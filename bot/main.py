@@ -12,8 +12,19 @@ from bot.utils.middlewares import RestoreStateMiddleware
 from bot.utils.validations import check_redis_connection
 from bot.utils.browser import close_browser, init_browser
 from bot.data_processing.data_update import fetch_crypto_data
-from bot.utils.common.sessions import SessionLocal, redis_client
-from bot.data_processing.data_pipeline import parse_categories_weekly, parse_tokens_weekly
+from bot.utils.common.sessions import SessionLocal, redis_client, init_http_clients, close_http_clients
+from bot.utils.common.cluster import run_cluster_heartbeat
+from bot.utils.common.loop_lag import monitor_loop_lag
+from bot.utils.common.runtime_stats import log_runtime_stats, periodically_log_runtime_stats
+from bot.data_processing.data_update import update_agent_answers
+from bot.data_processing.scheduler import start_scheduler, shutdown_scheduler
+from bot.data_processing.data_pipeline import parse_categories_weekly, parse_tokens_weekly, run_refresh_cycle
+from bot.utils.provider_ids import refresh_provider_ids
+from bot.utils.resources.gpt.gpt import periodically_refresh_prompts
+from bot.utils.resources.files_worker.google_doc import (
+    periodically_refresh_reference_lists,
+    listen_reference_lists_updates,
+)
 from bot.utils.resources.exceptions.exceptions import (
     ExceptionError,
     ValueProcessingError,
@@ -65,13 +76,29 @@ async def main():
 
             dp.update.middleware(RestoreStateMiddleware(SessionLocal))
 
+            await init_http_clients()
             await init_browser()
 
             logging.info("Запуск периодического обновления данных.")
+            asyncio.create_task(monitor_loop_lag())
+            asyncio.create_task(periodically_log_runtime_stats())
+            asyncio.create_task(run_cluster_heartbeat())
+            asyncio.create_task(periodically_refresh_reference_lists())
+            asyncio.create_task(listen_reference_lists_updates())
+            asyncio.create_task(periodically_refresh_prompts())
             asyncio.create_task(fetch_crypto_data())
-            asyncio.create_task(parse_categories_weekly())
-            asyncio.create_task(parse_tokens_weekly())
-            asyncio.create_task(backup_database())
+
+            # Периодические задачи запускаются по расписанию с учётом времени их последнего запуска
+            await start_scheduler(
+                {
+                    "refresh_cycle": run_refresh_cycle,
+                    "agent_answers": update_agent_answers,
+                    "parse_categories": parse_categories_weekly,
+                    "parse_tokens": parse_tokens_weekly,
+                    "backup_database": backup_database,
+                    "refresh_provider_ids": refresh_provider_ids,
+                }
+            )
 
             await dp.start_polling(bot)
 
@@ -85,7 +112,10 @@ async def main():
         raise ExceptionError(str(e))
 
     finally:
+        log_runtime_stats()
+        shutdown_scheduler()
         await close_browser()
+        await close_http_clients()
         logger.info("Завершение работы бота.")
 
 
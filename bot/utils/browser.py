@@ -1,16 +1,232 @@
+import time
+import asyncio
 import logging
 
-from playwright.async_api import async_playwright
+from typing import AsyncIterator, Optional
+from urllib.parse import urlparse
+from collections import Counter, deque
+from contextlib import asynccontextmanager
+
+from playwright.async_api import async_playwright, BrowserContext, Page, Request, Route
+
+from bot.utils.common.consts import (
+    BROWSER_PAGE_POOL_SIZE,
+    BROWSER_PAGE_MAX_USES,
+    BROWSER_PAGE_WAIT_SAMPLES,
+    BROWSER_PAGE_WAIT_WARNING_THRESHOLD,
+    SCRAPE_TEXT_POLLING,
+    SCRAPE_LATENCY_SAMPLES,
+    SCRAPE_BLOCKED_RESOURCE_TYPES,
+    SCRAPE_ALLOWED_RESOURCE_TYPES,
+    SCRAPE_BLOCKED_DOMAINS,
+    API_HOSTS,
+)
+from bot.utils.common.rate_limiter import acquire
 
 browser = None
 context = None
+page_pool = None
+
+# Количество пропущенных и заблокированных браузером запросов
+_route_stats: Counter = Counter()
+
+# Длительность сбора данных по сервисам: {сервис: [(секунды, данные найдены)]}
+_scrape_latencies: dict[str, deque] = {}
+
+# Возвращает текст элемента, когда он появился, содержит required и не изменился с предыдущей проверки
+# (значения на страницах часто дописываются скриптами или анимируются)
+STABLE_TEXT_SCRIPT = """
+([selector, required]) => {
+    const text = document.querySelector(selector)?.innerText?.trim();
+    if (!text || !text.includes(required)) return null;
+    const previous = window.__stableText || {};
+    window.__stableText = {...previous, [selector]: text};
+    return previous[selector] === text ? text : null;
+}
+"""
+
+
+def percentile(samples, percent: float) -> float:
+    """
+    Возвращает перцентиль замеров или 0, если замеров нет.
+    """
+
+    if not samples:
+        return 0.0
+
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+
+class PagePool:
+    """
+    Пул вкладок браузера: одновременно открыто не больше size вкладок, остальные запросы ждут свободную.
+    Возвращённая вкладка сбрасывается (снимаются перехваты запросов, открывается пустая страница)
+    и используется повторно, пока не наберёт BROWSER_PAGE_MAX_USES использований.
+    """
+
+    def __init__(self, context: BrowserContext, size: int = BROWSER_PAGE_POOL_SIZE):
+        self.context = context
+        self.size = size
+        self.semaphore = asyncio.Semaphore(size)
+        self.in_use = 0
+        self.idle: list[Page] = []
+        self.uses: dict[Page, int] = {}
+        self.wait_times: deque[float] = deque(maxlen=BROWSER_PAGE_WAIT_SAMPLES)
+        self.stats: Counter = Counter()
+
+    async def checkout(self) -> Page:
+        """
+        Выдаёт свободную вкладку, при необходимости дожидаясь её. Вкладку нужно вернуть через release.
+        """
+
+        started_at = time.perf_counter()
+        await self.semaphore.acquire()
+
+        wait_time = time.perf_counter() - started_at
+        self.wait_times.append(wait_time)
+        if wait_time > BROWSER_PAGE_WAIT_WARNING_THRESHOLD:
+            logging.warning(f"Ожидание свободной вкладки браузера заняло {wait_time:.1f} с")
+
+        try:
+            page = None
+            while self.idle and page is None:
+                page = self.idle.pop()
+                if page.is_closed():
+                    self.uses.pop(page, None)
+                    page = None
+
+            if page is None:
+                page = await self.context.new_page()
+                self.uses[page] = 0
+                self.stats["created"] += 1
+            else:
+                self.stats["reused"] += 1
+        except BaseException:
+            self.semaphore.release()
+            raise
+
+        self.in_use += 1
+        return page
+
+    async def release(self, page: Page, reusable: bool = True):
+        """
+        Возвращает вкладку в пул. Вкладка, на которой произошла ошибка (reusable=False),
+        отработавшая BROWSER_PAGE_MAX_USES раз или не сбросившаяся, закрывается.
+        """
+
+        try:
+            self.uses[page] = self.uses.get(page, 0) + 1
+            if reusable and not page.is_closed() and self.uses[page] < BROWSER_PAGE_MAX_USES:
+                try:
+                    await page.unroute_all(behavior="ignoreErrors")
+                    await page.goto("about:blank")
+                    self.idle.append(page)
+                    return
+                except Exception as e:
+                    logging.warning(f"Не удалось сбросить вкладку браузера: {e}")
+
+            self.uses.pop(page, None)
+            self.stats["closed"] += 1
+            if not page.is_closed():
+                await page.close()
+        except Exception as e:
+            logging.error(f"Ошибка при закрытии вкладки браузера: {e}")
+        finally:
+            self.in_use -= 1
+            self.semaphore.release()
+
+    @asynccontextmanager
+    async def page(self) -> AsyncIterator[Page]:
+        """
+        Вкладка из пула на время блока with; при исключении внутри блока вкладка не используется повторно.
+        """
+
+        page = await self.checkout()
+        reusable = False
+        try:
+            yield page
+            reusable = True
+        finally:
+            await self.release(page, reusable)
+
+    def summary(self) -> dict:
+        """
+        Состояние пула и время ожидания свободной вкладки (в миллисекундах).
+        """
+
+        return {
+            "size": self.size,
+            "in_use": self.in_use,
+            "idle": len(self.idle),
+            "created": self.stats["created"],
+            "reused": self.stats["reused"],
+            "closed": self.stats["closed"],
+            "wait_p50": percentile(self.wait_times, 50) * 1000,
+            "wait_p95": percentile(self.wait_times, 95) * 1000,
+            "wait_max": max(self.wait_times, default=0.0) * 1000,
+        }
+
+
+def get_site(url: str) -> Optional[str]:
+    """
+    Возвращает сервис (ключ PROVIDER_HOSTS), которому принадлежит страница, или None.
+    """
+
+    for site, host in API_HOSTS.items():
+        if url == host or url.startswith(f"{host}/"):
+            return site
+
+    return None
+
+
+def is_blocked_request(request: Request) -> bool:
+    """
+    Проверяет, нужно ли заблокировать запрос страницы: запросы к счётчикам и рекламе блокируются всегда,
+    ресурсы из SCRAPE_BLOCKED_RESOURCE_TYPES - если они не разрешены для сервиса, на странице которого загружаются.
+    """
+
+    hostname = urlparse(request.url).hostname or ""
+    if any(hostname == domain or hostname.endswith(f".{domain}") for domain in SCRAPE_BLOCKED_DOMAINS):
+        return True
+
+    if request.resource_type not in SCRAPE_BLOCKED_RESOURCE_TYPES:
+        return False
+
+    try:
+        site = get_site(request.frame.page.url)
+    except Exception:
+        site = None
+
+    return request.resource_type not in SCRAPE_ALLOWED_RESOURCE_TYPES.get(site, ())
+
+
+async def route_request(route: Route):
+    """
+    Обработчик всех запросов контекста браузера: лишние ресурсы не загружаются.
+    """
+
+    if is_blocked_request(route.request):
+        _route_stats["blocked"] += 1
+        await route.abort()
+    else:
+        _route_stats["allowed"] += 1
+        await route.continue_()
+
+
+def get_route_stats() -> dict[str, int]:
+    """
+    Количество пропущенных и заблокированных запросов браузера.
+    """
+
+    return {"allowed": _route_stats["allowed"], "blocked": _route_stats["blocked"]}
 
 
 async def init_browser():
     """
     Инициализирует браузер Playwright один раз.
     """
-    global browser, context
+    global browser, context, page_pool
     playwright = await async_playwright().start()
     browser = await playwright.chromium.launch(
         headless=True,
@@ -25,10 +241,103 @@ async def init_browser():
             "--blink-settings=imagesEnabled=false",
         ],
     )
-    context = await browser.new_context()
+    # Облегчённый профиль для сбора данных: без service worker'ов и анимаций, лишние запросы блокируются
+    context = await browser.new_context(service_workers="block", reduced_motion="reduce")
+    await context.route("**/*", route_request)
+    page_pool = PagePool(context)
     logging.info("✅ Браузер Playwright инициализирован.")
 
 
+@asynccontextmanager
+async def browser_page(provider: Optional[str] = None) -> AsyncIterator[Page]:
+    """
+    Вкладка из общего пула браузера (см. PagePool.page).
+    Если указан сервис (ключ PROVIDER_RATE_LIMITS), перед открытием страницы резервируется запрос из его квоты,
+    поэтому квота учитывает сбор данных и при обновлении проектов, и при анализе по запросу пользователя.
+    """
+
+    if page_pool is None:
+        raise RuntimeError("❌ Ошибка: контекст браузера не инициализирован!")
+
+    if provider:
+        await acquire(provider)
+
+    async with page_pool.page() as page:
+        yield page
+
+
+class ScrapeDeadline:
+    """
+    Крайний срок сбора данных со страницы: все ожидания Playwright получают оставшееся до него время.
+    """
+
+    def __init__(self, seconds: float):
+        self.started_at = time.perf_counter()
+        self.expires_at = self.started_at + seconds
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started_at
+
+    def timeout(self) -> float:
+        """
+        Оставшееся время в миллисекундах (не меньше 1 мс, так как 0 в Playwright отключает таймаут).
+        """
+
+        return max(1.0, (self.expires_at - time.perf_counter()) * 1000)
+
+
+async def wait_for_stable_text(page: Page, selector: str, timeout: float, required: str = "") -> str:
+    """
+    Ждёт, пока текст элемента загрузится (см. STABLE_TEXT_SCRIPT), и возвращает его.
+    Если текст не загрузился за timeout миллисекунд, Playwright выбрасывает TimeoutError.
+    """
+
+    handle = await page.wait_for_function(
+        STABLE_TEXT_SCRIPT,
+        arg=[selector, required],
+        timeout=timeout,
+        polling=SCRAPE_TEXT_POLLING,
+    )
+    return await handle.json_value()
+
+
+def record_scrape_latency(scraper: str, seconds: float, found: bool):
+    """
+    Записывает длительность сбора данных со страницы сервиса.
+    """
+
+    _scrape_latencies.setdefault(scraper, deque(maxlen=SCRAPE_LATENCY_SAMPLES)).append((seconds, found))
+    logging.info(f"Сбор данных {scraper} занял {seconds:.2f} с ({'данные найдены' if found else 'данных нет'})")
+
+
+def get_scrape_latency_stats() -> dict[str, dict]:
+    """
+    Длительность сбора данных по сервисам (в миллисекундах) и доля попыток, в которых данные найдены.
+    """
+
+    stats = {}
+    for scraper, samples in _scrape_latencies.items():
+        latencies = [seconds for seconds, _ in samples]
+        stats[scraper] = {
+            "samples": len(samples),
+            "found_rate": sum(found for _, found in samples) / len(samples),
+            "p50": percentile(latencies, 50) * 1000,
+            "p95": percentile(latencies, 95) * 1000,
+            "max": max(latencies) * 1000,
+        }
+
+    return stats
+
+
+def get_page_pool_stats() -> Optional[dict]:
+    """
+    Сводка по пулу вкладок или None, если браузер не запущен.
+    """
+
+    return page_pool.summary() if page_pool else None
+
+
 async def close_browser():
     """
     Закрывает браузер при завершении работы бота.
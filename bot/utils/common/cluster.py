@@ -0,0 +1,141 @@
+import time
+import asyncio
+import bisect
+import hashlib
+import logging
+
+from bot.utils.common.config import REPLICA_ID
+from bot.utils.common.sessions import redis_client
+from bot.utils.common.redis_lock import acquire_lock, release_lock
+from bot.utils.common.consts import (
+    CLUSTER_REPLICAS_KEY,
+    CLUSTER_LEADER_LOCK,
+    CLUSTER_HEARTBEAT_INTERVAL,
+    CLUSTER_REPLICA_TTL,
+    CLUSTER_VIRTUAL_NODES,
+)
+
+_is_leader = False
+# Выполнено ли хотя бы одно обновление состояния кластера (до него список реплик неизвестен)
+_joined = False
+_replicas: tuple[str, ...] = (REPLICA_ID,)
+_ring_hashes: list[int] = []
+_ring_owners: list[str] = []
+
+
+def stable_hash(value: str) -> int:
+    """
+    Хэш, одинаковый во всех процессах (в отличие от встроенного hash()).
+    """
+
+    return int.from_bytes(hashlib.md5(value.encode("utf-8")).digest()[:8], "big")
+
+
+def build_ring(replicas: tuple[str, ...]):
+    """
+    Строит кольцо консистентного хеширования: у каждой реплики CLUSTER_VIRTUAL_NODES точек на кольце.
+    При добавлении или остановке реплики меняется владелец только у части проектов.
+    """
+
+    global _replicas, _ring_hashes, _ring_owners
+
+    points = sorted(
+        (stable_hash(f"{replica}#{index}"), replica) for replica in replicas for index in range(CLUSTER_VIRTUAL_NODES)
+    )
+    _ring_hashes = [point for point, _ in points]
+    _ring_owners = [replica for _, replica in points]
+    _replicas = replicas
+
+
+def get_shard_owner(project_id: int) -> str:
+    """
+    Возвращает реплику, которая отвечает за проект.
+    """
+
+    if not _ring_hashes:
+        build_ring(_replicas)
+
+    index = bisect.bisect(_ring_hashes, stable_hash(f"project:{project_id}")) % len(_ring_hashes)
+    return _ring_owners[index]
+
+
+def owns_project(project_id: int) -> bool:
+    """
+    Проверяет, отвечает ли текущая реплика за проект.
+    До первого обновления состояния кластера реплика не знает о других репликах и не отвечает ни за один проект,
+    иначе сразу после запуска все реплики взялись бы за все проекты.
+    """
+
+    if not _joined:
+        return False
+
+    return get_shard_owner(project_id) == REPLICA_ID
+
+
+def get_replica_count() -> int:
+    """
+    Возвращает число активных реплик по последнему обновлению состояния кластера.
+    """
+
+    return max(1, len(_replicas))
+
+
+def is_leader() -> bool:
+    """
+    Проверяет, является ли текущая реплика лидером (выполняет задачи, которые нужны в одном экземпляре).
+    """
+
+    return _is_leader
+
+
+async def heartbeat():
+    """
+    Подтверждает, что реплика жива, обновляет список активных реплик и пытается стать (или остаться) лидером.
+    """
+
+    global _is_leader, _joined
+
+    now = time.time()
+
+    async with redis_client.pipeline(transaction=True) as pipe:
+        pipe.zadd(CLUSTER_REPLICAS_KEY, {REPLICA_ID: now})
+        pipe.zremrangebyscore(CLUSTER_REPLICAS_KEY, "-inf", now - CLUSTER_REPLICA_TTL)
+        pipe.zrange(CLUSTER_REPLICAS_KEY, 0, -1)
+        _, _, replicas = await pipe.execute()
+
+    replicas = tuple(sorted(set(replicas) | {REPLICA_ID}))
+    if replicas != _replicas or not _ring_hashes:
+        build_ring(replicas)
+        logging.info(f"[cluster] Активные реплики: {', '.join(replicas)}")
+    _joined = True
+
+    leader = await acquire_lock(CLUSTER_LEADER_LOCK, ttl=CLUSTER_REPLICA_TTL)
+    if leader != _is_leader:
+        logging.info(f"[cluster] Реплика {REPLICA_ID} {'стала лидером' if leader else 'больше не лидер'}")
+    _is_leader = leader
+
+
+async def run_cluster_heartbeat():
+    """
+    Фоновая задача участия реплики в кластере.
+    При остановке реплика снимает блокировку лидера и удаляется из списка активных реплик.
+    """
+
+    global _is_leader
+
+    try:
+        while True:
+            try:
+                await heartbeat()
+            except Exception as e:
+                # Без связи с Redis нельзя быть уверенным в лидерстве
+                _is_leader = False
+                logging.error(f"[cluster] Ошибка при обновлении состояния реплики: {e}")
+
+            await asyncio.sleep(CLUSTER_HEARTBEAT_INTERVAL)
+    finally:
+        try:
+            await release_lock(CLUSTER_LEADER_LOCK)
+            await redis_client.zrem(CLUSTER_REPLICAS_KEY, REPLICA_ID)
+        except Exception as e:
+            logging.error(f"[cluster] Ошибка при выходе реплики из кластера: {e}")
@@ -1,4 +1,5 @@
 import os
+import socket
 
 from dotenv import load_dotenv
 
@@ -18,6 +19,12 @@ DB_PASSWORD = os.getenv("DB_PASSWORD")
 REDIS_HOST = os.getenv("REDIS_HOST")
 REDIS_PORT = os.getenv("REDIS_PORT")
 
+# Адрес локального сервера-заглушки внешних сервисов (для замеров без обращения к реальным API)
+PROVIDER_STUB_URL = os.getenv("PROVIDER_STUB_URL")
+
+# Идентификатор экземпляра бота (контейнера), используется для распределённых блокировок
+REPLICA_ID = os.getenv("REPLICA_ID") or f"{socket.gethostname()}-{os.getpid()}"
+
 S3_URL = os.getenv("S3_URL")
 S3_AWS_STORAGE_BUCKET_NAME = os.getenv("S3_AWS_STORAGE_BUCKET_NAME")
 S3_REGION = os.getenv("S3_REGION")
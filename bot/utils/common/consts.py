@@ -1,6 +1,6 @@
 import re
 
-from bot.utils.common.config import engine_url
+from bot.utils.common.config import engine_url, PROVIDER_STUB_URL
 from bot.database.models import (
     BasicMetrics,
     InvestingMetrics,
@@ -87,6 +87,10 @@ DOCUMENT_GARBAGE_LIST_URL = (
 # Документ с промтами
 DOCUMENT_ID = "1_NHFo4b4FmWNxZn6ycQsjm_KaWGdG-mHp6SGCjtPvgI"
 DOCUMENT_URL = f"https://docs.google.com/document/d/{DOCUMENT_ID}/export?format=txt"
+# Интервал фонового обновления промтов (в секундах)
+PROMPTS_REFRESH_INTERVAL = 60 * 30
+# Минимальная пауза между повторными попытками загрузки, если документ недоступен (в секундах)
+PROMPTS_RETRY_INTERVAL = 60
 
 
 # Настройки модели GPT
@@ -117,8 +121,6 @@ CALCULATIONS_PATTERN_RU = r"(Результаты расчета для.*?)$"
 CALCULATIONS_PATTERN_ENG = r"(Calculation results for.*?)$"
 COMPARISON_PATTERN_RU = r"Сравнение\s*проекта\s*с\s*другими,\s*схожими\s*по\s*уровню\s*и\s*категории:"
 COMPARISON_PATTERN_ENG = r"Comparing\s*the\s*project\s*with\s*others\s*similar\s*in\s*level\s*and\s*category:"
-PATTERN_FOR_GARBAGE_LIST_WITH_END_TITLE = r"{start_title}(.*?)(?=\n{end_title})"
-PATTERN_FOR_GARBAGE_LIST_WITHOUT_END_TITLE = r"{start_title}(.*)"
 
 
 # Токены и их категории
@@ -449,17 +451,29 @@ PROJECT_POINTS_ENG = r"Overall project evaluation\s*([\d.]+)\s*points\s*\((.+?)\
 PROJECT_ANALYSIS = r"Анализ проекта .+?\(\$\w+?\)|Project analysis .+?\(\$\w+?\)"
 
 
-# Заголовки, между которыми находятся категории
+# Заголовки разделов документа со справочными списками (категории, стейблкоины и т.д.)
 START_TITLE_FOR_GARBAGE_CATEGORIES = "Мусорный список категорий:"
-END_TITLE_FOR_GARBAGE_CATEGORIES = "Список фундаментала:"
-# Заголовки, между которыми находятся стейблкоины
-START_TITLE_FOR_STABLECOINS = "Список стейблов:"
-END_TITLE_FOR_STABLECOINS = "Список скама:"
-# Заголовки, между которыми находятся фундаментальные токены
 START_TITLE_FOR_FUNDAMENTAL = "Список фундаментала:"
-END_TITLE_FOR_FUNDAMENTAL = "Список стейблов:"
-# Заголовки, между которыми находятся скам-токены
+START_TITLE_FOR_STABLECOINS = "Список стейблов:"
 START_TITLE_FOR_SCAM_TOKENS = "Список скама:"
+# Соответствие заголовка раздела и поля справочника, в которое он разбирается
+REFERENCE_LIST_SECTIONS = {
+    START_TITLE_FOR_GARBAGE_CATEGORIES: "garbage_categories",
+    START_TITLE_FOR_FUNDAMENTAL: "fundamental",
+    START_TITLE_FOR_STABLECOINS: "stablecoins",
+    START_TITLE_FOR_SCAM_TOKENS: "scam_tokens",
+}
+# Интервал фонового обновления справочных списков (в секундах)
+REFERENCE_LISTS_REFRESH_INTERVAL = 60 * 30
+# Минимальная пауза между повторными попытками загрузки, если документ недоступен (в секундах)
+REFERENCE_LISTS_RETRY_INTERVAL = 60
+# Ключи Redis для общих между репликами справочных списков
+REFERENCE_LISTS_REDIS_PREFIX = "reference_lists"
+REFERENCE_LISTS_VERSION_KEY = "reference_lists:version"
+REFERENCE_LISTS_CHANNEL = "reference_lists:updates"
+REFERENCE_LISTS_REFRESHER_LOCK = "reference_lists:refresher"
+# Время жизни опубликованной версии справочных списков в Redis (в секундах)
+REFERENCE_LISTS_REDIS_TTL = 60 * 60 * 24 * 7
 
 # Константы для оценки метрик
 TIER_RANK = {"Tier: 1": 1, "Tier: 2": 2, "Tier: 3": 3, "Tier: 4": 4}
@@ -668,23 +682,301 @@ CATEGORY_MAP = {
 }
 
 
+# Адреса внешних сервисов
+PROVIDER_HOSTS = {
+    "coinmarketcap": "https://pro-api.coinmarketcap.com",
+    "coincarp": "https://www.coincarp.com",
+    "cryptorank": "https://cryptorank.io",
+    "cryptorank_api": "https://api.cryptorank.io",
+    "tokenomist": "https://tokenomist.ai",
+    "twitterscore": "https://twitterscore.io",
+    "coingecko": "https://api.coingecko.com",
+    "cryptocompare": "https://min-api.cryptocompare.com",
+    "binance": "https://api.binance.com",
+    "defillama": "https://api.llama.fi",
+}
+# Если задан PROVIDER_STUB_URL, запросы ко всем сервисам идут на локальный сервер-заглушку
+# (bot/utils/common/provider_stub.py), который различает сервисы по первому сегменту пути
+API_HOSTS = {
+    name: f"{PROVIDER_STUB_URL.rstrip('/')}/{name}" if PROVIDER_STUB_URL else host
+    for name, host in PROVIDER_HOSTS.items()
+}
+
 # API для вызова
-COINMARKETCUP_API = f"https://pro-api.coinmarketcap.com/v1/cryptocurrency/"
-COINCARP_API = "https://www.coincarp.com/currencies/"
-CRYPTORANK_WEBSITE = "https://cryptorank.io/"
-CRYPTORANK_API_URL = "https://api.cryptorank.io/v2/currencies"
-TOKENOMIST_API = "https://tokenomist.ai/"
-TWITTERSCORE_API = "https://twitterscore.io/"
-COINGECKO_API = "https://api.coingecko.com/api/v3/coins/"
-CRYPTOCOMPARE_API = "https://min-api.cryptocompare.com/data/v2/histoday"
-BINANCE_API = "https://api.binance.com/api/v3/"
-LLAMA_API_BASE = "https://api.llama.fi/v2/historicalChainTvl/"
-LLAMA_API_PROTOCOL = "https://api.llama.fi/protocol/"
+COINMARKETCUP_API = f"{API_HOSTS['coinmarketcap']}/v1/cryptocurrency/"
+COINCARP_API = f"{API_HOSTS['coincarp']}/currencies/"
+CRYPTORANK_WEBSITE = f"{API_HOSTS['cryptorank']}/"
+CRYPTORANK_API_URL = f"{API_HOSTS['cryptorank_api']}/v2/currencies"
+TOKENOMIST_API = f"{API_HOSTS['tokenomist']}/"
+TWITTERSCORE_API = f"{API_HOSTS['twitterscore']}/"
+COINGECKO_API = f"{API_HOSTS['coingecko']}/api/v3/coins/"
+CRYPTOCOMPARE_API = f"{API_HOSTS['cryptocompare']}/data/v2/histoday"
+BINANCE_API = f"{API_HOSTS['binance']}/api/v3/"
+LLAMA_API_CHAINS = f"{API_HOSTS['defillama']}/v2/chains"
+LLAMA_API_PROTOCOLS = f"{API_HOSTS['defillama']}/protocols"
+
+# Локальный сервер-заглушка внешних сервисов: каталог записанных ответов (кассет) и адрес по умолчанию
+PROVIDER_STUB_CASSETTES_DIR = "cassettes"
+PROVIDER_STUB_HOST = "127.0.0.1"
+PROVIDER_STUB_PORT = 8089
+# Заголовки, которые сохраняются в кассете вместе с ответом
+PROVIDER_STUB_RECORDED_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Retry-After")
+# Пауза, которую заглушка передаёт в Retry-After при искусственном отказе по лимиту (в секундах)
+PROVIDER_STUB_RETRY_AFTER = 1
+
+
+# Бюджеты запросов к внешним сервисам: запросов в минуту, допустимый всплеск и максимум одновременных запросов
+PROVIDER_RATE_LIMITS = {
+    "coinmarketcap": {"per_minute": 30, "burst": 5, "concurrency": 5},
+    "coingecko": {"per_minute": 10, "burst": 3, "concurrency": 3},
+    "cryptocompare": {"per_minute": 50, "burst": 10, "concurrency": 8},
+    "binance": {"per_minute": 600, "burst": 50, "concurrency": 10},
+    "defillama": {"per_minute": 60, "burst": 10, "concurrency": 8},
+    "cryptorank": {"per_minute": 30, "burst": 5, "concurrency": 5},
+    "twitterscore": {"per_minute": 10, "burst": 2, "concurrency": 2},
+    "coincarp": {"per_minute": 10, "burst": 2, "concurrency": 2},
+    "openai": {"per_minute": 300, "burst": 20, "concurrency": 10},
+}
+# Ответы сервиса о превышении лимита запросов (Binance при повторных нарушениях отвечает 418)
+RATE_LIMIT_STATUSES = (418, 429)
+# Сколько раз повторяется запрос, получивший отказ по лимиту
+RATE_LIMIT_MAX_RETRIES = 3
+# Пауза после отказа по лимиту без заголовка Retry-After, удваивается с каждой попыткой (в секундах)
+RATE_LIMIT_DEFAULT_BACKOFF = 10
+# Максимальная пауза после отказа по лимиту (в секундах)
+RATE_LIMIT_MAX_BACKOFF = 300
+# Во сколько раз уменьшается допустимое число одновременных запросов после отказа по лимиту
+RATE_LIMIT_DECREASE_FACTOR = 0.5
+# Вёдра токенов общие для всех реплик и хранятся в Redis с этим префиксом
+RATE_LIMIT_REDIS_PREFIX = "rate_limit"
+
+# Кэширование ответов внешних сервисов: фрагмент адреса запроса и время, в течение которого ответ свежий
+# (в секундах). Для каждого запроса применяется первое подходящее правило, запросы без правила или с правилом None
+# не кэшируются. Список токенов и история цен (график CoinGecko, свечи Binance) не кэшируются:
+# результат их разбора уже сохраняется (справочник идентификаторов, метрики TopAndBottom)
+HTTP_CACHE_POLICIES = {
+    "coingecko": (
+        ("/market_chart", None),
+        ("/coins/list", None),
+        ("/coins/", 60 * 60 * 24),
+    ),
+    "cryptorank": (
+        ("/ico/", 60 * 60 * 24),
+        ("/v2/currencies", 60 * 60 * 24 * 7),
+    ),
+    "binance": (("/klines", None),),
+}
+HTTP_CACHE_REDIS_PREFIX = "http_cache"
+# Сколько устаревший ответ хранится после истечения свежести для условного запроса (ETag/Last-Modified)
+HTTP_CACHE_STALE_TTL = 60 * 60 * 24 * 7
+# Максимум ответов во внутрипроцессном кэше и их суммарный размер (в байтах)
+HTTP_CACHE_L1_MAX_ENTRIES = 500
+HTTP_CACHE_L1_MAX_BYTES = 32 * 1024 * 1024
+# Ответы больше этого размера (в байтах) не кэшируются и передаются без полного чтения в память
+HTTP_CACHE_MAX_BODY_SIZE = 256 * 1024
+
+# Сервисы, идентификаторы токенов в которых хранятся в справочнике (таблица provider_id)
+PROVIDER_ID_SOURCES = ("coinmarketcap", "coingecko", "cryptorank", "coincarp", "defillama")
+# Как часто реплика перечитывает справочник идентификаторов из базы (в секундах)
+PROVIDER_IDS_RELOAD_INTERVAL = 60 * 60
+# Размер страницы и максимум токенов при загрузке ключей CryptoRank
+CRYPTORANK_IDS_PAGE_SIZE = 1000
+CRYPTORANK_IDS_LIMIT = 5000
+# Количество строк справочника идентификаторов в одном запросе записи
+PROVIDER_IDS_UPSERT_BATCH = 5000
+
+# Источники исторических максимума и минимума цены в порядке опроса по умолчанию
+PRICE_HISTORY_SOURCES = ("cryptocompare_symbol", "cryptocompare_full_name", "binance", "coingecko")
+# Сколько ждать ответа одного источника истории цены (в секундах)
+PRICE_HISTORY_SOURCE_TIMEOUT = 15
+# После скольких неудач подряд источник временно исключается из опроса
+CIRCUIT_BREAKER_FAILURE_THRESHOLD = 5
+# Через сколько исключённый источник снова пробуется одним запросом (в секундах)
+CIRCUIT_BREAKER_RECOVERY_TIMEOUT = 120
+# Вес нового замера в скользящих средних доли успехов и времени ответа источника
+PROVIDER_HEALTH_SMOOTHING = 0.2
+
+
+# Настройки пулов HTTP-соединений по сервисам: максимум соединений и общий таймаут запроса (в секундах)
+HTTP_CLIENT_SETTINGS = {
+    "default": {"limit": 20, "timeout": 30},
+    "coinmarketcap": {"limit": 10, "timeout": 30},
+    "coingecko": {"limit": 10, "timeout": 30},
+    "cryptocompare": {"limit": 10, "timeout": 30},
+    "binance": {"limit": 10, "timeout": 30},
+    "defillama": {"limit": 10, "timeout": 30},
+    "cryptorank": {"limit": 10, "timeout": 30},
+    "google": {"limit": 4, "timeout": 60},
+}
+HTTP_CONNECT_TIMEOUT = 10
+HTTP_KEEPALIVE_TIMEOUT = 30
+HTTP_DNS_CACHE_TTL = 300
+# Размер части тела ответа при потоковом разборе JSON (в байтах)
+JSON_STREAM_CHUNK_SIZE = 64 * 1024
+
+# Количество проектов, обновляемых конвейером одновременно
+PIPELINE_CONCURRENCY = 8
+# Максимальное количество проектов, обновляемых конвейером
+PIPELINE_PROJECTS_LIMIT = 1000
+# Количество токенов, запрашиваемых из листинга CoinMarketCap
+CMC_LISTINGS_LIMIT = 1500
+# Максимальное количество символов в одном запросе котировок CoinMarketCap
+CMC_QUOTES_BATCH_SIZE = 100
+# Максимальное количество символов в одном запросе описаний токенов CoinMarketCap (info)
+CMC_INFO_BATCH_SIZE = 100
+# Сколько описание токена из CoinMarketCap (название, описание, твиттер, категории) считается актуальным (в секундах)
+PROJECT_METADATA_TTL = 60 * 60 * 24 * 30
+# Через сколько повторно запрашивается токен, которого не было в CoinMarketCap (в секундах):
+# только что добавленный токен не должен месяц оставаться без описания
+PROJECT_METADATA_MISSING_TTL = 60 * 60 * 6
+
+# Как долго используются загруженные текущие TVL всех блокчейнов и протоколов DefiLlama (в секундах)
+TVL_SNAPSHOT_TTL = 60 * 60
+
+# Узлы графа, результаты которых нужны каждой группе метрик
+REFRESH_GROUP_NODES = {
+    "static": ("metadata", "quote", "fundraise", "distribution"),
+    "weekly": ("metadata", "price", "history", "twitter", "top_100_wallets", "tvl"),
+    "dynamic": ("quote",),
+    "current_price": ("metadata", "price", "history"),
+}
+# Интервалы обновления групп метрик (в секундах)
+REFRESH_GROUP_INTERVALS = {
+    "static": 60 * 60 * 24 * 30 * 3,
+    "weekly": 60 * 60 * 24 * 7,
+    "dynamic": 60 * 60 * 24,
+    "current_price": 60 * 60 * 12,
+}
+# Как часто оркестратор проверяет, какие группы метрик пора обновить (в секундах)
+REFRESH_ORCHESTRATOR_TICK = 60 * 10
+# Через сколько повторять обновление группы метрик проекта после неудачной попытки (в секундах)
+REFRESH_FAILURE_BACKOFF = 60 * 60 * 6
+# Интервалы запуска задач планировщика (в секундах)
+SCHEDULED_JOBS = {
+    "refresh_cycle": REFRESH_ORCHESTRATOR_TICK,
+    "agent_answers": 60 * 60 * 12,
+    "parse_categories": 60 * 60 * 24 * 7,
+    "parse_tokens": 60 * 60 * 24 * 7,
+    "backup_database": 60 * 60 * 24,
+    "refresh_provider_ids": 60 * 60 * 24 * 7,
+}
+# Задачи, которые выполняет только реплика-лидер
+SINGLETON_JOBS = {"refresh_cycle", "parse_categories", "parse_tokens", "backup_database", "refresh_provider_ids"}
+SCHEDULER_REDIS_PREFIX = "scheduler"
+# Просроченные задачи после запуска стартуют в случайный момент этого окна (в секундах)
+SCHEDULER_START_JITTER = 60 * 10
+# Случайное смещение каждого запуска задачи (в секундах)
+SCHEDULER_JITTER = 60
+# Сколько допускается опоздание запуска задачи, прежде чем запуск будет пропущен (в секундах)
+SCHEDULER_MISFIRE_GRACE_TIME = 60 * 60
+# Реплики бота: список активных реплик, выбор лидера и распределение проектов между репликами
+CLUSTER_REPLICAS_KEY = "cluster:replicas"
+CLUSTER_LEADER_LOCK = "cluster:leader"
+# Как часто реплика подтверждает, что она жива (в секундах)
+CLUSTER_HEARTBEAT_INTERVAL = 30
+# Через сколько без подтверждения реплика считается остановленной (в секундах)
+CLUSTER_REPLICA_TTL = 90
+# Количество виртуальных узлов реплики на кольце консистентного хеширования
+CLUSTER_VIRTUAL_NODES = 64
+# Очередь задач обновления проектов (Redis Streams)
+PIPELINE_STREAM = "pipeline:jobs"
+PIPELINE_DEAD_LETTER_STREAM = "pipeline:jobs:dead"
+PIPELINE_CONSUMER_GROUP = "pipeline-workers"
+PIPELINE_STREAM_MAXLEN = 20000
+# Количество попыток выполнения задачи до переноса в очередь "мёртвых" задач
+PIPELINE_JOB_MAX_ATTEMPTS = 3
+# Через сколько незавершённую задачу упавшего обработчика может забрать другой (в миллисекундах)
+PIPELINE_JOB_CLAIM_IDLE = 30 * 60 * 1000
+# Время жизни отметки о поставленной в очередь задаче проекта (в секундах)
+PIPELINE_JOB_DEDUP_TTL = 60 * 60 * 24
+# Сколько ждать новых задач за один запрос к очереди (в миллисекундах)
+PIPELINE_WORKER_BLOCK = 5000
+# Группа метрик, которая отвечает за свежесть каждой таблицы метрик
+METRIC_REFRESH_GROUPS = {
+    "investing_metrics": "static",
+    "funds_profit": "static",
+    "social_metrics": "weekly",
+    "manipulative_metrics": "weekly",
+    "network_metrics": "weekly",
+    "tokenomics": "dynamic",
+    "basic_metrics": "current_price",
+    # Границы цены пишутся и еженедельным обновлением, и обновлением цены - свежесть определяет более частое
+    "top_and_bottom": "current_price",
+    "market_metrics": "current_price",
+}
+# Состояния метрик проекта в порядке возрастания необходимости обновления
+METRIC_STATES = ("fresh", "stale", "missing")
+# Источник данных, записываемый в поле source таблиц метрик
+METRIC_SOURCES = {
+    "investing_metrics": "cryptorank",
+    "funds_profit": "cryptorank",
+    "social_metrics": "twitterscore",
+    "manipulative_metrics": "coincarp",
+    "network_metrics": "defillama",
+    "top_and_bottom": "cryptocompare",
+    "market_metrics": "cryptocompare",
+}
+# Источник, записываемый при попытке обновления, на которой сервис не вернул данных: отметка времени
+# всё равно обновляется, чтобы проект без данных не попадал в выборку устаревших на каждом цикле
+METRIC_NO_DATA_SOURCE = "no_data"
+# Задержка цикла событий: как часто она измеряется и с какого значения считается блокировкой (в секундах)
+LOOP_LAG_SAMPLE_INTERVAL = 0.05
+LOOP_LAG_WARNING_THRESHOLD = 0.1
+# Допустимая задержка цикла событий в замере под нагрузкой (в секундах)
+LOOP_LAG_BENCHMARK_LIMIT = 0.005
+# Как часто сводка счётчиков (кэши, источники данных, браузер, очередь) пишется в лог (в секундах)
+RUNTIME_STATS_LOG_INTERVAL = 60 * 15
+
+# Пул вкладок браузера Playwright: максимум одновременно открытых вкладок
+BROWSER_PAGE_POOL_SIZE = 3
+# После скольких использований вкладка закрывается и заменяется новой (Chromium со временем накапливает память)
+BROWSER_PAGE_MAX_USES = 50
+# Сколько последних замеров ожидания свободной вкладки хранится для статистики
+BROWSER_PAGE_WAIT_SAMPLES = 1000
+# Ожидание свободной вкладки, после которого в лог пишется предупреждение (в секундах)
+BROWSER_PAGE_WAIT_WARNING_THRESHOLD = 30
+# Крайний срок сбора данных со страницы сервиса, включая загрузку страницы (в секундах)
+SCRAPE_DEADLINES = {"twitterscore": 30, "coincarp": 45}
+# Как часто проверяется текст элемента при ожидании данных; текст считается загруженным,
+# если он не изменился между двумя проверками (в миллисекундах)
+SCRAPE_TEXT_POLLING = 500
+# Сколько последних замеров длительности сбора данных хранится для каждого сервиса
+SCRAPE_LATENCY_SAMPLES = 1000
+# Типы ресурсов, которые браузер не загружает при сборе данных
+SCRAPE_BLOCKED_RESOURCE_TYPES = ("image", "media", "font", "stylesheet", "texttrack", "manifest", "other")
+# Типы ресурсов из SCRAPE_BLOCKED_RESOURCE_TYPES, которые всё же нужны страницам сервиса (ключи - как в PROVIDER_HOSTS)
+SCRAPE_ALLOWED_RESOURCE_TYPES = {
+    # На страницах CryptoRank и Tokenomist часть данных подгружается при прокрутке, для неё нужна вёрстка
+    "cryptorank": ("stylesheet",),
+    "tokenomist": ("stylesheet",),
+}
+# Домены счётчиков, рекламы и виджетов, запросы к которым (и к их поддоменам) блокируются
+SCRAPE_BLOCKED_DOMAINS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googlesyndication.com",
+    "googleadservices.com",
+    "doubleclick.net",
+    "facebook.net",
+    "facebook.com",
+    "mc.yandex.ru",
+    "hotjar.com",
+    "clarity.ms",
+    "segment.io",
+    "mixpanel.com",
+    "amplitude.com",
+    "intercom.io",
+    "cloudflareinsights.com",
+    "sentry.io",
+    "platform.twitter.com",
+    "syndication.twitter.com",
+)
 
 
 # Селекторы
 SELECTOR_TOP_100_WALLETS = ".overflow-right-box .holder-Statistics #holders_top100"
 SELECTOR_TWITTERSCORE = "span.more-info-data"
+SELECTOR_TWITTERSCORE_VALUE = "#insideChartCount"
 SELECTOR_GET_INVESTORS = "p.sc-56567222-0"
 SELECTOR_PERCENTAGE_DATA = 'div[class*="overflow-y-auto"]'
 SELECTOR_PERCENTAGE_TOKEN = "div.flex.items-center.w-"
@@ -0,0 +1,229 @@
+import time
+import base64
+import hashlib
+import logging
+
+from typing import Any, AsyncContextManager, AsyncIterator, Callable, Optional
+from collections import Counter, OrderedDict
+from contextlib import asynccontextmanager
+
+import orjson
+from yarl import URL
+from multidict import CIMultiDict, CIMultiDictProxy
+from aiohttp import ClientResponseError, RequestInfo
+
+from bot.utils.common.sessions import redis_client
+from bot.utils.common.consts import (
+    HTTP_CACHE_POLICIES,
+    HTTP_CACHE_REDIS_PREFIX,
+    HTTP_CACHE_STALE_TTL,
+    HTTP_CACHE_L1_MAX_ENTRIES,
+    HTTP_CACHE_L1_MAX_BYTES,
+    HTTP_CACHE_MAX_BODY_SIZE,
+)
+
+
+class CachedResponse:
+    """
+    Прочитанный ответ HTTP-запроса. Повторяет ту часть интерфейса aiohttp.ClientResponse,
+    которой пользуются функции получения данных, поэтому ответ из кэша для них неотличим от сетевого.
+    """
+
+    def __init__(self, url: str, status: int, headers: Any, body: bytes, stored_at: Optional[float] = None):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.stored_at = stored_at or time.time()
+
+    @property
+    def ok(self) -> bool:
+        return self.status < 400
+
+    async def read(self) -> bytes:
+        return self.body
+
+    async def text(self, encoding: str = "utf-8") -> str:
+        return self.body.decode(encoding, errors="replace")
+
+    async def json(self, content_type: Optional[str] = None, loads: Callable = orjson.loads) -> Any:
+        return loads(self.body)
+
+    def raise_for_status(self):
+        if not self.ok:
+            url = URL(self.url)
+            request_info = RequestInfo(url, "GET", CIMultiDictProxy(CIMultiDict()), url)
+            raise ClientResponseError(request_info, (), status=self.status, message=f"HTTP {self.status}")
+
+    def release(self):
+        pass
+
+    def dumps(self) -> str:
+        return orjson.dumps(
+            {
+                "url": self.url,
+                "status": self.status,
+                "headers": self.headers,
+                "body": base64.b64encode(self.body).decode("ascii"),
+                "stored_at": self.stored_at,
+            }
+        ).decode("utf-8")
+
+    @classmethod
+    def loads(cls, raw: str) -> "CachedResponse":
+        data = orjson.loads(raw)
+        return cls(data["url"], data["status"], data["headers"], base64.b64decode(data["body"]), data["stored_at"])
+
+
+# Заголовки, которые сохраняются вместе с ответом
+CACHED_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+
+_l1_cache: "OrderedDict[str, CachedResponse]" = OrderedDict()
+_l1_bytes = 0
+_cache_stats: Counter = Counter()
+
+
+def get_cache_ttl(provider: str, url: str) -> Optional[int]:
+    """
+    Возвращает время свежести ответа по правилам HTTP_CACHE_POLICIES или None, если запрос не кэшируется.
+    """
+
+    for pattern, ttl in HTTP_CACHE_POLICIES.get(provider, ()):
+        if pattern in url:
+            return ttl
+
+    return None
+
+
+def cache_key(url: str, params: Optional[dict] = None) -> str:
+    """
+    Ключ ответа в кэше: адрес запроса вместе с отсортированными параметрами.
+    Заголовки (в том числе ключи API) в ключ не входят.
+    """
+
+    query = "&".join(f"{key}={value}" for key, value in sorted((params or {}).items()))
+    digest = hashlib.sha256(f"{url}?{query}".encode("utf-8")).hexdigest()
+    return f"{HTTP_CACHE_REDIS_PREFIX}:{digest}"
+
+
+def _remember(key: str, response: CachedResponse):
+    global _l1_bytes
+
+    previous = _l1_cache.pop(key, None)
+    if previous is not None:
+        _l1_bytes -= len(previous.body)
+
+    _l1_cache[key] = response
+    _l1_bytes += len(response.body)
+    while len(_l1_cache) > HTTP_CACHE_L1_MAX_ENTRIES or _l1_bytes > HTTP_CACHE_L1_MAX_BYTES:
+        _, evicted = _l1_cache.popitem(last=False)
+        _l1_bytes -= len(evicted.body)
+
+
+def is_too_large(response: Any) -> bool:
+    """
+    Проверяет по заголовку Content-Length, что ответ больше HTTP_CACHE_MAX_BODY_SIZE.
+    """
+
+    try:
+        return int(response.headers.get("Content-Length", 0)) > HTTP_CACHE_MAX_BODY_SIZE
+    except ValueError:
+        return False
+
+
+async def _load(key: str) -> Optional[CachedResponse]:
+    if key in _l1_cache:
+        _l1_cache.move_to_end(key)
+        return _l1_cache[key]
+
+    try:
+        raw = await redis_client.get(key)
+    except Exception as e:
+        logging.error(f"Ошибка чтения кэша HTTP-ответов из Redis: {e}")
+        return None
+
+    return CachedResponse.loads(raw) if raw else None
+
+
+async def _store(key: str, response: CachedResponse, ttl: int):
+    _remember(key, response)
+
+    try:
+        await redis_client.set(key, response.dumps(), ex=ttl + HTTP_CACHE_STALE_TTL)
+    except Exception as e:
+        logging.error(f"Ошибка записи кэша HTTP-ответов в Redis: {e}")
+
+
+@asynccontextmanager
+async def cached_request(
+    provider: str,
+    url: str,
+    ttl: int,
+    send: Callable[[dict], AsyncContextManager[Any]],
+    params: Optional[dict] = None,
+) -> AsyncIterator[Any]:
+    """
+    Ответ GET-запроса из кэша (внутрипроцессного, затем Redis), пока он свежий.
+    Устаревший ответ перепроверяется условным запросом (If-None-Match / If-Modified-Since):
+    при ответе 304 он снова считается свежим. send выполняет сетевой запрос с дополнительными заголовками.
+    Ответы с ошибкой и ответы больше HTTP_CACHE_MAX_BODY_SIZE не кэшируются; если размер известен заранее,
+    такой ответ передаётся без чтения в память, чтобы его можно было разобрать потоково.
+    """
+
+    key = cache_key(url, params)
+    cached = await _load(key)
+
+    if cached and time.time() - cached.stored_at < ttl:
+        _cache_stats[f"{provider}:hit"] += 1
+        _remember(key, cached)
+        yield cached
+        return
+
+    conditional_headers = {}
+    if cached:
+        if cached.headers.get("ETag"):
+            conditional_headers["If-None-Match"] = cached.headers["ETag"]
+        if cached.headers.get("Last-Modified"):
+            conditional_headers["If-Modified-Since"] = cached.headers["Last-Modified"]
+
+    async with send(conditional_headers) as response:
+        if response.status == 304 and cached:
+            _cache_stats[f"{provider}:revalidated"] += 1
+            cached.stored_at = time.time()
+            await _store(key, cached, ttl)
+            yield cached
+            return
+
+        _cache_stats[f"{provider}:miss"] += 1
+        if response.status != 200:
+            yield response
+            return
+
+        if is_too_large(response):
+            _cache_stats[f"{provider}:bypassed"] += 1
+            yield response
+            return
+
+        headers = {name: response.headers[name] for name in CACHED_HEADERS if name in response.headers}
+        result = CachedResponse(url, response.status, headers, await response.read())
+
+    if len(result.body) > HTTP_CACHE_MAX_BODY_SIZE:
+        _cache_stats[f"{provider}:bypassed"] += 1
+    else:
+        await _store(key, result, ttl)
+
+    yield result
+
+
+def get_cache_stats() -> dict[str, dict[str, int]]:
+    """
+    Счётчики кэша HTTP-ответов по сервисам: попадания, перепроверенные ответы, промахи
+    и слишком большие для кэша ответы (входят в промахи).
+    """
+
+    stats: dict[str, dict[str, int]] = {}
+    for name, count in _cache_stats.items():
+        provider, outcome = name.split(":", 1)
+        stats.setdefault(provider, {"hit": 0, "revalidated": 0, "miss": 0, "bypassed": 0})[outcome] = count
+
+    return stats
@@ -0,0 +1,149 @@
+import re
+import asyncio
+
+from typing import Any, AsyncIterator, Iterable, Optional
+
+import orjson
+
+from bot.utils.common.consts import JSON_STREAM_CHUNK_SIZE
+
+# Символы, определяющие структуру JSON-документа
+STRUCTURAL_PATTERN = re.compile(rb'["\\\[\]{},:]')
+QUOTE, BACKSLASH, COLON, COMMA = ord('"'), ord("\\"), ord(":"), ord(",")
+OPEN_BRACKET, CLOSE_BRACKET, OPEN_BRACE, CLOSE_BRACE = ord("["), ord("]"), ord("{"), ord("}")
+
+
+class JsonArraySplitter:
+    """
+    Потоковое разбиение JSON-документа на элементы одного массива без разбора документа целиком.
+    Если key не задан, разбивается массив верхнего уровня, иначе - первый массив, являющийся значением ключа key
+    (на любой глубине). Элементы возвращаются в виде байтов и декодируются по одному.
+    """
+
+    def __init__(self, key: Optional[str] = None):
+        self.key = key.encode("utf-8") if key else None
+        self.buffer = bytearray()
+        self.scan_pos = 0
+        self.in_string = False
+        self.string_start = 0
+        self.last_string: Optional[bytes] = None
+        self.awaiting_array = key is None
+        self.started = False
+        self.finished = False
+        self.depth = 0
+        self.item_from = 0
+
+    def feed(self, chunk: bytes) -> list[bytes]:
+        """
+        Добавляет очередную часть документа и возвращает элементы массива, которые в ней завершились.
+        """
+
+        self.buffer += chunk
+        buffer = self.buffer
+        items = []
+        pos = self.scan_pos
+
+        while not self.finished:
+            match = STRUCTURAL_PATTERN.search(buffer, pos)
+            if match is None:
+                pos = len(buffer)
+                break
+
+            index = match.start()
+            char = buffer[index]
+            pos = index + 1
+
+            if self.in_string:
+                if char == BACKSLASH:
+                    # Экранированный символ разбирается, когда он уже есть в буфере
+                    if index + 1 >= len(buffer):
+                        pos = index
+                        break
+                    pos = index + 2
+                elif char == QUOTE:
+                    self.in_string = False
+                    if not self.started:
+                        self.last_string = bytes(buffer[self.string_start + 1 : index])
+                continue
+
+            if char == QUOTE:
+                self.in_string = True
+                self.string_start = index
+                self.awaiting_array = False
+                continue
+
+            if not self.started:
+                if char == OPEN_BRACKET and self.awaiting_array:
+                    self.started = True
+                    self.item_from = pos
+                else:
+                    self.awaiting_array = char == COLON and self.key is not None and self.last_string == self.key
+                continue
+
+            if char in (OPEN_BRACKET, OPEN_BRACE):
+                self.depth += 1
+            elif char in (CLOSE_BRACKET, CLOSE_BRACE) and self.depth:
+                self.depth -= 1
+            elif char == CLOSE_BRACKET:
+                self._emit(items, index)
+                self.finished = True
+            elif char == COMMA and not self.depth:
+                self._emit(items, index)
+                self.item_from = pos
+
+        # Уже разобранная часть буфера больше не нужна
+        if self.started:
+            cut = self.item_from
+        else:
+            cut = self.string_start if self.in_string else pos
+        del buffer[:cut]
+        self.item_from -= cut
+        self.string_start -= cut
+        self.scan_pos = pos - cut
+
+        return items
+
+    def _emit(self, items: list[bytes], end: int):
+        raw = bytes(self.buffer[self.item_from : end]).strip()
+        if raw:
+            items.append(raw)
+
+
+async def iter_response_chunks(response: Any, chunk_size: int = JSON_STREAM_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """
+    Читает тело ответа частями: у ответа из кэша - из памяти, у сетевого - по мере получения.
+    """
+
+    body = getattr(response, "body", None)
+    if isinstance(body, bytes):
+        for start in range(0, len(body), chunk_size):
+            yield body[start : start + chunk_size]
+            await asyncio.sleep(0)
+        return
+
+    async for chunk in response.content.iter_chunked(chunk_size):
+        yield chunk
+
+
+async def iter_json_array(
+    response: Any,
+    key: Optional[str] = None,
+    fields: Optional[Iterable[str]] = None,
+) -> AsyncIterator[Any]:
+    """
+    Потоково разбирает массив из ответа (см. JsonArraySplitter) и возвращает его элементы по одному.
+    Если заданы fields, от элементов-словарей остаются только эти поля.
+    """
+
+    splitter = JsonArraySplitter(key)
+    fields = tuple(fields) if fields else None
+
+    async for chunk in iter_response_chunks(response):
+        for raw in splitter.feed(chunk):
+            item = orjson.loads(raw)
+            if fields and isinstance(item, dict):
+                item = {field: item.get(field) for field in fields}
+            yield item
+
+        if splitter.finished:
+            break
@@ -0,0 +1,150 @@
+import sys
+import time
+import asyncio
+import logging
+
+from collections import deque
+from typing import Awaitable, Iterable, Optional
+
+from bot.utils.common.consts import (
+    LOOP_LAG_SAMPLE_INTERVAL,
+    LOOP_LAG_WARNING_THRESHOLD,
+    LOOP_LAG_BENCHMARK_LIMIT,
+)
+
+
+class LoopLagRecorder:
+    """
+    Замеряет задержку цикла событий: насколько позже запланированного просыпается задача,
+    уснувшая на фиксированный интервал. Любой синхронный вызов в цикле увеличивает эту задержку.
+    """
+
+    def __init__(self, interval: float = LOOP_LAG_SAMPLE_INTERVAL, max_samples: Optional[int] = None):
+        self.interval = interval
+        self.samples: deque[float] = deque(maxlen=max_samples)
+
+    async def run(self, threshold: Optional[float] = None):
+        """
+        Записывает задержку цикла событий до отмены задачи.
+        Если передан threshold, задержки больше него пишутся в лог.
+        """
+
+        while True:
+            started_at = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.perf_counter() - started_at - self.interval)
+            self.samples.append(lag)
+
+            if threshold is not None and lag > threshold:
+                logging.warning(f"Цикл событий был заблокирован на {lag * 1000:.1f} мс")
+
+    def percentile(self, percent: float) -> float:
+        """
+        Возвращает перцентиль замеренной задержки (в секундах).
+        """
+
+        if not self.samples:
+            return 0.0
+
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+    def summary(self) -> dict:
+        """
+        Сводка по замерам в миллисекундах.
+        """
+
+        return {
+            "samples": len(self.samples),
+            "p50": self.percentile(50) * 1000,
+            "p99": self.percentile(99) * 1000,
+            "max": max(self.samples, default=0.0) * 1000,
+        }
+
+
+async def monitor_loop_lag():
+    """
+    Фоновая задача, сообщающая в лог о блокировках цикла событий.
+    """
+
+    await LoopLagRecorder(max_samples=1).run(LOOP_LAG_WARNING_THRESHOLD)
+
+
+async def measure_loop_lag(workload: Iterable[Awaitable]) -> dict:
+    """
+    Выполняет нагрузку конкурентно и возвращает сводку задержки цикла событий за это время.
+    Ошибкой считается как исключение, так и результат False или None (функция не получила данные).
+    """
+
+    recorder = LoopLagRecorder()
+    recorder_task = asyncio.create_task(recorder.run())
+
+    try:
+        results = await asyncio.gather(*workload, return_exceptions=True)
+    finally:
+        recorder_task.cancel()
+
+    summary = recorder.summary()
+    summary["tasks"] = len(results)
+    summary["errors"] = sum(isinstance(result, Exception) or result is False or result is None for result in results)
+    return summary
+
+
+async def run_loop_lag_benchmark(symbols: list[str]) -> bool:
+    """
+    Регрессионный замер: обновление проектов (вместе со сбором данных браузером) выполняется одновременно
+    с анализом тех же токенов, как при работе бота под нагрузкой. Замер успешен, если все задачи выполнены
+    без ошибок (в том числе получена история цен) и p99 задержки цикла событий не превышает LOOP_LAG_BENCHMARK_LIMIT.
+    Для повторяемого результата замер запускается против локальной заглушки внешних сервисов
+    (bot/utils/common/provider_stub.py) с заданным PROVIDER_STUB_URL; проекты должны быть в базе.
+    """
+
+    from bot.data_processing.data_pipeline import refresh_project
+    from bot.utils.browser import init_browser, close_browser
+    from bot.utils.common.consts import REFRESH_GROUP_NODES
+    from bot.utils.common.params import get_cryptocompare_params
+    from bot.utils.common.sessions import init_http_clients, close_http_clients
+    from bot.utils.project_data import fetch_cryptocompare_data, fetch_coingecko_data, get_coingecko_id_by_symbol
+
+    async def fetch_price_history(params: dict) -> Optional[tuple]:
+        # fetch_cryptocompare_data возвращает кортеж из None, даже если не ответил ни один источник истории цен
+        result = await fetch_cryptocompare_data(params, params, price=1.0)
+        return result if result and result[2] is not None else None
+
+    await init_http_clients()
+    await init_browser()
+    try:
+        # ID CoinGecko определяются до замера: fetch_coingecko_data принимает ID, а не тикер
+        coingecko_ids = await asyncio.gather(*(get_coingecko_id_by_symbol(symbol) for symbol in symbols))
+        unknown_symbols = [symbol for symbol, coingecko_id in zip(symbols, coingecko_ids) if not coingecko_id]
+        if unknown_symbols:
+            logging.error(f"Не найдены ID CoinGecko для {', '.join(unknown_symbols)}, замер не выполнен")
+            return False
+
+        workload = []
+        for symbol, coingecko_id in zip(symbols, coingecko_ids):
+            params = get_cryptocompare_params(symbol)
+            workload.append(refresh_project(symbol, list(REFRESH_GROUP_NODES)))
+            workload.append(fetch_coingecko_data(coingecko_id))
+            workload.append(fetch_price_history(params))
+
+        summary = await measure_loop_lag(workload)
+    finally:
+        await close_browser()
+        await close_http_clients()
+
+    logging.info(
+        f"Задержка цикла событий: p50 {summary['p50']:.2f} мс, p99 {summary['p99']:.2f} мс, "
+        f"максимум {summary['max']:.2f} мс (замеров - {summary['samples']}, "
+        f"ошибок - {summary['errors']} из {summary['tasks']} задач)"
+    )
+
+    return not summary["errors"] and summary["p99"] <= LOOP_LAG_BENCHMARK_LIMIT * 1000
+
+
+if __name__ == "__main__":
+    # Пример: python -m bot.utils.common.provider_stub --seed 1 (в отдельном терминале), затем
+    # PROVIDER_STUB_URL=http://127.0.0.1:8089 python -m bot.utils.common.loop_lag BTC ETH SOL
+    logging.basicConfig(level=logging.INFO)
+    passed = asyncio.run(run_loop_lag_benchmark(sys.argv[1:] or ["BTC", "ETH"]))
+    sys.exit(0 if passed else 1)
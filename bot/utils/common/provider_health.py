@@ -0,0 +1,157 @@
+import time
+import asyncio
+import logging
+
+from typing import Iterable, Optional
+
+import aiohttp
+from tenacity import RetryError
+
+from bot.utils.common.consts import (
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+    CIRCUIT_BREAKER_RECOVERY_TIMEOUT,
+    PROVIDER_HEALTH_SMOOTHING,
+    RATE_LIMIT_STATUSES,
+)
+
+
+class ProviderHealth:
+    """
+    Состояние источника данных: скользящие средние доли успешных ответов и времени ответа
+    и автомат отключения (circuit breaker).
+
+    Автомат замкнут, пока неудач подряд меньше порога. После порога он размыкается, и источник
+    не опрашивается CIRCUIT_BREAKER_RECOVERY_TIMEOUT секунд. Затем пропускается один пробный запрос
+    (полуразомкнутое состояние): успех замыкает автомат, неудача снова размыкает.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.success_rate = 1.0
+        self.latency = 0.0
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= CIRCUIT_BREAKER_RECOVERY_TIMEOUT:
+            return "half_open"
+        return "open"
+
+    def is_available(self) -> bool:
+        """
+        Можно ли сейчас обращаться к источнику.
+        В полуразомкнутом состоянии доступен только один пробный запрос.
+        """
+
+        state = self.state
+        return state == "closed" or (state == "half_open" and not self.probing)
+
+    def begin_request(self) -> bool:
+        """
+        Отмечает начало запроса к источнику. Возвращает False, если источник сейчас недоступен.
+        """
+
+        if not self.is_available():
+            return False
+
+        self.probing = self.state == "half_open"
+        return True
+
+    def expected_cost(self) -> float:
+        """
+        Ожидаемое время до получения данных от источника: время ответа, делённое на долю успехов.
+        """
+
+        return self.latency / max(self.success_rate, 0.05)
+
+    def _update(self, success: bool, latency: float):
+        self.success_rate += PROVIDER_HEALTH_SMOOTHING * (float(success) - self.success_rate)
+        self.latency += PROVIDER_HEALTH_SMOOTHING * (latency - self.latency)
+        self.probing = False
+
+    def record_success(self, latency: float):
+        self._update(True, latency)
+        self.consecutive_failures = 0
+        if self.opened_at is not None:
+            logging.info(f"[{self.name}] Источник снова доступен")
+        self.opened_at = None
+
+    def record_failure(self, latency: float):
+        self._update(False, latency)
+        self.consecutive_failures += 1
+
+        if self.opened_at is not None or self.consecutive_failures >= CIRCUIT_BREAKER_FAILURE_THRESHOLD:
+            self.opened_at = time.monotonic()
+            logging.warning(
+                f"[{self.name}] Источник исключён из опроса на {CIRCUIT_BREAKER_RECOVERY_TIMEOUT} сек. "
+                f"после {self.consecutive_failures} неудач подряд"
+            )
+
+
+def is_provider_failure(error: Optional[BaseException]) -> bool:
+    """
+    Проверяет, говорит ли ошибка о неисправности источника: таймаут, сбой соединения, ответ 5xx
+    или отказ по лимиту. Остальные ошибки (например, 4xx или отсутствие данных по токену) неисправностью
+    не считаются. Просматривается вся цепочка исключений, так как функции получения данных оборачивают
+    исходную ошибку в свои исключения, а tenacity - в RetryError.
+    """
+
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+
+        if isinstance(error, (asyncio.TimeoutError, aiohttp.ClientConnectionError, aiohttp.ClientPayloadError)):
+            return True
+        if isinstance(error, aiohttp.ClientResponseError):
+            return error.status >= 500 or error.status in RATE_LIMIT_STATUSES
+        if isinstance(error, RetryError):
+            error = error.last_attempt.exception()
+            continue
+
+        error = error.__cause__ or error.__context__
+
+    return False
+
+
+_health: dict[str, ProviderHealth] = {}
+
+
+def get_health(name: str) -> ProviderHealth:
+    """
+    Возвращает состояние источника данных, создавая его при первом обращении.
+    """
+
+    if name not in _health:
+        _health[name] = ProviderHealth(name)
+
+    return _health[name]
+
+
+def rank_providers(names: Iterable[str]) -> list[str]:
+    """
+    Возвращает доступные источники в порядке возрастания ожидаемого времени получения данных.
+    Источники с разомкнутым автоматом пропускаются; при равной оценке сохраняется исходный порядок.
+    """
+
+    available = [name for name in names if get_health(name).is_available()]
+    return sorted(available, key=lambda name: get_health(name).expected_cost())
+
+
+def get_health_report() -> dict[str, dict]:
+    """
+    Сводка по состоянию всех источников данных.
+    """
+
+    return {
+        name: {
+            "state": health.state,
+            "success_rate": round(health.success_rate, 3),
+            "latency": round(health.latency, 3),
+            "consecutive_failures": health.consecutive_failures,
+        }
+        for name, health in _health.items()
+    }
@@ -0,0 +1,274 @@
+import os
+import sys
+import json
+import base64
+import random
+import asyncio
+import logging
+import argparse
+
+from typing import Optional
+from collections import Counter
+
+from aiohttp import web, ClientSession, ClientTimeout
+
+from bot.utils.common.consts import (
+    PROVIDER_HOSTS,
+    PROVIDER_STUB_CASSETTES_DIR,
+    PROVIDER_STUB_HOST,
+    PROVIDER_STUB_PORT,
+    PROVIDER_STUB_RECORDED_HEADERS,
+    PROVIDER_STUB_RETRY_AFTER,
+)
+
+# Параметры искусственной нагрузки по умолчанию; для отдельного сервиса их можно переопределить
+DEFAULT_STUB_SETTINGS = {"latency": 0.0, "jitter": 0.0, "error_rate": 0.0, "rate_limit_rate": 0.0}
+
+
+def query_key(query) -> str:
+    """
+    Параметры запроса в виде строки, не зависящей от их порядка.
+    """
+
+    return "&".join(f"{key}={value}" for key, value in sorted(query.items()))
+
+
+class Cassette:
+    """
+    Записанные ответы одного сервиса, хранятся в файле <каталог кассет>/<сервис>.json.
+    Запрос сопоставляется с записью по методу, пути и параметрам. Только при воспроизведении и только если
+    это явно разрешено (match_path), при отсутствии точной записи используется первая запись с тем же путём.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.interactions: list[dict] = []
+
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as file:
+                self.interactions = json.load(file)
+
+    def find(self, method: str, path: str, query: str, match_path: bool = False) -> Optional[dict]:
+        same_path = None
+        for interaction in self.interactions:
+            if interaction["method"] != method or interaction["path"] != path:
+                continue
+            if interaction["query"] == query:
+                return interaction
+            same_path = same_path or interaction
+
+        return same_path if match_path else None
+
+    def add(self, interaction: dict):
+        self.interactions = [
+            item
+            for item in self.interactions
+            if (item["method"], item["path"], item["query"])
+            != (interaction["method"], interaction["path"], interaction["query"])
+        ]
+        self.interactions.append(interaction)
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as file:
+            json.dump(self.interactions, file, ensure_ascii=False, indent=2)
+
+
+class ProviderStub:
+    """
+    Локальный сервер, отвечающий вместо внешних сервисов записанными ответами (кассетами).
+    Адрес запроса: /<сервис>/<путь в API сервиса>, сервисы перечислены в PROVIDER_HOSTS.
+    Перед ответом сервер выдерживает заданную задержку и с заданной вероятностью отвечает
+    ошибкой 503 или отказом по лимиту 429 с заголовком Retry-After.
+    В режиме записи запросы без точной записи передаются реальному сервису, а ответ сохраняется в кассету.
+    Ответ на запрос с другими параметрами (match_path) подставляется только при воспроизведении и только
+    если это явно включено, иначе бенчмарк мог бы незаметно работать на данных другого токена.
+    """
+
+    def __init__(
+        self,
+        cassettes_dir: str = PROVIDER_STUB_CASSETTES_DIR,
+        settings: Optional[dict] = None,
+        record: bool = False,
+        seed: Optional[int] = None,
+        match_path: bool = False,
+    ):
+        self.cassettes_dir = cassettes_dir
+        self.settings = {**DEFAULT_STUB_SETTINGS, **(settings or {})}
+        self.provider_settings: dict[str, dict] = {}
+        self.record = record
+        self.match_path = match_path and not record
+        self.random = random.Random(seed)
+        self.stats: Counter = Counter()
+        self.cassettes: dict[str, Cassette] = {}
+        self.client: Optional[ClientSession] = None
+
+    def get_cassette(self, provider: str) -> Cassette:
+        if provider not in self.cassettes:
+            self.cassettes[provider] = Cassette(os.path.join(self.cassettes_dir, f"{provider}.json"))
+
+        return self.cassettes[provider]
+
+    def get_settings(self, provider: str) -> dict:
+        return {**self.settings, **self.provider_settings.get(provider, {})}
+
+    def create_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/_stub/stats", self.handle_stats)
+        app.router.add_get("/_stub/settings", self.handle_get_settings)
+        app.router.add_post("/_stub/settings", self.handle_update_settings)
+        app.router.add_route("*", "/{provider}/{path:.*}", self.handle_request)
+        app.on_cleanup.append(self.close)
+        return app
+
+    async def close(self, app: web.Application):
+        if self.client is not None:
+            await self.client.close()
+
+    async def handle_request(self, request: web.Request) -> web.Response:
+        provider = request.match_info["provider"]
+        path = "/" + request.match_info["path"]
+
+        if provider not in PROVIDER_HOSTS:
+            return web.json_response({"error": f"Неизвестный сервис: {provider}"}, status=404)
+
+        settings = self.get_settings(provider)
+        delay = settings["latency"] + self.random.uniform(0, settings["jitter"])
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        if self.random.random() < settings["rate_limit_rate"]:
+            self.stats[f"{provider}:rate_limited"] += 1
+            return web.json_response(
+                {"error": "Too Many Requests"},
+                status=429,
+                headers={"Retry-After": str(PROVIDER_STUB_RETRY_AFTER)},
+            )
+
+        if self.random.random() < settings["error_rate"]:
+            self.stats[f"{provider}:error"] += 1
+            return web.json_response({"error": "Service Unavailable"}, status=503)
+
+        cassette = self.get_cassette(provider)
+        query = query_key(request.query)
+        interaction = cassette.find(request.method, path, query, self.match_path)
+
+        if interaction is None and self.record:
+            interaction = await self.record_interaction(provider, request, path, query)
+            self.stats[f"{provider}:recorded"] += 1
+        elif interaction is None:
+            self.stats[f"{provider}:missing"] += 1
+            logging.warning(f"Нет записанного ответа {provider}: {request.method} {path}?{query}")
+            return web.json_response({"error": f"Нет записанного ответа для {path}"}, status=404)
+        elif interaction["query"] != query:
+            self.stats[f"{provider}:served_by_path"] += 1
+        else:
+            self.stats[f"{provider}:served"] += 1
+
+        if "body_base64" in interaction:
+            body = base64.b64decode(interaction["body_base64"])
+        else:
+            body = interaction["body"].encode("utf-8")
+
+        return web.Response(status=interaction["status"], headers=interaction["headers"], body=body)
+
+    async def record_interaction(self, provider: str, request: web.Request, path: str, query: str) -> dict:
+        """
+        Передаёт запрос реальному сервису и сохраняет его ответ в кассету.
+        """
+
+        if self.client is None:
+            self.client = ClientSession(timeout=ClientTimeout(total=60))
+
+        headers = {
+            name: value for name, value in request.headers.items() if name.lower() not in ("host", "accept-encoding")
+        }
+        async with self.client.request(
+            request.method,
+            f"{PROVIDER_HOSTS[provider]}{path}",
+            params=request.query,
+            headers=headers,
+            data=await request.read() or None,
+        ) as response:
+            body = await response.read()
+            interaction = {
+                "method": request.method,
+                "path": path,
+                "query": query,
+                "status": response.status,
+                "headers": {
+                    name: response.headers[name] for name in PROVIDER_STUB_RECORDED_HEADERS if name in response.headers
+                },
+            }
+
+        try:
+            interaction["body"] = body.decode("utf-8")
+        except UnicodeDecodeError:
+            interaction["body_base64"] = base64.b64encode(body).decode("ascii")
+
+        self.get_cassette(provider).add(interaction)
+        return interaction
+
+    async def handle_stats(self, request: web.Request) -> web.Response:
+        stats: dict[str, dict[str, int]] = {}
+        for name, count in self.stats.items():
+            provider, outcome = name.split(":", 1)
+            stats.setdefault(provider, {})[outcome] = count
+
+        return web.json_response(stats)
+
+    async def handle_get_settings(self, request: web.Request) -> web.Response:
+        return web.json_response({"default": self.settings, "providers": self.provider_settings})
+
+    async def handle_update_settings(self, request: web.Request) -> web.Response:
+        """
+        Изменяет параметры нагрузки без перезапуска сервера.
+        Тело запроса: {"default": {...}, "providers": {"<сервис>": {...}}}, ключи как в DEFAULT_STUB_SETTINGS.
+        """
+
+        data = await request.json()
+        self.settings.update({key: float(value) for key, value in (data.get("default") or {}).items()})
+        for provider, settings in (data.get("providers") or {}).items():
+            self.provider_settings.setdefault(provider, {}).update(
+                {key: float(value) for key, value in settings.items()}
+            )
+
+        return await self.handle_get_settings(request)
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Локальный сервер-заглушка внешних сервисов")
+    parser.add_argument("--host", default=PROVIDER_STUB_HOST)
+    parser.add_argument("--port", type=int, default=PROVIDER_STUB_PORT)
+    parser.add_argument("--cassettes", default=PROVIDER_STUB_CASSETTES_DIR, help="каталог кассет")
+    parser.add_argument("--latency", type=float, default=0.0, help="задержка ответа (в секундах)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="случайная добавка к задержке (в секундах)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="доля ответов 503")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="доля ответов 429")
+    parser.add_argument("--seed", type=int, default=None, help="зерно генератора для повторяемых замеров")
+    parser.add_argument("--record", action="store_true", help="записывать отсутствующие ответы реальных сервисов")
+    parser.add_argument(
+        "--match-path",
+        action="store_true",
+        help="без точной записи отвечать записью с тем же путём и другими параметрами (не работает с --record)",
+    )
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    # Пример: python -m bot.utils.common.provider_stub --latency 0.2 --rate-limit-rate 0.05 --seed 1,
+    # затем бот или замер (python -m bot.utils.common.loop_lag) запускается с PROVIDER_STUB_URL=http://127.0.0.1:8089
+    logging.basicConfig(level=logging.INFO)
+    args = parse_args(sys.argv[1:])
+    stub = ProviderStub(
+        cassettes_dir=args.cassettes,
+        settings={
+            "latency": args.latency,
+            "jitter": args.jitter,
+            "error_rate": args.error_rate,
+            "rate_limit_rate": args.rate_limit_rate,
+        },
+        record=args.record,
+        seed=args.seed,
+        match_path=args.match_path,
+    )
+    web.run_app(stub.create_app(), host=args.host, port=args.port)
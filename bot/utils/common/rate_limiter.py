@@ -0,0 +1,329 @@
+import time
+import asyncio
+import logging
+
+from typing import Any, Awaitable, Callable, Optional
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from contextlib import asynccontextmanager
+
+from bot.utils.common.cluster import get_replica_count
+from bot.utils.common.sessions import get_http_client, redis_client
+from bot.utils.common.http_cache import cached_request, get_cache_ttl
+from bot.utils.common.consts import (
+    PROVIDER_RATE_LIMITS,
+    RATE_LIMIT_STATUSES,
+    RATE_LIMIT_MAX_RETRIES,
+    RATE_LIMIT_DEFAULT_BACKOFF,
+    RATE_LIMIT_MAX_BACKOFF,
+    RATE_LIMIT_DECREASE_FACTOR,
+    RATE_LIMIT_REDIS_PREFIX,
+)
+
+
+# Ведро токенов в Redis: пополнение, проверка и списание выполняются атомарно.
+# Возвращает 0, если токены списаны, иначе - сколько секунд ждать (строкой, чтобы Redis не округлил число)
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local clock = redis.call("TIME")
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call("HMGET", KEYS[1], "tokens", "updated_at", "paused_until")
+local tokens = tonumber(state[1]) or capacity
+local updated_at = tonumber(state[2]) or now
+local paused_until = tonumber(state[3]) or 0
+if now < paused_until then
+    return tostring(paused_until - now)
+end
+tokens = math.min(capacity, tokens + math.max(0, now - updated_at) * rate)
+local wait = 0
+if tokens >= requested then
+    tokens = tokens - requested
+else
+    wait = (requested - tokens) / rate
+end
+redis.call(
+    "HSET", KEYS[1], "tokens", tostring(tokens), "updated_at", tostring(now), "paused_until", tostring(paused_until)
+)
+redis.call("EXPIRE", KEYS[1], ARGV[4])
+return tostring(wait)
+"""
+# Пауза ведра в Redis: накопленные токены сгорают, пополнение начинается после паузы
+PAUSE_BUCKET_SCRIPT = """
+local clock = redis.call("TIME")
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local paused_until = math.max(tonumber(redis.call("HGET", KEYS[1], "paused_until")) or 0, now + tonumber(ARGV[1]))
+redis.call("HSET", KEYS[1], "tokens", "0", "updated_at", tostring(paused_until), "paused_until", tostring(paused_until))
+redis.call("EXPIRE", KEYS[1], ARGV[2])
+return 1
+"""
+
+
+class TokenBucket:
+    """
+    Ограничитель частоты запросов по алгоритму "ведро токенов".
+    Токены пополняются с постоянной скоростью до ёмкости ведра (допустимого всплеска).
+    Ведро хранится в Redis и общее для всех реплик, поэтому квота тарифа не умножается на число реплик.
+    Если Redis недоступен, используется ведро в памяти процесса с квотой, делённой на число активных реплик.
+    """
+
+    def __init__(self, name: str, per_minute: float, burst: int):
+        self.key = f"{RATE_LIMIT_REDIS_PREFIX}:{name}"
+        self.rate = per_minute / 60
+        self.capacity = burst
+        # Ключ живёт, пока ведро может понадобиться: полное пополнение плюс максимальная пауза
+        self.ttl = int(burst / self.rate + RATE_LIMIT_MAX_BACKOFF) + 60
+        self.tokens = float(burst)
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _take_local(self, tokens: int) -> float:
+        """
+        Списывает токены из ведра в памяти процесса. Возвращает 0 или время ожидания в секундах.
+        """
+
+        now = time.monotonic()
+        if now < self.paused_until:
+            return self.paused_until - now
+
+        rate = self.rate / get_replica_count()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * rate)
+        self.updated_at = now
+
+        if self.tokens >= tokens:
+            self.tokens -= tokens
+            return 0.0
+
+        return (tokens - self.tokens) / rate
+
+    async def _take(self, tokens: int) -> float:
+        try:
+            return float(
+                await redis_client.eval(TOKEN_BUCKET_SCRIPT, 1, self.key, self.rate, self.capacity, tokens, self.ttl)
+            )
+        except Exception as e:
+            logging.error(f"Ошибка ведра токенов {self.key} в Redis, используется локальная квота: {e}")
+            return self._take_local(tokens)
+
+    async def pause(self, seconds: float):
+        """
+        Останавливает выдачу токенов на seconds секунд (например, по заголовку Retry-After) во всех репликах.
+        Накопленные токены сгорают, чтобы после паузы не случился всплеск запросов.
+        """
+
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.tokens = 0.0
+        self.updated_at = self.paused_until
+
+        try:
+            await redis_client.eval(PAUSE_BUCKET_SCRIPT, 1, self.key, seconds, self.ttl)
+        except Exception as e:
+            logging.error(f"Ошибка при паузе ведра токенов {self.key} в Redis: {e}")
+
+    async def acquire(self, tokens: int = 1):
+        """
+        Ожидает, пока в ведре наберётся нужное количество токенов, и забирает их.
+        Ожидающие внутри процесса обслуживаются в порядке очереди.
+        """
+
+        tokens = min(tokens, self.capacity)
+
+        async with self._lock:
+            while True:
+                wait = await self._take(tokens)
+                if wait <= 0:
+                    return
+
+                await asyncio.sleep(wait)
+
+
+class ProviderLimiter:
+    """
+    Ограничитель запросов к одному сервису: ведро токенов по квоте тарифа и число одновременных запросов,
+    которое подстраивается по схеме AIMD - растёт на единицу за "окно" успешных ответов
+    и уменьшается в RATE_LIMIT_DECREASE_FACTOR раз при отказе по лимиту.
+    """
+
+    def __init__(self, provider: str, per_minute: float, burst: int, concurrency: int):
+        self.provider = provider
+        self.bucket = TokenBucket(provider, per_minute, burst)
+        self.max_concurrency = concurrency
+        self.concurrency = float(concurrency)
+        self.in_flight = 0
+        self._condition = asyncio.Condition()
+
+    @asynccontextmanager
+    async def slot(self):
+        """
+        Занимает место среди одновременных запросов и токен на один запрос.
+        """
+
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < int(self.concurrency))
+            self.in_flight += 1
+
+        try:
+            await self.bucket.acquire()
+            yield
+        finally:
+            async with self._condition:
+                self.in_flight -= 1
+                self._condition.notify_all()
+
+    async def on_success(self):
+        """
+        Аддитивное увеличение числа одновременных запросов после успешного ответа.
+        """
+
+        async with self._condition:
+            self.concurrency = min(self.max_concurrency, self.concurrency + 1 / self.concurrency)
+            self._condition.notify_all()
+
+    async def on_throttled(self, retry_after: float):
+        """
+        Мультипликативное уменьшение числа одновременных запросов и пауза после отказа по лимиту.
+        """
+
+        async with self._condition:
+            self.concurrency = max(1.0, self.concurrency * RATE_LIMIT_DECREASE_FACTOR)
+
+        await self.bucket.pause(retry_after)
+        logging.warning(
+            f"[{self.provider}] Превышен лимит запросов: пауза {retry_after:.0f} сек., "
+            f"одновременных запросов - не больше {int(self.concurrency)}"
+        )
+
+
+_limiters: dict[str, ProviderLimiter] = {}
+
+
+def get_limiter(provider: str) -> ProviderLimiter:
+    """
+    Возвращает ограничитель сервиса, создавая его по настройкам из PROVIDER_RATE_LIMITS.
+    """
+
+    if provider not in _limiters:
+        _limiters[provider] = ProviderLimiter(provider, **PROVIDER_RATE_LIMITS[provider])
+
+    return _limiters[provider]
+
+
+def get_bucket(provider: str) -> TokenBucket:
+    """
+    Возвращает ведро токенов сервиса.
+    """
+
+    return get_limiter(provider).bucket
+
+
+async def acquire(provider: str, tokens: int = 1):
+    """
+    Резервирует запросы к сервису в рамках его бюджета.
+    """
+
+    await get_bucket(provider).acquire(tokens)
+
+
+def get_retry_after(headers: Optional[Any], attempt: int) -> float:
+    """
+    Возвращает паузу после отказа по лимиту: из заголовка Retry-After (секунды или HTTP-дата),
+    а если его нет - экспоненциально растущую от RATE_LIMIT_DEFAULT_BACKOFF.
+    """
+
+    value = headers.get("Retry-After") if headers is not None else None
+    delay = None
+
+    if value:
+        try:
+            delay = float(value)
+        except ValueError:
+            try:
+                delay = (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds()
+            except (TypeError, ValueError):
+                delay = None
+
+    if delay is None:
+        delay = RATE_LIMIT_DEFAULT_BACKOFF * 2**attempt
+
+    return min(max(delay, 0.0), RATE_LIMIT_MAX_BACKOFF)
+
+
+@asynccontextmanager
+async def send_request(provider: str, url: str, method: str = "GET", **kwargs):
+    """
+    Выполняет HTTP-запрос к сервису через его общий клиент в рамках квоты и лимита одновременных запросов.
+    При отказе по лимиту (429) ждёт время из Retry-After и повторяет запрос до RATE_LIMIT_MAX_RETRIES раз,
+    после чего возвращает последний ответ как есть.
+    """
+
+    limiter = get_limiter(provider)
+
+    for attempt in range(RATE_LIMIT_MAX_RETRIES + 1):
+        async with limiter.slot():
+            response = await get_http_client(provider).request(method, url, **kwargs)
+            throttled = response.status in RATE_LIMIT_STATUSES
+
+            if not throttled or attempt == RATE_LIMIT_MAX_RETRIES:
+                try:
+                    yield response
+                finally:
+                    response.release()
+
+            response.release()
+
+        if not throttled:
+            await limiter.on_success()
+            return
+
+        await limiter.on_throttled(get_retry_after(response.headers, attempt))
+
+
+@asynccontextmanager
+async def limited_request(provider: str, url: str, method: str = "GET", **kwargs):
+    """
+    HTTP-запрос к сервису в рамках его квоты (send_request).
+    GET-запросы, для которых есть правило в HTTP_CACHE_POLICIES, обслуживаются через кэш ответов.
+    """
+
+    ttl = get_cache_ttl(provider, url) if method == "GET" else None
+
+    if ttl is None:
+        async with send_request(provider, url, method, **kwargs) as response:
+            yield response
+        return
+
+    headers = kwargs.pop("headers", None) or {}
+    async with cached_request(
+        provider,
+        url,
+        ttl,
+        lambda extra_headers: send_request(provider, url, headers={**headers, **extra_headers}, **kwargs),
+        kwargs.get("params"),
+    ) as response:
+        yield response
+
+
+async def run_limited(provider: str, call: Callable[[], Awaitable[Any]]) -> Any:
+    """
+    Выполняет вызов клиентской библиотеки сервиса (например, OpenAI) в рамках его квоты.
+    Исключение с кодом ответа 429 считается отказом по лимиту: вызов повторяется после паузы.
+    """
+
+    limiter = get_limiter(provider)
+
+    for attempt in range(RATE_LIMIT_MAX_RETRIES + 1):
+        try:
+            async with limiter.slot():
+                result = await call()
+        except Exception as e:
+            if getattr(e, "status_code", None) not in RATE_LIMIT_STATUSES or attempt == RATE_LIMIT_MAX_RETRIES:
+                raise
+
+            response = getattr(e, "response", None)
+            await limiter.on_throttled(get_retry_after(getattr(response, "headers", None), attempt))
+            continue
+
+        await limiter.on_success()
+        return result
@@ -0,0 +1,62 @@
+import logging
+
+from bot.utils.common.config import REPLICA_ID
+from bot.utils.common.sessions import redis_client
+
+# Продление и снятие блокировки выполняются атомарно и только владельцем
+EXTEND_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("expire", KEYS[1], ARGV[2])
+end
+return 0
+"""
+RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+def lock_key(name: str) -> str:
+    """
+    Формирует ключ блокировки в Redis.
+    """
+
+    return f"lock:{name}"
+
+
+async def acquire_lock(name: str, ttl: int, owner: str = REPLICA_ID) -> bool:
+    """
+    Захватывает блокировку на ttl секунд.
+    Если блокировка уже принадлежит этому владельцу, продлевает её.
+    """
+
+    try:
+        if await redis_client.set(lock_key(name), owner, nx=True, ex=ttl):
+            return True
+
+        return await extend_lock(name, ttl, owner)
+    except Exception as e:
+        logging.error(f"Ошибка при захвате блокировки {name}: {e}")
+        return False
+
+
+async def extend_lock(name: str, ttl: int, owner: str = REPLICA_ID) -> bool:
+    """
+    Продлевает блокировку, если она принадлежит владельцу.
+    """
+
+    return bool(await redis_client.eval(EXTEND_LOCK_SCRIPT, 1, lock_key(name), owner, ttl))
+
+
+async def release_lock(name: str, owner: str = REPLICA_ID) -> bool:
+    """
+    Снимает блокировку, если она принадлежит владельцу.
+    """
+
+    try:
+        return bool(await redis_client.eval(RELEASE_LOCK_SCRIPT, 1, lock_key(name), owner))
+    except Exception as e:
+        logging.error(f"Ошибка при снятии блокировки {name}: {e}")
+        return False
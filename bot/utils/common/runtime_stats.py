@@ -0,0 +1,47 @@
+import asyncio
+import logging
+
+from bot.utils.common.http_cache import get_cache_stats
+from bot.utils.common.consts import RUNTIME_STATS_LOG_INTERVAL
+from bot.utils.common.provider_health import get_health_report
+from bot.utils.common.single_flight import get_single_flight_stats
+from bot.utils.browser import get_page_pool_stats, get_route_stats, get_scrape_latency_stats
+
+
+def collect_runtime_stats() -> dict[str, dict]:
+    """
+    Собирает счётчики процесса: кэш HTTP-ответов, объединённые вызовы, состояние источников данных,
+    пул вкладок браузера, заблокированные браузером запросы и длительность сбора данных со страниц.
+    """
+
+    return {
+        "http_cache": get_cache_stats(),
+        "single_flight": get_single_flight_stats(),
+        "providers": get_health_report(),
+        "page_pool": get_page_pool_stats() or {},
+        "browser_requests": get_route_stats(),
+        "scrape_latency": get_scrape_latency_stats(),
+    }
+
+
+def log_runtime_stats():
+    """
+    Записывает в лог непустые разделы сводки счётчиков процесса.
+    """
+
+    for section, stats in collect_runtime_stats().items():
+        if stats:
+            logging.info(f"[stats] {section}: {stats}")
+
+
+async def periodically_log_runtime_stats():
+    """
+    Фоновая задача, раз в RUNTIME_STATS_LOG_INTERVAL секунд записывающая сводку счётчиков в лог.
+    """
+
+    while True:
+        await asyncio.sleep(RUNTIME_STATS_LOG_INTERVAL)
+        try:
+            log_runtime_stats()
+        except Exception as e:
+            logging.error(f"Ошибка при записи сводки счётчиков: {e}")
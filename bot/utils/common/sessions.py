@@ -1,6 +1,7 @@
+import orjson
 import redis.asyncio as redis
 
-from aiohttp import ClientSession
+from aiohttp import ClientResponse, ClientSession, ClientTimeout, TCPConnector
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.asyncio import (
     create_async_engine,
@@ -8,7 +9,13 @@ from sqlalchemy.ext.asyncio import (
     AsyncEngine,
 )
 
-from bot.utils.common.consts import DATABASE_URL
+from bot.utils.common.consts import (
+    DATABASE_URL,
+    HTTP_CLIENT_SETTINGS,
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_KEEPALIVE_TIMEOUT,
+    HTTP_DNS_CACHE_TTL,
+)
 from bot.utils.common.config import REDIS_HOST, REDIS_PORT
 
 async_engine: AsyncEngine = create_async_engine(
@@ -25,6 +32,69 @@ async_engine: AsyncEngine = create_async_engine(
 SessionLocal = sessionmaker(class_=AsyncSession, expire_on_commit=False, bind=async_engine)
 
 session_local = SessionLocal()
-client_session = ClientSession
 
 redis_client = redis.Redis(host=REDIS_HOST, port=REDIS_PORT, db=0, decode_responses=True)
+
+
+class OrjsonClientResponse(ClientResponse):
+    """
+    Ответ HTTP-клиента, который по умолчанию декодирует JSON с помощью orjson.
+    """
+
+    async def json(self, *, encoding=None, loads=orjson.loads, content_type="application/json"):
+        return await super().json(encoding=encoding, loads=loads, content_type=content_type)
+
+
+_http_clients: dict[str, ClientSession] = {}
+
+
+def create_http_client(provider: str) -> ClientSession:
+    """
+    Создаёт HTTP-клиент сервиса с пулом keep-alive соединений, кэшем DNS и таймаутами из HTTP_CLIENT_SETTINGS.
+    """
+
+    settings = {**HTTP_CLIENT_SETTINGS["default"], **HTTP_CLIENT_SETTINGS.get(provider, {})}
+    connector = TCPConnector(
+        limit=settings["limit"],
+        ttl_dns_cache=HTTP_DNS_CACHE_TTL,
+        keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+    )
+
+    return ClientSession(
+        connector=connector,
+        timeout=ClientTimeout(total=settings["timeout"], connect=HTTP_CONNECT_TIMEOUT),
+        response_class=OrjsonClientResponse,
+    )
+
+
+def get_http_client(provider: str = "default") -> ClientSession:
+    """
+    Возвращает общий для всего процесса HTTP-клиент сервиса.
+    Клиент не нужно закрывать после запроса - он закрывается при остановке бота (close_http_clients).
+    """
+
+    client = _http_clients.get(provider)
+    if client is None or client.closed:
+        client = _http_clients[provider] = create_http_client(provider)
+
+    return client
+
+
+async def init_http_clients():
+    """
+    Открывает HTTP-клиенты всех сервисов при запуске бота.
+    """
+
+    for provider in HTTP_CLIENT_SETTINGS:
+        get_http_client(provider)
+
+
+async def close_http_clients():
+    """
+    Закрывает HTTP-клиенты всех сервисов при остановке бота.
+    """
+
+    for client in _http_clients.values():
+        await client.close()
+
+    _http_clients.clear()
@@ -0,0 +1,69 @@
+import asyncio
+import functools
+
+from typing import Any, Callable
+from collections import Counter
+
+_in_flight: dict[tuple, asyncio.Future] = {}
+_single_flight_stats: Counter = Counter()
+
+
+def normalize_key(value: Any) -> Any:
+    """
+    Приводит аргументы вызова к хешируемому виду: словари - к отсортированным парам, списки и множества - к кортежам.
+    У строк отбрасываются пробелы по краям.
+    Объекты без понятного значения (например, сообщения Telegram) сравниваются по идентичности.
+    """
+
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, dict):
+        return tuple(sorted((str(key), normalize_key(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(normalize_key(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted((normalize_key(item) for item in value), key=repr))
+    if value is None or isinstance(value, (int, float, bool)):
+        return value
+
+    return ("id", id(value))
+
+
+def single_flight(func: Callable) -> Callable:
+    """
+    Декоратор объединения одинаковых одновременных вызовов: пока выполняется вызов с теми же
+    (нормализованными) аргументами, новые вызовы не запускают его повторно, а ждут общий результат.
+    Результат разделяется между вызывающими, поэтому изменять его на месте нельзя.
+    Отмена одного из ожидающих не отменяет общий вызов.
+    """
+
+    name = func.__qualname__
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        key = (name, normalize_key(args), normalize_key(kwargs))
+
+        future = _in_flight.get(key)
+        if future is None:
+            _single_flight_stats[f"{name}:calls"] += 1
+            future = _in_flight[key] = asyncio.ensure_future(func(*args, **kwargs))
+            future.add_done_callback(lambda _: _in_flight.pop(key, None))
+        else:
+            _single_flight_stats[f"{name}:shared"] += 1
+
+        return await asyncio.shield(future)
+
+    return wrapper
+
+
+def get_single_flight_stats() -> dict[str, dict[str, int]]:
+    """
+    Счётчики по функциям: сколько вызовов выполнено и сколько получили результат уже выполняющегося вызова.
+    """
+
+    stats: dict[str, dict[str, int]] = {}
+    for name, count in _single_flight_stats.items():
+        function_name, outcome = name.rsplit(":", 1)
+        stats.setdefault(function_name, {"calls": 0, "shared": 0})[outcome] = count
+
+    return stats
@@ -1,23 +1,29 @@
+import time
 import asyncio
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
 
 import aiohttp
-import httpx
-import requests
 
 from bs4 import BeautifulSoup
 from aiogram.types import Message
 from typing import Any, Dict, Optional
 from sqlalchemy.orm import selectinload
 from tenacity import retry, stop_after_attempt, wait_fixed
-
-from bot.utils.browser import context
-from bot.utils.common.sessions import client_session
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+from bot.utils.browser import browser_page, wait_for_stable_text, record_scrape_latency, ScrapeDeadline
+from bot.utils.common.rate_limiter import limited_request
+from bot.utils.common.single_flight import single_flight
+from bot.utils.common.json_stream import iter_json_array
+from bot.utils.common.provider_health import get_health, rank_providers, is_provider_failure
+from bot.utils.provider_ids import get_provider_id, has_provider_ids, remember_provider_id
+from bot.utils.project_metadata import get_project_metadata
+from bot.utils.tvl import get_current_tvl
 from bot.utils.resources.gpt.gpt import agent_handler
 from bot.utils.common.config import CRYPTORANK_API_KEY, API_KEY
 from bot.utils.validations import clean_fundraise_data, extract_tokenomics
-from bot.utils.resources.files_worker.google_doc import load_document_for_garbage_list
+from bot.utils.resources.files_worker.google_doc import get_reference_lists
 from bot.database.db_operations import (
     get_one,
     get_all,
@@ -52,14 +58,19 @@ from bot.utils.common.consts import (
     COINGECKO_API,
     CRYPTOCOMPARE_API,
     BINANCE_API,
-    LLAMA_API_BASE,
-    LLAMA_API_PROTOCOL,
     SELECTOR_TOP_100_WALLETS,
     SELECTOR_TWITTERSCORE,
+    SELECTOR_TWITTERSCORE_VALUE,
+    SCRAPE_DEADLINES,
     RATING_LABELS,
     CRYPTORANK_API_URL,
-    START_TITLE_FOR_GARBAGE_CATEGORIES,
-    END_TITLE_FOR_GARBAGE_CATEGORIES,
+    CMC_QUOTES_BATCH_SIZE,
+    REFRESH_GROUP_INTERVALS,
+    METRIC_REFRESH_GROUPS,
+    METRIC_SOURCES,
+    METRIC_STATES,
+    PRICE_HISTORY_SOURCES,
+    PRICE_HISTORY_SOURCE_TIMEOUT,
 )
 from bot.utils.common.params import (
     get_header_params,
@@ -79,20 +90,31 @@ logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(
 logger = logging.getLogger(__name__)
 
 
+@single_flight
 @retry(stop=stop_after_attempt(2), wait=wait_fixed(3))
-def get_crypto_key(symbol: str) -> str:
+async def get_crypto_key(symbol: str) -> str:
     """
-    Получает `key` для токена по его символу (тикеру) через API CryptoRank
+    Получает `key` для токена по его символу (тикеру): из справочника идентификаторов,
+    а если его там нет - через API CryptoRank
     """
+    key = await get_provider_id("cryptorank", symbol)
+    if key:
+        return key
+
     params = {"symbol": symbol}
     headers = {"X-Api-Key": CRYPTORANK_API_KEY, "Accept": "application/json"}
-    response = requests.get(CRYPTORANK_API_URL, params=params, headers=headers)
 
-    if response.status_code == 200:
-        data = response.json()
-        print(f"data in get_crypto_key: {data}")
-        if "data" in data and len(data["data"]) > 0:
-            return data["data"][0]["key"]
+    async with limited_request("cryptorank", CRYPTORANK_API_URL, params=params, headers=headers) as response:
+        if response.status == 200:
+            data = await response.json(content_type=None)
+            print(f"data in get_crypto_key: {data}")
+            if "data" in data and len(data["data"]) > 0:
+                key = data["data"][0]["key"]
+
+    if key:
+        await remember_provider_id("cryptorank", symbol, key)
+
+    return key
 
 
 @retry(stop=stop_after_attempt(2), wait=wait_fixed(3))
@@ -237,159 +259,124 @@ async def get_project_and_tokenomics(project_names: list, project_tier: str = No
         raise ExceptionError(str(e))
 
 
+@single_flight
 @retry(stop=stop_after_attempt(2), wait=wait_fixed(3))
 async def get_twitter_link_by_symbol(symbol: str):
     """
-    Получает ссылку на твиттер по символу токена.
+    Получает ссылку на твиттер, описание, название и категории проекта по символу токена
+    из сохранённого описания токена CoinMarketCap.
     """
 
-    url = f"{COINMARKETCUP_API}info?symbol={symbol}"
-    header_params = get_header_params(coin_name=symbol)
-    garbage_categories = load_document_for_garbage_list(
-        START_TITLE_FOR_GARBAGE_CATEGORIES,
-        END_TITLE_FOR_GARBAGE_CATEGORIES,
-    )
+    metadata = await get_project_metadata(symbol)
+    if not metadata:
+        print(f"Cryptocurrency with symbol '{symbol}' not found.")
+        return None, None, None, []
 
-    async with client_session().get(url, headers=header_params["headers"]) as response:
-        if response.status == 200:
-            data = await response.json()
-            print("CoinMarketCup data: ---", data)
-            if symbol in data["data"]:
-                project_data = data["data"][symbol]
-
-                # Извлекаем основную информацию
-                description = project_data.get("description", None)
-                lower_name = project_data.get("name", None)
-                urls = project_data.get("urls", {})
-                twitter_links = urls.get("twitter", [])
-
-                # Извлекаем категории проекта
-                tag_names = project_data.get("tag-names", [])
-                tag_groups = project_data.get("tag-groups", [])
-
-                # Фильтруем только категории (CATEGORY)
-                # Проверяем, что tag_names и tag_groups не равны None
-                if tag_names is None or tag_groups is None:
-                    categories = []
-                else:
-                    categories = [
-                        tag
-                        for tag, group in zip(tag_names, tag_groups)
-                        if group == "CATEGORY" and tag not in garbage_categories
-                    ]
-
-                if twitter_links and description and categories:
-                    twitter_link = twitter_links[0].lower()
-                    return (
-                        twitter_link,
-                        description,
-                        lower_name.lower(),
-                        categories,
-                    )
-                else:
-                    print(f"Twitter link for '{symbol}' not found.")
-                    return None, None, None, []
-            else:
-                print(f"Cryptocurrency with symbol '{symbol}' not found.")
-                return None, None, None, []
-        else:
-            print(f"Error retrieving data: {response.status}, {await response.text()}")
-            return None, None, None, []
+    reference_lists = await get_reference_lists()
 
+    description = metadata["description"]
+    twitter_links = metadata["twitter_links"]
+    # Из категорий исключаются входящие в мусорный список
+    categories = [tag for tag in metadata["categories"] if not reference_lists.is_garbage_category(tag)]
 
+    if twitter_links and description and categories:
+        return (
+            twitter_links[0].lower(),
+            description,
+            metadata["name"].lower(),
+            categories,
+        )
+
+    print(f"Twitter link for '{symbol}' not found.")
+    return None, None, None, []
+
+
+@single_flight
 @retry(stop=stop_after_attempt(2), wait=wait_fixed(3))
 async def get_twitter(name: str):
     """
     Получает информацию о твиттере и твиттерскоре по токену.
     """
 
-    if context is None:
-        raise RuntimeError("❌ Ошибка: контекст браузера не инициализирован!")
-
-    page = await context.new_page()
     if type(name) is str:
         coin_name = name
     else:
         coin_name, about, lower_name, categories = name
 
-    await page.route(
-        "**/*",
-        lambda route: route.continue_() if "image" not in route.request.resource_type else route.abort(),
-    )
     coin = coin_name.split("/")[-1]
+    deadline = ScrapeDeadline(SCRAPE_DEADLINES["twitterscore"])
+    twitter = twitterscore = None
 
-    try:
-        await page.goto(f"{TWITTERSCORE_API}twitter/{coin}/overview/?i=16846")
-        await asyncio.sleep(15)
-    except Exception as e:
-        await page.close()
-        return None
+    async with browser_page("twitterscore") as page:
+        try:
+            await page.goto(
+                f"{TWITTERSCORE_API}twitter/{coin}/overview/?i=16846",
+                wait_until="domcontentloaded",
+                timeout=deadline.timeout(),
+            )
+        except Exception as e:
+            record_scrape_latency("twitterscore", deadline.elapsed, False)
+            return None
 
-    try:
-        await page.wait_for_selector(SELECTOR_TWITTERSCORE, timeout=30000)
-        twitter = await page.locator(SELECTOR_TWITTERSCORE).first.inner_text()
-        print("twitter: ", twitter)
-    except:
-        twitter = None
+        # Количество подписчиков и TwitterScore подгружаются скриптами страницы, ждём сами значения
+        try:
+            twitter = await wait_for_stable_text(page, SELECTOR_TWITTERSCORE, deadline.timeout())
+            print("twitter: ", twitter)
+        except Exception:
+            twitter = None
 
-    try:
-        twitterscore = await page.locator("#insideChartCount").inner_text()
-    except:
-        twitterscore = None
+        try:
+            twitterscore = await wait_for_stable_text(page, SELECTOR_TWITTERSCORE_VALUE, deadline.timeout())
+        except Exception:
+            twitterscore = None
 
-    await page.close()
+    record_scrape_latency("twitterscore", deadline.elapsed, bool(twitter or twitterscore))
 
     return {"twitter": twitter, "twitterscore": twitterscore} if twitter or twitterscore else None
 
 
+@single_flight
 @retry(stop=stop_after_attempt(2), wait=wait_fixed(3))
 async def get_top_100_wallets(user_coin_name: str):
     """
     Получает процент токенов на топ 100 кошельках блокчейна.
     """
     try:
-        if context is None:
-            raise RuntimeError("❌ Ошибка: контекст браузера не инициализирован!")
-
-        page = await context.new_page()
         coin = user_coin_name.split("/")[-1]
         logging.info(f"Запрашиваем данные для {coin}")
 
-        try:
-            # Переход на страницу richlist
-            await page.goto(f"{COINCARP_API}{coin}/richlist/", timeout=120000)
-
-            # Даем время для загрузки JS
-            await page.wait_for_load_state("networkidle")
-            await asyncio.sleep(5)  # Подстраховка
+        deadline = ScrapeDeadline(SCRAPE_DEADLINES["coincarp"])
+        top_100_percentage = None
 
-            # Проверяем наличие элемента
-            element = await page.query_selector(SELECTOR_TOP_100_WALLETS)
+        async with browser_page("coincarp") as page:
+            try:
+                # Переход на страницу richlist
+                await page.goto(
+                    f"{COINCARP_API}{coin}/richlist/",
+                    wait_until="domcontentloaded",
+                    timeout=deadline.timeout(),
+                )
 
-            if not element:
-                logging.warning(f"Элемент {SELECTOR_TOP_100_WALLETS} не найден для {coin}")
-                return None  # Возвращаем None, если элемент не найден
+                # Процент подгружается скриптами страницы, ждём само значение
+                top_100_text = await wait_for_stable_text(page, SELECTOR_TOP_100_WALLETS, deadline.timeout(), "%")
 
-            top_100_text = await element.inner_text()
+                logging.info(f"Текст топ-100: {top_100_text}")
 
-            logging.info(f"Текст топ-100: {top_100_text}")
+                # Преобразуем в число
+                try:
+                    top_100_percentage = round(float(top_100_text.replace("%", "").strip()) / 100, 2)
+                except ValueError:
+                    top_100_percentage = None
 
-            # Преобразуем в число
-            try:
-                top_100_percentage = float(top_100_text.replace("%", "").strip())
-                return round(top_100_percentage / 100, 2)
-            except ValueError:
-                return None
-
-        except TimeoutError as time_error:
-            logging.info(f"Таймаут ожидания страницы: {time_error}")
-        except ValueError as value_error:
-            logging.info(f"Ошибка обработки данных: {value_error}")
-        except Exception as e:
-            logging.info(f"Непредвиденная ошибка: {e}")
+            except PlaywrightTimeoutError as time_error:
+                logging.warning(f"Элемент {SELECTOR_TOP_100_WALLETS} не загрузился для {coin}: {time_error}")
+            except ValueError as value_error:
+                logging.info(f"Ошибка обработки данных: {value_error}")
+            except Exception as e:
+                logging.info(f"Непредвиденная ошибка: {e}")
 
-        finally:
-            await page.close()
+        record_scrape_latency("coincarp", deadline.elapsed, top_100_percentage is not None)
+        return top_100_percentage
 
     except AttributeError as attr_error:
         raise AttributeAccessError(f"Ошибка доступа к атрибуту: {attr_error}")
@@ -401,6 +388,7 @@ async def get_top_100_wallets(user_coin_name: str):
         raise ExceptionError(f"Общая ошибка: {e}")
 
 
+@single_flight
 @retry(stop=stop_after_attempt(2), wait=wait_fixed(3))
 async def fetch_tokenomics_data(url: str) -> list:
     """
@@ -408,119 +396,115 @@ async def fetch_tokenomics_data(url: str) -> list:
     """
     tokenomics_data = []
 
-    if context is None:
-        raise RuntimeError("❌ Ошибка: контекст браузера не инициализирован!")
-
-    page = await context.new_page()
-
-    try:
+    async with browser_page() as page:
+        try:
 
-        # Поиск таблицы на Cryptorank (для 'vesting' запросов)
-        if "vesting" in url:
-            try:
+            # Поиск таблицы на Cryptorank (для 'vesting' запросов)
+            if "vesting" in url:
+                try:
+                    await page.goto(url, wait_until="networkidle")
+
+                    # Ждем появление контента с увеличенным таймаутом
+                    await page.wait_for_selector("table", timeout=5000)
+                    content = await page.content()
+                    soup = BeautifulSoup(content, "html.parser")
+
+                    table = soup.find("table")
+                    if table:
+                        rows = table.find_all("tr")[1:]
+                        for row in rows:
+                            columns = row.find_all("td")
+                            if len(columns) >= 2:
+                                name = columns[0].get_text(strip=True)
+                                percentage = columns[1].get_text(strip=True)
+                                tokenomics_data.append(f"{name} ({percentage})")
+                except Exception as e:
+                    print(f"❌ Ошибка при поиске таблицы: {e}")
+
+            # Парсим ICO-токеномику (Cryptorank API - ico)
+            elif "ico" in url:
                 await page.goto(url, wait_until="networkidle")
 
-                # Ждем появление контента с увеличенным таймаутом
-                await page.wait_for_selector("table", timeout=5000)
-                content = await page.content()
-                soup = BeautifulSoup(content, "html.parser")
-
-                table = soup.find("table")
-                if table:
-                    rows = table.find_all("tr")[1:]
-                    for row in rows:
-                        columns = row.find_all("td")
-                        if len(columns) >= 2:
-                            name = columns[0].get_text(strip=True)
-                            percentage = columns[1].get_text(strip=True)
-                            tokenomics_data.append(f"{name} ({percentage})")
-            except Exception as e:
-                print(f"❌ Ошибка при поиске таблицы: {e}")
+                await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+                await page.wait_for_timeout(2000)
 
-        # Парсим ICO-токеномику (Cryptorank API - ico)
-        elif "ico" in url:
-            await page.goto(url, wait_until="networkidle")
+                try:
+                    # 1. Ждём появления заголовка с текстом 'Token allocation'
+                    token_allocation_header = await page.query_selector(
+                        "xpath=//h3[contains(text(), 'Token allocation')]"
+                    )
+                    if not token_allocation_header:
+                        print("❌ 'Token allocation' не найдено на странице.")
 
-            await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-            await page.wait_for_timeout(2000)
+                    # 2. Поднимаемся к родительскому контейнеру.
+                    tokenomics_container = await token_allocation_header.query_selector(
+                        "xpath=ancestor::div[contains(@class, 'sc-c6d4550b-0')]"
+                    )
+                    if not tokenomics_container:
+                        print("❌ Не удалось найти контейнер с классом 'sc-c6d4550b-0'.")
 
-            try:
-                # 1. Ждём появления заголовка с текстом 'Token allocation'
-                token_allocation_header = await page.query_selector("xpath=//h3[contains(text(), 'Token allocation')]")
-                if not token_allocation_header:
-                    print("❌ 'Token allocation' не найдено на странице.")
-
-                # 2. Поднимаемся к родительскому контейнеру.
-                tokenomics_container = await token_allocation_header.query_selector(
-                    "xpath=ancestor::div[contains(@class, 'sc-c6d4550b-0')]"
-                )
-                if not tokenomics_container:
-                    print("❌ Не удалось найти контейнер с классом 'sc-c6d4550b-0'.")
-
-                # 3. Внутри контейнера ищем список <ul>
-                ul_element = await tokenomics_container.query_selector("ul")
-                if not ul_element:
-                    print("❌ Не найден тег <ul> в блоке tokenomics.")
-
-                # 4. Собираем все элементы <li> внутри <ul>
-                li_elements = await ul_element.query_selector_all("li")
-                if not li_elements:
-                    print("❌ Нет элементов <li> внутри <ul>.")
-
-                print(f"✅ Найдено {len(li_elements)} элементов <li> с распределением.")
-
-                for li in li_elements:
-                    try:
-                        print("li: ------", li)
-                        # Ищем название (p, например 'Allocated After 2030')
-                        name_tag = await li.query_selector("p")
-                        name = await name_tag.inner_text() if name_tag else "Не найдено"
-
-                        # Ищем процент (span, например '52.172%')
-                        span_tags = await li.query_selector_all("span")
-                        if len(span_tags) > 1:
-                            percentage = await span_tags[1].inner_text()
-
-                        if name != "Не найдено" and percentage != "Не найдено":
-                            tokenomics_data.append(f"{name} ({percentage})")
-                        else:
-                            print(f"⚠️ Пропущен элемент (нет данных): {await li.inner_html()}")
-                    except Exception as e:
-                        print(f"❌ Ошибка при обработке <li>: {e}")
-                        print(f"🚨 Проблемный элемент: {await li.inner_html()}")
+                    # 3. Внутри контейнера ищем список <ul>
+                    ul_element = await tokenomics_container.query_selector("ul")
+                    if not ul_element:
+                        print("❌ Не найден тег <ul> в блоке tokenomics.")
 
-            except Exception as exc:
-                print(f"❌ Сбой при поиске 'Token allocation': {exc}")
+                    # 4. Собираем все элементы <li> внутри <ul>
+                    li_elements = await ul_element.query_selector_all("li")
+                    if not li_elements:
+                        print("❌ Нет элементов <li> внутри <ul>.")
 
-        # Для Tokenomist API
-        else:
-            try:
-                await page.goto(url, wait_until="networkidle")
+                    print(f"✅ Найдено {len(li_elements)} элементов <li> с распределением.")
 
-                await page.wait_for_selector("div.tokenomics-container > div", timeout=5000)
-                content = await page.content()
-                soup = BeautifulSoup(content, "html.parser")
-
-                allocation_divs = soup.select("div.tokenomics-container > div")
-                for div in allocation_divs:
-                    try:
-                        name = div.select_one("p").get_text(strip=True)
-                        percentage = div.select_one("span").get_text(strip=True)
-                        tokenomics_data.append(f"{name} ({percentage})")
-                    except AttributeError:
-                        continue
-            except Exception as e:
-                print(f"❌ Ошибка при поиске данных Tokenomist: {e}")
+                    for li in li_elements:
+                        try:
+                            print("li: ------", li)
+                            # Ищем название (p, например 'Allocated After 2030')
+                            name_tag = await li.query_selector("p")
+                            name = await name_tag.inner_text() if name_tag else "Не найдено"
+
+                            # Ищем процент (span, например '52.172%')
+                            span_tags = await li.query_selector_all("span")
+                            if len(span_tags) > 1:
+                                percentage = await span_tags[1].inner_text()
+
+                            if name != "Не найдено" and percentage != "Не найдено":
+                                tokenomics_data.append(f"{name} ({percentage})")
+                            else:
+                                print(f"⚠️ Пропущен элемент (нет данных): {await li.inner_html()}")
+                        except Exception as e:
+                            print(f"❌ Ошибка при обработке <li>: {e}")
+                            print(f"🚨 Проблемный элемент: {await li.inner_html()}")
+
+                except Exception as exc:
+                    print(f"❌ Сбой при поиске 'Token allocation': {exc}")
+
+            # Для Tokenomist API
+            else:
+                try:
+                    await page.goto(url, wait_until="networkidle")
 
-    except Exception as e:
-        logging.error(f"🚨 Ошибка при получении данных: {e}")
+                    await page.wait_for_selector("div.tokenomics-container > div", timeout=5000)
+                    content = await page.content()
+                    soup = BeautifulSoup(content, "html.parser")
+
+                    allocation_divs = soup.select("div.tokenomics-container > div")
+                    for div in allocation_divs:
+                        try:
+                            name = div.select_one("p").get_text(strip=True)
+                            percentage = div.select_one("span").get_text(strip=True)
+                            tokenomics_data.append(f"{name} ({percentage})")
+                        except AttributeError:
+                            continue
+                except Exception as e:
+                    print(f"❌ Ошибка при поиске данных Tokenomist: {e}")
 
-    finally:
-        await page.close()
+        except Exception as e:
+            logging.error(f"🚨 Ошибка при получении данных: {e}")
 
     return tokenomics_data
 
 
+@single_flight
 @retry(stop=stop_after_attempt(2), wait=wait_fixed(3))
 async def get_percentage_data(lower_name: str, user_coin_name: str):
     """
@@ -538,7 +522,7 @@ async def get_percentage_data(lower_name: str, user_coin_name: str):
             ):
                 return extract_tokenomics(user_tokenomics.distribution)
 
-        cryptorank_coin_key = get_crypto_key(user_coin_name)
+        cryptorank_coin_key = await get_crypto_key(user_coin_name)
 
         # Запрос к Cryptorank
         vesting_url = f"{CRYPTORANK_WEBSITE}price/{lower_name}/vesting"
@@ -567,6 +551,7 @@ async def get_percentage_data(lower_name: str, user_coin_name: str):
         raise ExceptionError(str(e))
 
 
+@single_flight
 @retry(stop=stop_after_attempt(2), wait=wait_fixed(3))
 async def get_coin_description(coin_name: str):
     """
@@ -577,17 +562,15 @@ async def get_coin_description(coin_name: str):
     description = ""
 
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url)
-
-        if response.status_code == 200:
-            data = response.json()
-            if "description" in data and "en" in data["description"]:
-                description = data["description"]["en"]
+        async with limited_request("coingecko", url) as response:
+            if response.status == 200:
+                data = await response.json()
+                if "description" in data and "en" in data["description"]:
+                    description = data["description"]["en"]
+                else:
+                    logging.warning(f"No description found for {coin_name}.")
             else:
-                logging.warning(f"No description found for {coin_name}.")
-        else:
-            logging.error(f"Failed to fetch data: {response.status_code} - {response.text}")
+                logging.error(f"Failed to fetch data: {response.status} - {await response.text()}")
 
     except Exception as e:
         raise ExceptionError(str(e))
@@ -595,6 +578,17 @@ async def get_coin_description(coin_name: str):
     return description
 
 
+@single_flight
+async def fetch_cryptorank_page(url: str) -> tuple[int, str]:
+    """
+    Загружает HTML-страницу сайта CryptoRank, возвращает статус ответа и текст страницы
+    """
+
+    async with limited_request("cryptorank", url) as response:
+        return response.status, await response.text()
+
+
+@single_flight
 @retry(stop=stop_after_attempt(2), wait=wait_fixed(3))
 async def get_fundraise(user_coin_name: str, lower_name: str = None):
     """
@@ -603,20 +597,18 @@ async def get_fundraise(user_coin_name: str, lower_name: str = None):
 
     try:
         print(f"get_fundraise {user_coin_name}")
-        user_coin_key = get_crypto_key(user_coin_name)
+        user_coin_key = await get_crypto_key(user_coin_name)
         if not user_coin_key:
             logging.info(f"Токен '{user_coin_name}' не найден в CryptoRank API")
             return None, "-"
 
-        url = f"{CRYPTORANK_WEBSITE}ico/{user_coin_key}"
-        response = requests.get(url)
+        status, page = await fetch_cryptorank_page(f"{CRYPTORANK_WEBSITE}ico/{user_coin_key}")
 
-        if response.status_code != 200:
-            url = f"{CRYPTORANK_WEBSITE}ico/{lower_name}"
-            response = requests.get(url)
+        if status != 200:
+            status, page = await fetch_cryptorank_page(f"{CRYPTORANK_WEBSITE}ico/{lower_name}")
 
-        if response.status_code == 200:
-            soup = BeautifulSoup(response.text, "html.parser")
+        if status == 200:
+            soup = BeautifulSoup(page, "html.parser")
 
             # Ищем div, который содержит два <p>, первый из которых "Total Raised"
             funding_divs = soup.find_all("div")
@@ -673,7 +665,7 @@ async def get_fundraise(user_coin_name: str, lower_name: str = None):
             return clean_data, investors_data
 
         else:
-            logging.error(f"Ошибка при получении данных: {response.status_code}")
+            logging.error(f"Ошибка при получении данных: {status}")
             return None, "-"
 
     except AttributeError as attr_error:
@@ -686,6 +678,7 @@ async def get_fundraise(user_coin_name: str, lower_name: str = None):
         raise ExceptionError(str(e))
 
 
+@single_flight
 @retry(stop=stop_after_attempt(2), wait=wait_fixed(3))
 async def fetch_coingecko_data(user_coin_name: str = None):
     """
@@ -694,8 +687,8 @@ async def fetch_coingecko_data(user_coin_name: str = None):
 
     try:
         url = f"{COINGECKO_API}{user_coin_name}"
-        response = requests.get(url)
-        data = response.json()
+        async with limited_request("coingecko", url) as response:
+            data = await response.json(content_type=None)
 
         if "market_data" in data:
             coin_name = data["name"].lower()
@@ -733,12 +726,13 @@ async def fetch_coinmarketcap_data(
     """
 
     try:
-        response = requests.get(
+        async with limited_request(
+            "coinmarketcap",
             f"{COINMARKETCUP_API}quotes/latest",
             headers=headers,
             params=parameters,
-        )
-        data = response.json()
+        ) as response:
+            data = await response.json(content_type=None)
         print("COINMARKETCUP_API: ", data)
 
         # Проверяем, есть ли "data" в ответе
@@ -760,26 +754,9 @@ async def fetch_coinmarketcap_data(
                 logging.error(f"Ошибка: Отсутствует ключ '{key}' для '{user_coin_name}'.")
                 raise MissingKeyError(f"Ошибка: отсутствует ключ '{key}' для '{user_coin_name}'.")
 
-        coin_name = coin_info["name"].lower()
-        logging.info(f"{coin_name}, {coin_info['name']}")
-
-        crypto_data = coin_info["quote"].get("USD", {})
-        price = crypto_data.get("price", 0)
-        market_cap = crypto_data.get("market_cap", 0)
-        circulating_supply = coin_info.get("circulating_supply", 0)
-        total_supply = coin_info.get("total_supply", 0)
+        logging.info(f"{coin_info['name'].lower()}, {coin_info['name']}")
 
-        # Вычисление FDV
-        coin_fdv = total_supply * price if price > 0 else None
-
-        return {
-            "coin_name": coin_name,
-            "circulating_supply": circulating_supply,
-            "total_supply": total_supply,
-            "price": price,
-            "capitalization": market_cap,
-            "coin_fdv": coin_fdv,
-        }
+        return parse_coinmarketcap_quote(coin_info)
 
     except AttributeError as attr_error:
         logging.error(f"Ошибка атрибута: {attr_error}")
@@ -795,8 +772,84 @@ async def fetch_coinmarketcap_data(
         raise ExceptionError(str(e))
 
 
+def parse_coinmarketcap_quote(coin_info: dict) -> dict:
+    """
+    Приводит данные токена из ответа quotes/latest к общему для CoinMarketCap и CoinGecko формату.
+    """
+
+    crypto_data = coin_info["quote"].get("USD", {})
+    price = crypto_data.get("price", 0)
+    total_supply = coin_info.get("total_supply", 0)
+
+    return {
+        "coin_name": coin_info["name"].lower(),
+        "circulating_supply": coin_info.get("circulating_supply", 0),
+        "total_supply": total_supply,
+        "price": price,
+        "capitalization": crypto_data.get("market_cap", 0),
+        # Вычисление FDV
+        "coin_fdv": total_supply * price if price and price > 0 else None,
+    }
+
+
+@retry(stop=stop_after_attempt(2), wait=wait_fixed(3))
+async def fetch_coinmarketcap_quotes_batch(symbols: list[str]) -> dict[str, dict]:
+    """
+    Получение котировок нескольких токенов из CoinMarketCap одним запросом.
+    Токены, которых нет в ответе или у которых не хватает данных, пропускаются.
+    """
+
+    header_params = get_header_params(",".join(symbols))
+    parameters = {**header_params["parameters"], "skip_invalid": "true"}
+
+    async with limited_request(
+        "coinmarketcap",
+        f"{COINMARKETCUP_API}quotes/latest",
+        headers=header_params["headers"],
+        params=parameters,
+    ) as response:
+        response.raise_for_status()
+        data = await response.json()
+
+    quotes = {}
+    for symbol, coin_info in (data.get("data") or {}).items():
+        if isinstance(coin_info, list):
+            coin_info = coin_info[0] if coin_info else None
+
+        required_keys = ("name", "quote", "circulating_supply", "total_supply")
+        if not coin_info or any(key not in coin_info for key in required_keys):
+            logging.warning(f"Неполные данные CoinMarketCap для '{symbol}', токен пропущен.")
+            continue
+
+        quotes[symbol] = parse_coinmarketcap_quote(coin_info)
+
+    return quotes
+
+
+async def fetch_coinmarketcap_quotes(symbols: list[str], batch_size: int = CMC_QUOTES_BATCH_SIZE) -> dict[str, dict]:
+    """
+    Получение котировок списка токенов из CoinMarketCap пакетами по batch_size символов.
+    Возвращает словарь {символ: данные токена}; ошибка одного пакета не прерывает остальные.
+    """
+
+    unique_symbols = list(dict.fromkeys(symbols))
+    quotes = {}
+
+    for start in range(0, len(unique_symbols), batch_size):
+        batch = unique_symbols[start : start + batch_size]
+        try:
+            quotes.update(await fetch_coinmarketcap_quotes_batch(batch))
+        except Exception as e:
+            logging.error(f"Ошибка при пакетном запросе котировок CoinMarketCap ({batch[0]}...{batch[-1]}): {e}")
+
+    logging.info(f"Получены котировки CoinMarketCap для {len(quotes)} из {len(unique_symbols)} токенов")
+
+    return quotes
+
+
+@single_flight
 @retry(stop=stop_after_attempt(2), wait=wait_fixed(3))
-def fetch_binance_data(symbol: str):
+async def fetch_binance_data(symbol: str):
     """
     Получение макс/мин цены токена с Binance API
     """
@@ -804,10 +857,9 @@ def fetch_binance_data(symbol: str):
     try:
         # Запрос данных с Binance API
         params = {"symbol": symbol, "interval": "1d", "limit": 730}
-        response = requests.get(f"{BINANCE_API}klines", params=params)
-        response.raise_for_status()  # Проверяем наличие ошибок HTTP
-
-        data = response.json()
+        async with limited_request("binance", f"{BINANCE_API}klines", params=params) as response:
+            response.raise_for_status()  # Проверяем наличие ошибок HTTP
+            data = await response.json(content_type=None)
 
         # Извлекаем максимальные и минимальные значения из свечей
         highs = [float(candle[2]) for candle in data]  # Индекс 2 для 'high'
@@ -817,30 +869,121 @@ def fetch_binance_data(symbol: str):
         min_price = min(lows)
         return max_price, min_price
 
-    except requests.exceptions.RequestException as e:
+    except aiohttp.ClientResponseError as e:
+        if is_provider_failure(e):
+            raise
+        # Binance отвечает 400, если такой торговой пары нет
         logging.error(f"Ошибка при запросе к Binance API: {e}")
         return None, None
 
+    except aiohttp.ClientError:
+        raise
+
     except Exception as e:
         logging.error(f"Произошла ошибка: {e}")
         return None, None
 
 
+@single_flight
 @retry(stop=stop_after_attempt(2), wait=wait_fixed(3))
-def get_coingecko_id_by_symbol(symbol: str):
+async def get_coingecko_id_by_symbol(symbol: str):
     """
-    Получение ID-токена из CoinGecko по тикеру
+    Получение ID-токена из CoinGecko по тикеру.
+    Полный список токенов CoinGecko загружается, только если справочник идентификаторов ещё не заполнен.
     """
 
+    if await has_provider_ids("coingecko"):
+        return await get_provider_id("coingecko", symbol)
+
     url = f"{COINGECKO_API}list"
-    response = requests.get(url)
-    tokens = response.json()
-    for token in tokens:
-        if token["symbol"].lower() == symbol.lower():
-            return token["id"]
+    async with limited_request("coingecko", url) as response:
+        async for token in iter_json_array(response, fields=("id", "symbol")):
+            if token["symbol"].lower() == symbol.lower():
+                return token["id"]
     return None
 
 
+async def fetch_cryptocompare_max_min_data(params: dict, min_value: float = 0):
+    """
+    Получение макс/мин цены токена из CryptoCompare (дневные свечи за период из params["limit"]).
+    Цены не выше min_value отбрасываются.
+    """
+
+    max_price = None
+    min_price = None
+
+    async with limited_request("cryptocompare", CRYPTOCOMPARE_API, params=params) as response:
+        response.raise_for_status()
+        # Свечи лежат в Data.Data, из каждой нужны только high и low
+        async for day in iter_json_array(response, key="Data", fields=("high", "low")):
+            if day["high"] is not None and day["high"] > min_value:
+                max_price = day["high"] if max_price is None else max(max_price, day["high"])
+            if day["low"] is not None and day["low"] > min_value:
+                min_price = day["low"] if min_price is None else min(min_price, day["low"])
+
+    return max_price, min_price
+
+
+async def fetch_coingecko_history_max_min(fsym: str, tsym: str):
+    """
+    Получение макс/мин цены токена из CoinGecko: поиск ID токена по тикеру и запрос графика цены.
+    """
+
+    token_id = await get_coingecko_id_by_symbol(fsym)
+    if not token_id:
+        return None, None
+
+    return await fetch_coingecko_max_min_data(token_id, tsym)
+
+
+@single_flight
+async def fetch_price_history_max_min(cryptocompare_params: dict, cryptocompare_params_with_full_coin_name: dict):
+    """
+    Получение исторических макс/мин цены токена из первого источника, который вернёт данные.
+    Источники опрашиваются в порядке возрастания ожидаемого времени получения данных,
+    источники с разомкнутым автоматом отключения пропускаются, ответ каждого ограничен по времени.
+    """
+
+    fsym, tsym = cryptocompare_params["fsym"], cryptocompare_params["tsym"]
+    sources = {
+        "cryptocompare_symbol": lambda: fetch_cryptocompare_max_min_data(cryptocompare_params, 0.00001),
+        "cryptocompare_full_name": lambda: fetch_cryptocompare_max_min_data(cryptocompare_params_with_full_coin_name),
+        "binance": lambda: fetch_binance_data(fsym + tsym),
+        "coingecko": lambda: fetch_coingecko_history_max_min(fsym, tsym),
+    }
+
+    for name in rank_providers(PRICE_HISTORY_SOURCES):
+        health = get_health(name)
+        if not health.begin_request():
+            continue
+
+        started_at = time.monotonic()
+        try:
+            max_price, min_price = await asyncio.wait_for(sources[name](), PRICE_HISTORY_SOURCE_TIMEOUT)
+        except asyncio.CancelledError:
+            health.probing = False
+            raise
+        except Exception as e:
+            logging.warning(f"[{name}] Ошибка при получении истории цены {fsym}: {e}")
+            max_price, min_price = None, None
+
+            # Неисправностью источника считаются только сбои связи, таймауты, 5xx и отказы по лимиту
+            if is_provider_failure(e):
+                health.record_failure(time.monotonic() - started_at)
+                continue
+
+        # Источник ответил, даже если истории цены по этому токену у него нет
+        health.record_success(time.monotonic() - started_at)
+
+        if max_price and min_price:
+            return max_price, min_price
+
+        logging.info(f"[{name}] Нет истории цены {fsym}, пробуем следующий источник.")
+
+    logging.error(f"Ни один источник не вернул историю цены {fsym}")
+    return None, None
+
+
 @retry(stop=stop_after_attempt(2), wait=wait_fixed(3))
 async def fetch_cryptocompare_data(
     cryptocompare_params: dict,
@@ -849,67 +992,22 @@ async def fetch_cryptocompare_data(
     request_type: str = None,
 ):
     """
-    Получение макс/мин цены токена из CryptoCompare
+    Получение макс/мин цены токена из CryptoCompare (или резервных источников) и рассчитанных от них
+    fail_high и growth_low
     """
 
-    max_price = None
-    min_price = None
     fail_high = None
     growth_low = None
 
     try:
-        # Первый вариант запроса к CryptoCompare
-        response = requests.get(CRYPTOCOMPARE_API, params=cryptocompare_params)
-        data = response.json()
-
-        if "Data" in data and "Data" in data["Data"]:
-            daily_data = data["Data"]["Data"]
-            highs = [day["high"] for day in daily_data if day["high"] > 0.00001]
-            lows = [day["low"] for day in daily_data if day["low"] > 0.00001]
-            max_price = max(highs)
-            min_price = min(lows)
+        max_price, min_price = await fetch_price_history_max_min(
+            cryptocompare_params,
+            cryptocompare_params_with_full_coin_name,
+        )
 
+        if max_price and min_price:
             fail_high = (price / max_price) - 1
             growth_low = price / min_price
-        else:
-            logging.info("Нет данных от первого запроса CryptoCompare, пробуем с полным названием токена.")
-
-            # Второй вариант запроса к CryptoCompare
-            response_full_name = requests.get(
-                CRYPTOCOMPARE_API,
-                params=cryptocompare_params_with_full_coin_name,
-            )
-            data_full_name = response_full_name.json()
-
-            if "Data" in data_full_name and "Data" in data_full_name["Data"]:
-                daily_data = data_full_name["Data"]["Data"]
-                highs = [day["high"] for day in daily_data if day["high"] > 0]
-                lows = [day["low"] for day in daily_data if day["low"] > 0]
-                max_price = max(highs)
-                min_price = min(lows)
-
-                fail_high = (price / max_price) - 1
-                growth_low = price / min_price
-            else:
-                logging.info("Нет данных от CryptoCompare, переключаемся на Binance API.")
-
-                # Попытка получения данных с Binance
-                symbol = cryptocompare_params["fsym"] + cryptocompare_params["tsym"]
-                max_price, min_price = fetch_binance_data(symbol)
-
-                if max_price and min_price:
-                    fail_high = (price / max_price) - 1
-                    growth_low = price / min_price
-                else:
-                    logging.error("Нет данных от Binance API, переключаемся на CoinGecko API.")
-
-                    # Попытка получения данных с CoinGecko
-                    token_id = get_coingecko_id_by_symbol(cryptocompare_params["fsym"])
-                    max_price, min_price = fetch_coingecko_max_min_data(token_id, cryptocompare_params["tsym"])
-
-                    if max_price and min_price:
-                        fail_high = (price / max_price) - 1
-                        growth_low = price / min_price
 
         # Возврат данных в зависимости от типа запроса
         if request_type == "top_and_bottom":
@@ -924,8 +1022,9 @@ async def fetch_cryptocompare_data(
         return None  # Возвращаем None в случае ошибки
 
 
+@single_flight
 @retry(stop=stop_after_attempt(2), wait=wait_fixed(3))
-def fetch_coingecko_max_min_data(fsym: str, tsym: str):
+async def fetch_coingecko_max_min_data(fsym: str, tsym: str):
     """
     Получение макс/мин цены токена с CoinGecko API.
     """
@@ -936,11 +1035,12 @@ def fetch_coingecko_max_min_data(fsym: str, tsym: str):
         vs_currency = tsym.lower()
         url = f"{COINGECKO_API}{coingecko_symbol}/market_chart?vs_currency={vs_currency}&days=730"
 
-        response = requests.get(url)
-        data = response.json()
+        async with limited_request("coingecko", url) as response:
+            response.raise_for_status()
+            # Из ответа нужен только массив prices из пар [время, цена]
+            prices = [price[1] async for price in iter_json_array(response, key="prices")]
 
-        if "prices" in data:
-            prices = [price[1] for price in data["prices"]]
+        if prices:
             max_price = max(prices)
             min_price = min(prices)
             return max_price, min_price
@@ -1009,80 +1109,40 @@ async def fetch_fundraise_data(user_coin_name: str, lower_name: str = None):
         raise ExceptionError(str(e))
 
 
+@single_flight
 @retry(stop=stop_after_attempt(2), wait=wait_fixed(3))
 async def fetch_tvl_data(coin_name: str):
     """
     Получение текущего TVL блокчейна, или токенов в стейкинге, если TVL недоступен.
     """
 
-    url = f"{LLAMA_API_BASE}{coin_name.lower()}"
+    try:
+        tvl = await get_current_tvl(coin_name)
+        if tvl is None:
+            logging.error(f"No TVL data found for {coin_name}.")
 
-    async with aiohttp.ClientSession() as session:
-        try:
-            async with session.get(url) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    if isinstance(data, list) and data:
-                        last_entry = data[-1]
-                        print("last_entry: ", last_entry)
-                        last_tvl = last_entry.get("tvl", 0)
-                        return float(last_tvl)
-                    else:
-                        logging.error(f"No TVL data found for {coin_name} using base_url.")
-
-            # Если базовый URL не сработал, пробуем через протокол URL
-            protocol_query = f"{LLAMA_API_PROTOCOL}{coin_name.lower()}"
-            async with session.get(protocol_query) as response:
-                if response.status == 200:
-                    data = await response.json()
-
-                    # Проверяем наличие данных о текущих TVL
-                    current_chain_tvl = data.get("currentChainTvls", {})
-                    if current_chain_tvl:
-                        # Ищем ключи, связанные со стейкингом
-                        staking_keys = [
-                            "staking",
-                            f"{coin_name.lower()}-staking",
-                        ]
-                        for key in staking_keys:
-                            if key in current_chain_tvl:
-                                staking_tvl = current_chain_tvl[key]
-                                print(f"Найден TVL стейкинга ({key}): {staking_tvl}")
-                                return staking_tvl
-
-                    logging.error(f"No staking TVL found for {coin_name} using protocol_url.")
-                else:
-                    logging.error(f"Protocol URL failed for {coin_name}. Status code: {response.status}")
-                    return None
-
-        except AttributeError as e:
-            raise AttributeAccessError(str(e))
-        except KeyError as e:
-            raise MissingKeyError(str(e))
-        except ValueError as e:
-            raise ValueProcessingError(str(e))
-        except Exception as e:
-            raise ExceptionError(str(e))
+        return tvl
+
+    except AttributeError as e:
+        raise AttributeAccessError(str(e))
+    except KeyError as e:
+        raise MissingKeyError(str(e))
+    except ValueError as e:
+        raise ValueProcessingError(str(e))
+    except Exception as e:
+        raise ExceptionError(str(e))
 
 
+@single_flight
 @retry(stop=stop_after_attempt(2), wait=wait_fixed(3))
 async def get_lower_name(user_coin_name: str):
     """
     Получение полного названия криптовалюты в нижнем регистре по тикеру.
     """
 
-    url = f"{COINMARKETCUP_API}info"
-    header_params = get_header_params(coin_name=user_coin_name)
-
-    async with aiohttp.ClientSession() as session_local:
-        async with session_local.get(url, headers=header_params["headers"]) as response:
-            if response.status == 200:
-                data = await response.json()
-                logging.info(f"{data['data']}")
-                if user_coin_name.upper() in data["data"]:
-                    lower_name = data["data"][user_coin_name.upper()].get("name", None).lower()
-
-                    return lower_name
+    metadata = await get_project_metadata(user_coin_name)
+    if metadata:
+        return metadata["name"].lower()
 
 
 def get_top_projects_by_capitalization_and_category(
@@ -1182,6 +1242,26 @@ async def get_top_projects_by_capitalization(
         raise ExceptionError(f"Критическая ошибка в get_top_projects_by_capitalization: {e}")
 
 
+def get_metric_state(model_name: str, instance: Any, is_complete: bool) -> str:
+    """
+    Определяет состояние метрик проекта в таблице model_name:
+    - "missing" - записи нет или данные неполные;
+    - "stale" - данные старше интервала обновления своей группы метрик;
+    - "fresh" - данные актуальны. Записи без отметки времени (сохранённые до появления fetched_at)
+      считаются актуальными, их обновит фоновый конвейер.
+    """
+
+    if not instance or not is_complete:
+        return "missing"
+
+    fetched_at = getattr(instance, "fetched_at", None)
+    max_age = REFRESH_GROUP_INTERVALS[METRIC_REFRESH_GROUPS[model_name]]
+    if fetched_at and datetime.now() - fetched_at > timedelta(seconds=max_age):
+        return "stale"
+
+    return "fresh"
+
+
 @retry(stop=stop_after_attempt(2), wait=wait_fixed(3))
 async def check_and_run_tasks(
     project: Project,
@@ -1199,7 +1279,7 @@ async def check_and_run_tasks(
     model_mapping: dict,
 ):
     """
-    Функция, которая проверяет отсутствующие метрики у проекта, если их нет - добавляет в список на выполнение
+    Функция, которая проверяет отсутствующие и устаревшие метрики у проекта, добавляет их в список на выполнение
     и в асинхронном порядке выполняет.
     """
 
@@ -1209,38 +1289,76 @@ async def check_and_run_tasks(
     cryptocompare_params = get_cryptocompare_params(user_coin_name)
     cryptocompare_params_with_full_coin_name = get_cryptocompare_params_with_full_name(lower_name.upper())
 
-    if (
-        investing_metrics
-        and not all(
-            [
-                getattr(investing_metrics, "fundraise", None),
-                getattr(investing_metrics, "fund_level", None),
-                getattr(investing_metrics, "fund_level", "-") not in ["-", None, ""],
-            ]
-        )
-    ) or not investing_metrics:
+    # Границы цены и рыночные метрики обновляются вместе, поэтому берём худшее из двух состояний
+    market_state = max(
+        get_metric_state(
+            "top_and_bottom",
+            top_and_bottom,
+            all([getattr(top_and_bottom, "lower_threshold", None), getattr(top_and_bottom, "upper_threshold", None)]),
+        ),
+        get_metric_state(
+            "market_metrics",
+            market_metrics,
+            all([getattr(market_metrics, "fail_high", None), getattr(market_metrics, "growth_low", None)]),
+        ),
+        key=METRIC_STATES.index,
+    )
+    metric_states = {
+        "investing_metrics": get_metric_state(
+            "investing_metrics",
+            investing_metrics,
+            all(
+                [
+                    getattr(investing_metrics, "fundraise", None),
+                    getattr(investing_metrics, "fund_level", None),
+                    getattr(investing_metrics, "fund_level", "-") not in ["-", None, ""],
+                ]
+            ),
+        ),
+        "social_metrics": get_metric_state(
+            "social_metrics",
+            social_metrics,
+            all(
+                [
+                    getattr(social_metrics, "twitter", "") not in ["-", None, ""],
+                    getattr(social_metrics, "twitterscore", "") not in ["-", None, ""],
+                ]
+            ),
+        ),
+        "funds_profit": get_metric_state(
+            "funds_profit",
+            funds_profit,
+            all(
+                [
+                    getattr(funds_profit, "distribution", None),
+                    getattr(funds_profit, "distribution", "") not in ["--)", "-", "-)", ""],
+                ]
+            ),
+        ),
+        "market_metrics": market_state if price else "fresh",
+        "manipulative_metrics": get_metric_state(
+            "manipulative_metrics",
+            manipulative_metrics,
+            bool(getattr(manipulative_metrics, "top_100_wallet", None)),
+        ),
+        "network_metrics": get_metric_state(
+            "network_metrics",
+            network_metrics,
+            bool(getattr(network_metrics, "tvl", None)),
+        ),
+    }
+
+    missing = [model_name for model_name, state in metric_states.items() if state == "missing"]
+    stale = [model_name for model_name, state in metric_states.items() if state == "stale"]
+    logging.info(f"Метрики {user_coin_name}: отсутствуют - {missing or '-'}, устарели - {stale or '-'}")
+
+    if metric_states["investing_metrics"] != "fresh":
         tasks.append((fetch_fundraise_data(project.coin_name, lower_name), "investing_metrics"))
 
-    if (
-        social_metrics
-        and not all(
-            [
-                getattr(social_metrics, "twitter", "") not in ["-", None, ""],
-                getattr(social_metrics, "twitterscore", "") not in ["-", None, ""],
-            ]
-        )
-    ) or not social_metrics:
+    if metric_states["social_metrics"] != "fresh":
         tasks.append((fetch_twitter_data(twitter_name), "social_metrics"))
 
-    if (
-        funds_profit
-        and not all(
-            [
-                getattr(funds_profit, "distribution", None),
-                getattr(funds_profit, "distribution", "") not in ["--)", "-", "-)", ""],
-            ]
-        )
-    ) or not funds_profit:
+    if metric_states["funds_profit"] != "fresh":
         tasks.append(
             (
                 get_percentage_data(lower_name, user_coin_name),
@@ -1248,19 +1366,7 @@ async def check_and_run_tasks(
             )
         )
 
-    if (
-        not all(
-            [
-                top_and_bottom,
-                market_metrics,
-                getattr(top_and_bottom, "lower_threshold", None),
-                getattr(top_and_bottom, "upper_threshold", None),
-                getattr(market_metrics, "fail_high", None),
-                getattr(market_metrics, "growth_low", None),
-            ]
-        )
-        and price
-    ):
+    if metric_states["market_metrics"] != "fresh":
         tasks.append(
             (
                 fetch_cryptocompare_data(
@@ -1284,10 +1390,10 @@ async def check_and_run_tasks(
             )
         )
 
-    if (manipulative_metrics and not getattr(manipulative_metrics, "top_100_wallet", None)) or not manipulative_metrics:
+    if metric_states["manipulative_metrics"] != "fresh":
         tasks.append((fetch_top_100_wallets(lower_name), "manipulative_metrics"))
 
-    if (network_metrics and not getattr(network_metrics, "tvl", None)) or not network_metrics:
+    if metric_states["network_metrics"] != "fresh":
         tasks.append((fetch_tvl_data(lower_name), "network_metrics"))
 
     # Выполняем задачи
@@ -1320,6 +1426,8 @@ async def check_and_run_tasks(
                     logging.warning(f"Данные после фильтрации пустые, пропускаем сохранение: {data}")
                     continue
 
+                filtered_data_dict.update(fetched_at=datetime.now(), source=METRIC_SOURCES.get(model_name))
+
                 # Сохраняем в базу данных
                 await update_or_create(model, project_id=project.id, defaults=filtered_data_dict)
     logging.info(f"Результаты сохранены: {results}")
@@ -1500,7 +1608,7 @@ async def fetch_categories():
     url = f"{COINMARKETCUP_API}categories"
     headers = {"X-CMC_PRO_API_KEY": API_KEY}
 
-    async with client_session().get(url, headers=headers) as response:
+    async with limited_request("coinmarketcap", url, headers=headers) as response:
         if response.status == 200:
             data = await response.json()
             return [item["name"] for item in data.get("data", [])]
@@ -1513,19 +1621,29 @@ async def fetch_categories():
 async def fetch_top_tokens(limit: int):
     """
     Получает список топ-токенов CoinMarketCap с опциональным лимитом.
+    Помимо символа и рейтинга (cmc_rank) для каждого токена возвращаются рыночные данные
+    в формате fetch_coinmarketcap_data: цена, циркулирующее и общее предложение, капитализация и FDV.
     """
     url = f"{COINMARKETCUP_API}listings/latest?limit={limit}"
     headers = {"X-CMC_PRO_API_KEY": API_KEY}
 
-    async with client_session().get(url, headers=headers) as response:
-        if response.status == 200:
-            data = await response.json()
-            return [{"symbol": item["symbol"], "cmc_rank": item.get("cmc_rank")} for item in data.get("data", [])]
-        else:
+    async with limited_request("coinmarketcap", url, headers=headers) as response:
+        if response.status != 200:
             logging.error(f"Ошибка API CoinMarketCap: {response.status}")
             return []
 
+        # Листинг разбирается потоково: в памяти не держится весь ответ и лишние поля токенов
+        tokens = []
+        async for item in iter_json_array(response, key="data"):
+            token = {"symbol": item["symbol"], "cmc_rank": item.get("cmc_rank")}
+            if "name" in item and "quote" in item:
+                token.update(parse_coinmarketcap_quote(item))
+            tokens.append(token)
+
+    return tokens
+
 
+@single_flight
 @retry(stop=stop_after_attempt(2), wait=wait_fixed(3))
 async def fetch_token_quote(token_symbol: str) -> dict:
     """
@@ -1542,7 +1660,7 @@ async def fetch_token_quote(token_symbol: str) -> dict:
     url = f"{COINMARKETCUP_API}quotes/latest?symbol={token_symbol}"
     headers = {"X-CMC_PRO_API_KEY": API_KEY}
 
-    async with client_session().get(url, headers=headers) as response:
+    async with limited_request("coinmarketcap", url, headers=headers) as response:
         if response.status == 200:
             data = await response.json()
             token_info = data.get("data", {}).get(token_symbol, {})
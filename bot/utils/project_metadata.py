@@ -0,0 +1,115 @@
+import logging
+
+from typing import Optional
+from datetime import datetime, timedelta
+
+from bot.utils.common.config import API_KEY
+from bot.utils.common.rate_limiter import limited_request
+from bot.utils.common.single_flight import single_flight
+from bot.database.db_operations import get_stored_projects_metadata, bulk_upsert_projects_metadata
+from bot.utils.common.consts import (
+    COINMARKETCUP_API,
+    CMC_INFO_BATCH_SIZE,
+    PROJECT_METADATA_TTL,
+    PROJECT_METADATA_MISSING_TTL,
+)
+
+
+def normalize_coinmarketcap_info(symbol: str, coin_info: Optional[dict], fetched_at: datetime) -> dict:
+    """
+    Приводит описание токена из ответа CoinMarketCap info к строке таблицы project_metadata.
+    Из тегов остаются только категории (группа CATEGORY). Для неизвестного токена сохраняется пустая строка,
+    чтобы он не запрашивался повторно до истечения PROJECT_METADATA_MISSING_TTL.
+    """
+
+    coin_info = coin_info or {}
+    tag_names = coin_info.get("tag-names") or []
+    tag_groups = coin_info.get("tag-groups") or []
+
+    return {
+        "symbol": symbol,
+        "name": coin_info.get("name"),
+        "description": coin_info.get("description"),
+        "twitter_links": (coin_info.get("urls") or {}).get("twitter") or [],
+        "categories": [tag for tag, group in zip(tag_names, tag_groups) if group == "CATEGORY"],
+        "fetched_at": fetched_at,
+    }
+
+
+def is_metadata_outdated(row: Optional[dict], now: datetime) -> bool:
+    """
+    Проверяет, нужно ли запросить описание токена заново: описания нет, оно старше PROJECT_METADATA_TTL
+    или это пустая строка неизвестного токена старше PROJECT_METADATA_MISSING_TTL.
+    """
+
+    if not row or not row["fetched_at"]:
+        return True
+
+    ttl = PROJECT_METADATA_TTL if row.get("name") else PROJECT_METADATA_MISSING_TTL
+    return row["fetched_at"] < (now - timedelta(seconds=ttl)).isoformat()
+
+
+async def fetch_coinmarketcap_info_batch(symbols: list[str]) -> list[dict]:
+    """
+    Получение описаний нескольких токенов из CoinMarketCap одним запросом.
+    Возвращает строки project_metadata для всех запрошенных символов.
+    """
+
+    async with limited_request(
+        "coinmarketcap",
+        f"{COINMARKETCUP_API}info",
+        headers={"X-CMC_PRO_API_KEY": API_KEY, "Accept": "application/json"},
+        params={"symbol": ",".join(symbols), "skip_invalid": "true"},
+    ) as response:
+        response.raise_for_status()
+        data = (await response.json()).get("data") or {}
+
+    fetched_at = datetime.now()
+    rows = []
+    for symbol in symbols:
+        coin_info = data.get(symbol)
+        if isinstance(coin_info, list):
+            coin_info = coin_info[0] if coin_info else None
+
+        rows.append(normalize_coinmarketcap_info(symbol, coin_info, fetched_at))
+
+    return rows
+
+
+async def get_projects_metadata(symbols: list[str]) -> dict[str, dict]:
+    """
+    Возвращает описания токенов (название, описание, ссылки на твиттер, категории) по списку символов.
+    Описания читаются из базы; отсутствующие и устаревшие запрашиваются у CoinMarketCap пакетами
+    по CMC_INFO_BATCH_SIZE символов и сохраняются. Если запрос не удался, возвращается устаревшее описание.
+    """
+
+    symbols = list(dict.fromkeys(symbol.upper() for symbol in symbols))
+    metadata = await get_stored_projects_metadata(symbols)
+
+    now = datetime.now()
+    outdated = [symbol for symbol in symbols if is_metadata_outdated(metadata.get(symbol), now)]
+
+    for start in range(0, len(outdated), CMC_INFO_BATCH_SIZE):
+        batch = outdated[start : start + CMC_INFO_BATCH_SIZE]
+
+        try:
+            rows = await fetch_coinmarketcap_info_batch(batch)
+            await bulk_upsert_projects_metadata(rows)
+        except Exception as e:
+            logging.error(f"Ошибка при получении описаний токенов CoinMarketCap ({batch[0]}...{batch[-1]}): {e}")
+            continue
+
+        for row in rows:
+            metadata[row["symbol"]] = {**row, "fetched_at": row["fetched_at"].isoformat()}
+
+    return metadata
+
+
+@single_flight
+async def get_project_metadata(symbol: str) -> Optional[dict]:
+    """
+    Возвращает описание одного токена или None, если его нет в CoinMarketCap.
+    """
+
+    metadata = (await get_projects_metadata([symbol])).get(symbol.upper())
+    return metadata if metadata and metadata.get("name") else None
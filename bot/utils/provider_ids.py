@@ -0,0 +1,203 @@
+import time
+import asyncio
+import logging
+
+from typing import Optional
+
+from bot.utils.common.config import API_KEY, CRYPTORANK_API_KEY
+from bot.utils.common.rate_limiter import limited_request
+from bot.utils.common.json_stream import iter_json_array
+from bot.database.db_operations import bulk_upsert_provider_ids, get_provider_ids
+from bot.utils.common.consts import (
+    COINMARKETCUP_API,
+    COINGECKO_API,
+    CRYPTORANK_API_URL,
+    LLAMA_API_CHAINS,
+    PROVIDER_ID_SOURCES,
+    PROVIDER_IDS_RELOAD_INTERVAL,
+    CRYPTORANK_IDS_PAGE_SIZE,
+    CRYPTORANK_IDS_LIMIT,
+)
+
+# Справочник идентификаторов токенов: {сервис: {СИМВОЛ: идентификатор}}
+_provider_ids: dict[str, dict[str, str]] = {}
+_provider_ids_loaded_at = 0.0
+_provider_ids_lock = asyncio.Lock()
+
+
+async def load_provider_ids(force: bool = False):
+    """
+    Загружает справочник идентификаторов токенов из базы в память.
+    Без force справочник перечитывается не чаще, чем раз в PROVIDER_IDS_RELOAD_INTERVAL секунд.
+    """
+
+    global _provider_ids, _provider_ids_loaded_at
+
+    async with _provider_ids_lock:
+        if not force and time.monotonic() - _provider_ids_loaded_at < PROVIDER_IDS_RELOAD_INTERVAL:
+            return
+
+        _provider_ids_loaded_at = time.monotonic()
+
+        try:
+            rows = await get_provider_ids()
+        except Exception as e:
+            logging.error(f"Ошибка при загрузке справочника идентификаторов токенов: {e}")
+            return
+
+        provider_ids = {provider: {} for provider in PROVIDER_ID_SOURCES}
+        for provider, symbol, provider_id in rows:
+            provider_ids.setdefault(provider, {})[symbol] = provider_id
+
+        _provider_ids = provider_ids
+        logging.info(
+            "Справочник идентификаторов токенов загружен: "
+            + ", ".join(f"{provider} - {len(ids)}" for provider, ids in _provider_ids.items())
+        )
+
+
+async def get_provider_id(provider: str, symbol: str) -> Optional[str]:
+    """
+    Возвращает идентификатор токена в сервисе по символу (тикеру) или None, если его нет в справочнике.
+    """
+
+    await load_provider_ids()
+    return _provider_ids.get(provider, {}).get(symbol.upper())
+
+
+async def has_provider_ids(provider: str) -> bool:
+    """
+    Проверяет, загружены ли в справочник идентификаторы токенов сервиса.
+    """
+
+    await load_provider_ids()
+    return bool(_provider_ids.get(provider))
+
+
+async def remember_provider_id(provider: str, symbol: str, provider_id: str):
+    """
+    Добавляет в справочник идентификатор, найденный запросом к сервису.
+    """
+
+    _provider_ids.setdefault(provider, {})[symbol.upper()] = provider_id
+
+    try:
+        await bulk_upsert_provider_ids(provider, {symbol.upper(): provider_id})
+    except Exception as e:
+        logging.error(f"Ошибка при сохранении идентификатора {provider} для {symbol}: {e}")
+
+
+async def fetch_coinmarketcap_slugs() -> dict[str, str]:
+    """
+    Загружает slug всех активных токенов CoinMarketCap.
+    При повторе символа остаётся токен с лучшим рейтингом.
+    """
+
+    async with limited_request(
+        "coinmarketcap",
+        f"{COINMARKETCUP_API}map",
+        headers={"X-CMC_PRO_API_KEY": API_KEY, "Accept": "application/json"},
+        params={"listing_status": "active", "sort": "cmc_rank"},
+    ) as response:
+        response.raise_for_status()
+        data = await response.json()
+
+    slugs = {}
+    for item in data.get("data", []):
+        if item.get("symbol") and item.get("slug"):
+            slugs.setdefault(item["symbol"].upper(), item["slug"])
+
+    return slugs
+
+
+async def fetch_coingecko_ids() -> dict[str, str]:
+    """
+    Загружает ID всех токенов CoinGecko.
+    При повторе символа остаётся первый токен из списка, как и при поиске по полному списку.
+    """
+
+    ids = {}
+
+    async with limited_request("coingecko", f"{COINGECKO_API}list") as response:
+        response.raise_for_status()
+        async for token in iter_json_array(response, fields=("id", "symbol")):
+            if token.get("symbol") and token.get("id"):
+                ids.setdefault(token["symbol"].upper(), token["id"])
+
+    return ids
+
+
+async def fetch_cryptorank_keys() -> dict[str, str]:
+    """
+    Загружает ключи токенов CryptoRank постранично, но не больше CRYPTORANK_IDS_LIMIT токенов.
+    """
+
+    headers = {"X-Api-Key": CRYPTORANK_API_KEY, "Accept": "application/json"}
+    keys = {}
+
+    for skip in range(0, CRYPTORANK_IDS_LIMIT, CRYPTORANK_IDS_PAGE_SIZE):
+        params = {"limit": CRYPTORANK_IDS_PAGE_SIZE, "skip": skip}
+        async with limited_request("cryptorank", CRYPTORANK_API_URL, params=params, headers=headers) as response:
+            response.raise_for_status()
+            page = (await response.json(content_type=None)).get("data") or []
+
+        for item in page:
+            if item.get("symbol") and item.get("key"):
+                keys.setdefault(item["symbol"].upper(), item["key"])
+
+        if len(page) < CRYPTORANK_IDS_PAGE_SIZE:
+            break
+
+    return keys
+
+
+async def fetch_defillama_slugs() -> dict[str, str]:
+    """
+    Загружает названия блокчейнов DefiLlama (используются в запросах TVL) по символу их токена.
+    """
+
+    async with limited_request("defillama", LLAMA_API_CHAINS) as response:
+        response.raise_for_status()
+        chains = await response.json(content_type=None)
+
+    slugs = {}
+    for chain in sorted(chains, key=lambda chain: chain.get("tvl") or 0, reverse=True):
+        if chain.get("tokenSymbol") and chain.get("name"):
+            slugs.setdefault(chain["tokenSymbol"].upper(), chain["name"].lower())
+
+    return slugs
+
+
+async def refresh_provider_ids():
+    """
+    Еженедельное обновление справочника идентификаторов токенов: списки всех сервисов загружаются
+    целиком и записываются в базу, после чего справочник перечитывается.
+    У CoinCarp нет открытого списка токенов, его адреса страниц совпадают со slug CoinMarketCap.
+    """
+
+    fetchers = {
+        "coinmarketcap": fetch_coinmarketcap_slugs,
+        "coingecko": fetch_coingecko_ids,
+        "cryptorank": fetch_cryptorank_keys,
+        "defillama": fetch_defillama_slugs,
+    }
+    results = await asyncio.gather(*(fetch() for fetch in fetchers.values()), return_exceptions=True)
+
+    provider_ids = {}
+    for provider, result in zip(fetchers, results):
+        if isinstance(result, Exception):
+            logging.error(f"Ошибка при загрузке идентификаторов токенов {provider}: {result}")
+        elif result:
+            provider_ids[provider] = result
+
+    if "coinmarketcap" in provider_ids:
+        provider_ids["coincarp"] = provider_ids["coinmarketcap"]
+
+    for provider, ids in provider_ids.items():
+        try:
+            count = await bulk_upsert_provider_ids(provider, ids)
+            logging.info(f"Справочник идентификаторов {provider} обновлён: {count} токенов")
+        except Exception as e:
+            logging.error(f"Ошибка при сохранении идентификаторов токенов {provider}: {e}")
+
+    await load_provider_ids(force=True)
@@ -1,50 +1,292 @@
 import re
-import requests
+import time
+import asyncio
+import hashlib
+import logging
 
+from typing import Optional
+from dataclasses import dataclass
+
+from bot.utils.common.redis_lock import acquire_lock
+from bot.utils.common.sessions import get_http_client, redis_client
 from bot.utils.common.consts import (
     DOCUMENT_GARBAGE_LIST_URL,
-    PATTERN_FOR_GARBAGE_LIST_WITHOUT_END_TITLE,
-    PATTERN_FOR_GARBAGE_LIST_WITH_END_TITLE,
+    REFERENCE_LIST_SECTIONS,
+    REFERENCE_LISTS_REFRESH_INTERVAL,
+    REFERENCE_LISTS_RETRY_INTERVAL,
+    REFERENCE_LISTS_REDIS_PREFIX,
+    REFERENCE_LISTS_VERSION_KEY,
+    REFERENCE_LISTS_CHANNEL,
+    REFERENCE_LISTS_REFRESHER_LOCK,
+    REFERENCE_LISTS_REDIS_TTL,
 )
 
 
-def load_document_for_garbage_list(start_title: str = None, end_title: str = None):
+@dataclass(frozen=True)
+class ReferenceLists:
     """
-    Загружает список мусорных категорий, стейблкоинов и т.д., в зависимости от передающихся заголовков.
+    Неизменяемый снимок справочных списков: мусорные категории, фундаментальные токены, стейблкоины и скам-токены.
+    Поле version содержит хэш текста документа, из которого был получен снимок.
     """
 
-    try:
-        # Получение содержимого документа в текстовом формате
-        response = requests.get(DOCUMENT_GARBAGE_LIST_URL)
+    garbage_categories: frozenset = frozenset()
+    fundamental: frozenset = frozenset()
+    stablecoins: frozenset = frozenset()
+    scam_tokens: frozenset = frozenset()
+    version: Optional[str] = None
+
+    def is_garbage_category(self, category: str) -> bool:
+        """
+        Проверяет, относится ли категория к мусорному списку.
+        """
+
+        return category in self.garbage_categories
+
+    def is_excluded_token(self, symbol: str) -> bool:
+        """
+        Проверяет, исключается ли токен из анализа (стейблкоин, фундаментальный или скам-токен).
+        """
+
+        return symbol in self.stablecoins or symbol in self.fundamental or symbol in self.scam_tokens
+
+
+_reference_lists = ReferenceLists()
+_reference_lists_etag: Optional[str] = None
+_reference_lists_last_attempt = 0.0
+_reference_lists_lock = asyncio.Lock()
+
+
+async def fetch_google_document(url: str, etag: Optional[str] = None) -> tuple[Optional[str], Optional[str]]:
+    """
+    Загружает документ Google в текстовом формате.
+    Если передан etag и документ не изменился, возвращает (None, etag).
+    """
+
+    headers = {"If-None-Match": etag} if etag else {}
+
+    async with get_http_client("google").get(url, headers=headers) as response:
+        if response.status == 304:
+            return None, etag
+
         response.raise_for_status()
+        return await response.text(), response.headers.get("ETag")
+
+
+def parse_reference_lists(full_text: str, version: Optional[str] = None) -> ReferenceLists:
+    """
+    Разбирает текст документа за один проход: каждый раздел длится от своего заголовка до следующего.
+    """
+
+    titles_pattern = "|".join(re.escape(title) for title in REFERENCE_LIST_SECTIONS)
+    matches = list(re.finditer(titles_pattern, full_text))
+    sections = {}
+
+    for index, match in enumerate(matches):
+        field_name = REFERENCE_LIST_SECTIONS[match.group(0)]
+        if field_name in sections:
+            continue
+
+        end = matches[index + 1].start() if index + 1 < len(matches) else len(full_text)
+        extracted_text = full_text[match.end() : end]
+        sections[field_name] = frozenset(line.strip() for line in extracted_text.split("\n") if line.strip())
 
-        # Извлечение текста документа
-        full_text = response.text
+    missing_sections = set(REFERENCE_LIST_SECTIONS.values()) - set(sections)
+    if missing_sections:
+        logging.warning(f"В документе не найдены разделы: {', '.join(sorted(missing_sections))}")
 
-        # Формирование регулярного выражения для извлечения текста между заголовками
-        pattern = PATTERN_FOR_GARBAGE_LIST_WITHOUT_END_TITLE.format(start_title=re.escape(start_title))
-        if end_title:
-            pattern = PATTERN_FOR_GARBAGE_LIST_WITH_END_TITLE.format(
-                start_title=re.escape(start_title),
-                end_title=re.escape(end_title),
+    return ReferenceLists(**sections, version=version)
+
+
+async def refresh_reference_lists() -> ReferenceLists:
+    """
+    Обновляет справочные списки.
+    Документ запрашивается условно (по ETag), а разбор выполняется только при изменении хэша содержимого.
+    При ошибке загрузки сохраняется последний успешно загруженный снимок.
+    """
+
+    global _reference_lists, _reference_lists_etag, _reference_lists_last_attempt
+
+    async with _reference_lists_lock:
+        _reference_lists_last_attempt = time.monotonic()
+
+        try:
+            full_text, etag = await fetch_google_document(DOCUMENT_GARBAGE_LIST_URL, _reference_lists_etag)
+        except Exception as e:
+            logging.error(f"Ошибка при загрузке документа со справочными списками: {e}")
+            return _reference_lists
+
+        if full_text is None:
+            return _reference_lists
+
+        version = hashlib.sha256(full_text.encode("utf-8")).hexdigest()
+        _reference_lists_etag = etag
+
+        if version != _reference_lists.version:
+            _reference_lists = parse_reference_lists(full_text, version)
+            logging.info(
+                f"Справочные списки обновлены (версия {version[:12]}): "
+                f"категорий - {len(_reference_lists.garbage_categories)}, "
+                f"фундаментальных - {len(_reference_lists.fundamental)}, "
+                f"стейблкоинов - {len(_reference_lists.stablecoins)}, "
+                f"скам-токенов - {len(_reference_lists.scam_tokens)}"
             )
 
-        match = re.search(pattern, full_text, re.DOTALL)
+        return _reference_lists
 
-        if not match:
-            print("Не удалось найти текст между заголовками.")
-            return []
 
-        extracted_text = match.group(1).strip()
+def reference_list_key(version: str, field_name: str) -> str:
+    """
+    Формирует ключ Redis для множества справочного списка определённой версии.
+    """
+
+    return f"{REFERENCE_LISTS_REDIS_PREFIX}:{version}:{field_name}"
+
+
+async def publish_reference_lists(reference_lists: ReferenceLists):
+    """
+    Публикует снимок справочных списков в Redis в виде версионированных множеств
+    и оповещает остальные реплики о новой версии.
+    """
+
+    async with redis_client.pipeline(transaction=True) as pipe:
+        for field_name in REFERENCE_LIST_SECTIONS.values():
+            key = reference_list_key(reference_lists.version, field_name)
+            members = getattr(reference_lists, field_name)
+            pipe.delete(key)
+            if members:
+                pipe.sadd(key, *members)
+                pipe.expire(key, REFERENCE_LISTS_REDIS_TTL)
+
+        pipe.set(REFERENCE_LISTS_VERSION_KEY, reference_lists.version, ex=REFERENCE_LISTS_REDIS_TTL)
+        pipe.publish(REFERENCE_LISTS_CHANNEL, reference_lists.version)
+        await pipe.execute()
 
-        # Формирование списка категорий (по строкам)
-        categories = [line.strip() for line in extracted_text.split("\n") if line.strip()]
-        print(categories)
-        return categories
+    logging.info(f"Справочные списки версии {reference_lists.version[:12]} опубликованы в Redis")
 
-    except requests.RequestException as e:
-        print(f"Ошибка при загрузке документа: {e}")
-        return []
+
+async def prolong_reference_lists(version: str):
+    """
+    Продлевает время жизни уже опубликованной версии справочных списков.
+    """
+
+    async with redis_client.pipeline(transaction=True) as pipe:
+        for field_name in REFERENCE_LIST_SECTIONS.values():
+            pipe.expire(reference_list_key(version, field_name), REFERENCE_LISTS_REDIS_TTL)
+        pipe.expire(REFERENCE_LISTS_VERSION_KEY, REFERENCE_LISTS_REDIS_TTL)
+        await pipe.execute()
+
+
+async def load_reference_lists_from_redis(version: Optional[str] = None) -> Optional[ReferenceLists]:
+    """
+    Загружает опубликованную версию справочных списков из Redis.
+    Возвращает None, если версия не опубликована или Redis недоступен.
+    """
+
+    global _reference_lists
+
+    try:
+        version = version or await redis_client.get(REFERENCE_LISTS_VERSION_KEY)
+        if not version:
+            return None
+
+        if version == _reference_lists.version:
+            return _reference_lists
+
+        field_names = list(REFERENCE_LIST_SECTIONS.values())
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for field_name in field_names:
+                pipe.smembers(reference_list_key(version, field_name))
+            members = await pipe.execute()
+    except Exception as e:
+        logging.error(f"Ошибка при загрузке справочных списков из Redis: {e}")
+        return None
+
+    _reference_lists = ReferenceLists(
+        **{field_name: frozenset(values) for field_name, values in zip(field_names, members)},
+        version=version,
+    )
+    logging.info(f"Справочные списки версии {version[:12]} загружены из Redis")
+
+    return _reference_lists
+
+
+async def refresh_and_publish_reference_lists():
+    """
+    Обновление справочных списков выбранной репликой (держателем блокировки):
+    загружает документ и публикует новую версию в Redis, если она изменилась.
+    """
+
+    reference_lists = await refresh_reference_lists()
+    if not reference_lists.version:
+        return
+
+    try:
+        published_version = await redis_client.get(REFERENCE_LISTS_VERSION_KEY)
+        if published_version != reference_lists.version:
+            await publish_reference_lists(reference_lists)
+        else:
+            await prolong_reference_lists(reference_lists.version)
     except Exception as e:
-        print(f"Ошибка обработки документа: {e}")
-        return []
+        logging.error(f"Ошибка при публикации справочных списков в Redis: {e}")
+
+
+async def get_reference_lists() -> ReferenceLists:
+    """
+    Возвращает текущий снимок справочных списков.
+    Сеть используется только если списки ещё ни разу не были загружены.
+    """
+
+    if _reference_lists.version is None and (
+        not _reference_lists_last_attempt
+        or time.monotonic() - _reference_lists_last_attempt >= REFERENCE_LISTS_RETRY_INTERVAL
+    ):
+        if not await load_reference_lists_from_redis():
+            await refresh_reference_lists()
+
+    return _reference_lists
+
+
+async def periodically_refresh_reference_lists():
+    """
+    Фоновая задача обновления справочных списков.
+    Документ загружает только реплика, удерживающая блокировку обновления, остальные берут
+    опубликованную версию из Redis. Если в Redis ничего нет, реплика загружает документ сама.
+    """
+
+    while True:
+        try:
+            if await acquire_lock(REFERENCE_LISTS_REFRESHER_LOCK, ttl=REFERENCE_LISTS_REFRESH_INTERVAL * 2):
+                await refresh_and_publish_reference_lists()
+            elif not await load_reference_lists_from_redis():
+                await refresh_reference_lists()
+        except Exception as e:
+            logging.error(f"Ошибка при обновлении справочных списков: {e}")
+
+        await asyncio.sleep(REFERENCE_LISTS_REFRESH_INTERVAL)
+
+
+async def listen_reference_lists_updates():
+    """
+    Фоновая задача подписки на уведомления о новой версии справочных списков.
+    При получении новой версии локальная копия заменяется версией из Redis.
+    """
+
+    while True:
+        try:
+            pubsub = redis_client.pubsub()
+            await pubsub.subscribe(REFERENCE_LISTS_CHANNEL)
+
+            async for message in pubsub.listen():
+                if message.get("type") != "message":
+                    continue
+
+                version = message.get("data")
+                if version and version != _reference_lists.version:
+                    await load_reference_lists_from_redis(version)
+
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logging.error(f"Ошибка подписки на обновления справочных списков: {e}")
+
+        await asyncio.sleep(REFERENCE_LISTS_RETRY_INTERVAL)
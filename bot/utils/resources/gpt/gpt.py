@@ -1,11 +1,22 @@
 import re
+import time
+import asyncio
+import hashlib
 import logging
-import requests
 
+from typing import Optional
 from langchain_openai import ChatOpenAI
 
 from bot.utils.common.config import GPT_SECRET_KEY_FASOLKAAI
-from bot.utils.common.consts import DOCUMENT_URL, GPT_MODEL, TEMPERATURE
+from bot.utils.common.rate_limiter import run_limited
+from bot.utils.resources.files_worker.google_doc import fetch_google_document
+from bot.utils.common.consts import (
+    DOCUMENT_URL,
+    GPT_MODEL,
+    TEMPERATURE,
+    PROMPTS_REFRESH_INTERVAL,
+    PROMPTS_RETRY_INTERVAL,
+)
 from bot.utils.resources.gpt.gpt_promts import (
     user_prompt_for_tier_agent,
     user_prompt_for_funds_agent,
@@ -13,91 +24,151 @@ from bot.utils.resources.gpt.gpt_promts import (
     user_prompt_for_flags_agent,
     user_prompt_for_description_agent,
 )
-from bot.utils.resources.gpt.titles_for_promts import (
-    start_title_for_tier_agent,
-    end_title_for_tier_agent,
-    start_title_for_flags_agent,
-    start_title_for_funds_agent,
-    end_title_for_funds_agent,
-    end_title_for_flags_agent,
-    end_title_for_project_rating_agent,
-    start_title_for_project_rating_agent,
-    end_title_for_description_agent,
-    start_title_for_description_agent,
-)
+from bot.utils.resources.gpt.titles_for_promts import prompt_sections
+
+PROMPT_NOT_FOUND_TEXT = "Текст не найден"
+PROMPT_LOADING_ERROR_TEXT = "Ошибка загрузки текста"
 
+_prompts: dict[str, str] = {}
+_prompts_version: Optional[str] = None
+_prompts_etag: Optional[str] = None
+_prompts_last_attempt = 0.0
+_prompts_lock = asyncio.Lock()
 
-def load_document(start_title: str, end_title: str) -> str:
+
+def extract_prompt_section(full_text: str, start_title: str, end_title: str) -> str:
     """
-    Загружает текст из документа Google и извлекает текст между указанными заголовками.
+    Извлекает из текста документа текст между указанными заголовками.
     """
 
-    try:
-        response = requests.get(DOCUMENT_URL)
-        response.raise_for_status()
+    # Формирование регулярного выражения для извлечения текста между началом и концом
+    pattern = rf"{re.escape(start_title)}(.*?)(?=\n{re.escape(end_title)})"
+    match = re.search(pattern, full_text, re.DOTALL)
 
-        # Извлечение текста документа
-        full_text = response.text
+    return match.group(1).strip() if match else PROMPT_NOT_FOUND_TEXT
 
-        # Формирование регулярного выражения для извлечения текста между началом и концом
-        pattern = rf"{re.escape(start_title)}(.*?)(?=\n{re.escape(end_title)})"
-        match = re.search(pattern, full_text, re.DOTALL)
 
-        extracted_text = match.group(1).strip() if match else "Текст не найден"
+async def refresh_prompts() -> Optional[str]:
+    """
+    Загружает документ с промтами и заранее разбивает его на разделы всех агентов.
+    Документ запрашивается условно (по ETag), разбор выполняется только при изменении хэша содержимого.
+    При ошибке загрузки сохраняются последние успешно загруженные промты.
+    Возвращает текущую версию промтов.
+    """
 
-        return extracted_text
+    global _prompts, _prompts_version, _prompts_etag, _prompts_last_attempt
 
-    except Exception as e:
-        logging.error(f"Ошибка при загрузке документа: {e}")
-        return "Ошибка загрузки текста"
+    async with _prompts_lock:
+        _prompts_last_attempt = time.monotonic()
+
+        try:
+            full_text, etag = await fetch_google_document(DOCUMENT_URL, _prompts_etag)
+        except Exception as e:
+            logging.error(f"Ошибка при загрузке документа: {e}")
+            return _prompts_version
+
+        if full_text is None:
+            return _prompts_version
+
+        version = hashlib.sha256(full_text.encode("utf-8")).hexdigest()
+        _prompts_etag = etag
+
+        if version != _prompts_version:
+            _prompts = {
+                agent_type: extract_prompt_section(full_text, start_title, end_title)
+                for agent_type, (start_title, end_title) in prompt_sections.items()
+            }
+            _prompts_version = version
+
+            missing_prompts = [agent_type for agent_type, text in _prompts.items() if text == PROMPT_NOT_FOUND_TEXT]
+            if missing_prompts:
+                logging.warning(f"В документе не найдены промты агентов: {', '.join(missing_prompts)}")
+
+            logging.info(f"Промты агентов обновлены (версия {version[:12]})")
+
+        return _prompts_version
+
+
+def get_prompts_version() -> Optional[str]:
+    """
+    Возвращает версию (хэш) загруженного документа с промтами.
+    Используется как часть ключа для кэширования ответов модели.
+    """
+
+    return _prompts_version
 
 
-def load_document_for_description_agent() -> str:
+async def get_prompt(agent_type: str) -> str:
     """
-    Загружает текст из документа Google и извлекает текст для промта агента определения категории проекта.
+    Возвращает системный промт агента из памяти.
+    Сеть используется только если промты ещё ни разу не были загружены.
     """
 
-    return load_document(start_title_for_description_agent, end_title_for_description_agent)
+    if _prompts_version is None and (
+        not _prompts_last_attempt or time.monotonic() - _prompts_last_attempt >= PROMPTS_RETRY_INTERVAL
+    ):
+        await refresh_prompts()
+
+    if _prompts_version is None:
+        return PROMPT_LOADING_ERROR_TEXT
+
+    return _prompts.get(agent_type, PROMPT_NOT_FOUND_TEXT)
 
 
-def load_document_for_tier_agent() -> str:
+async def periodically_refresh_prompts():
     """
-    Загружает текст из документа Google и извлекает текст для промта агента определения тира проекта.
+    Фоновая задача обновления промтов агентов.
     """
 
-    return load_document(start_title_for_tier_agent, end_title_for_tier_agent)
+    while True:
+        await refresh_prompts()
+        await asyncio.sleep(PROMPTS_REFRESH_INTERVAL)
 
 
-def load_document_for_funds_agent() -> str:
+async def load_document_for_description_agent() -> str:
     """
-    Загружает текст из документа Google и извлекает текст для промта агента определения профита инвесторов.
+    Возвращает текст промта агента определения категории проекта.
     """
 
-    return load_document(start_title_for_funds_agent, end_title_for_funds_agent)
+    return await get_prompt("description")
 
 
-def load_document_for_project_rating_agent() -> str:
+async def load_document_for_tier_agent() -> str:
     """
-    Загружает текст из документа Google и извлекает текст для промта агента определения оценки проекта.
+    Возвращает текст промта агента определения тира проекта.
     """
 
-    return load_document(
-        start_title_for_project_rating_agent,
-        end_title_for_project_rating_agent,
-    )
+    return await get_prompt("tier_agent")
 
 
-def load_document_for_flags_agent() -> str:
+async def load_document_for_funds_agent() -> str:
     """
-    Загружает текст из документа Google и извлекает текст для промта агента определения ред/грин флагов проекта.
+    Возвращает текст промта агента определения профита инвесторов.
     """
 
-    return load_document(start_title_for_flags_agent, end_title_for_flags_agent)
+    return await get_prompt("funds_agent")
+
+
+async def load_document_for_project_rating_agent() -> str:
+    """
+    Возвращает текст промта агента определения оценки проекта.
+    """
+
+    return await get_prompt("rating")
+
+
+async def load_document_for_flags_agent() -> str:
+    """
+    Возвращает текст промта агента определения ред/грин флагов проекта.
+    """
+
+    return await get_prompt("flags")
 
 
 async def create_agent_response(system_content: str, user_prompt: str) -> str:
     """
     Создает ответ от агента на основе системного сообщения и пользовательского запроса.
+    Запрос выполняется в рамках квоты OpenAI, при отказе по лимиту повторяется после паузы.
     """
 
     llm = ChatOpenAI(
@@ -105,12 +176,11 @@ async def create_agent_response(system_content: str, user_prompt: str) -> str:
         model=GPT_MODEL,
         temperature=TEMPERATURE,
     )
-    response = llm.invoke(
-        [
-            {"role": "system", "content": system_content},
-            {"role": "user", "content": user_prompt},
-        ]
-    )
+    messages = [
+        {"role": "system", "content": system_content},
+        {"role": "user", "content": user_prompt},
+    ]
+    response = await run_limited("openai", lambda: llm.ainvoke(messages))
 
     return response.content
 
@@ -120,7 +190,7 @@ async def description_agent(topic: str, language: str):
     Обработчик агента определения категории проекта.
     """
 
-    system = load_document_for_description_agent()
+    system = await load_document_for_description_agent()
     user_prompt = user_prompt_for_description_agent.format(language=language, topic=topic)
 
     return await create_agent_response(system, user_prompt)
@@ -131,7 +201,7 @@ async def tier_agent(topic: str):
     Обработчик агента определения тира проекта.
     """
 
-    system = load_document_for_tier_agent()
+    system = await load_document_for_tier_agent()
     user_prompt = user_prompt_for_tier_agent.format(topic=topic)
     return await create_agent_response(system, user_prompt)
 
@@ -141,7 +211,7 @@ async def funds_agent(topic: str):
     Обработчик агента определения процента токенов которые относятся инвесторам.
     """
 
-    system = load_document_for_funds_agent()
+    system = await load_document_for_funds_agent()
     user_prompt = user_prompt_for_funds_agent.format(topic=topic)
     return await create_agent_response(system, user_prompt)
 
@@ -151,7 +221,7 @@ async def project_rating_agent(topic: str):
     Обработчик агента определения общего рейтинга проекта.
     """
 
-    system = load_document_for_project_rating_agent()
+    system = await load_document_for_project_rating_agent()
     user_prompt = user_prompt_for_project_rating_agent.format(topic=topic)
     return await create_agent_response(system, user_prompt)
 
@@ -161,7 +231,7 @@ async def flags_agent(topic: str, language: str):
     Обработчик агента определения ред/грин флагов проекта.
     """
 
-    system = load_document_for_flags_agent()
+    system = await load_document_for_flags_agent()
     user_prompt = user_prompt_for_flags_agent.format(language=language, topic=topic)
     return await create_agent_response(system, user_prompt)
 
@@ -12,3 +12,12 @@ end_title_for_project_rating_agent = "6. Агент ред флаги и гри
 
 start_title_for_flags_agent = "7. Новый промт агента ред флаги и грин флаги"
 end_title_for_flags_agent = "Примечание, весы (не обращай внимание):"
+
+# Заголовки разделов документа с промтами для каждого типа агента
+prompt_sections = {
+    "description": (start_title_for_description_agent, end_title_for_description_agent),
+    "tier_agent": (start_title_for_tier_agent, end_title_for_tier_agent),
+    "funds_agent": (start_title_for_funds_agent, end_title_for_funds_agent),
+    "rating": (start_title_for_project_rating_agent, end_title_for_project_rating_agent),
+    "flags": (start_title_for_flags_agent, end_title_for_flags_agent),
+}
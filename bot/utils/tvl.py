@@ -0,0 +1,103 @@
+import time
+import logging
+
+from typing import Optional
+
+from bot.utils.common.rate_limiter import limited_request
+from bot.utils.common.single_flight import single_flight
+from bot.utils.common.json_stream import iter_json_array
+from bot.utils.common.consts import (
+    LLAMA_API_CHAINS,
+    LLAMA_API_PROTOCOLS,
+    TVL_SNAPSHOT_TTL,
+)
+
+# Текущие TVL DefiLlama: {название блокчейна: TVL} и {slug протокола: TVL стейкинга}
+_chains_tvl: dict[str, float] = {}
+_chains_tvl_loaded_at = 0.0
+_staking_tvl: dict[str, float] = {}
+_staking_tvl_loaded_at = 0.0
+
+
+@single_flight
+async def get_chains_tvl() -> dict[str, float]:
+    """
+    Возвращает текущий TVL всех блокчейнов одним запросом к DefiLlama (v2/chains).
+    Блокчейн доступен по названию и по ID CoinGecko в нижнем регистре. Список обновляется раз в TVL_SNAPSHOT_TTL
+    секунд; если обновить его не удалось, используется предыдущий.
+    """
+
+    global _chains_tvl, _chains_tvl_loaded_at
+
+    if _chains_tvl and time.monotonic() - _chains_tvl_loaded_at < TVL_SNAPSHOT_TTL:
+        return _chains_tvl
+
+    chains_tvl = {}
+    try:
+        async with limited_request("defillama", LLAMA_API_CHAINS) as response:
+            response.raise_for_status()
+            async for chain in iter_json_array(response, fields=("name", "gecko_id", "tvl")):
+                if chain.get("tvl") is None:
+                    continue
+                for name in (chain.get("name"), chain.get("gecko_id")):
+                    if name:
+                        chains_tvl.setdefault(name.lower(), float(chain["tvl"]))
+    except Exception as e:
+        if not _chains_tvl:
+            raise
+        logging.error(f"Ошибка при обновлении TVL блокчейнов DefiLlama, используются прежние данные: {e}")
+        return _chains_tvl
+
+    _chains_tvl, _chains_tvl_loaded_at = chains_tvl, time.monotonic()
+    return _chains_tvl
+
+
+@single_flight
+async def get_staking_tvl() -> dict[str, float]:
+    """
+    Возвращает TVL токенов в стейкинге для всех протоколов одним запросом к DefiLlama (protocols)
+    вместо загрузки полной истории каждого протокола. Протокол доступен по slug и по названию в нижнем регистре.
+    Список обновляется раз в TVL_SNAPSHOT_TTL секунд; если обновить его не удалось, используется предыдущий.
+    """
+
+    global _staking_tvl, _staking_tvl_loaded_at
+
+    if _staking_tvl and time.monotonic() - _staking_tvl_loaded_at < TVL_SNAPSHOT_TTL:
+        return _staking_tvl
+
+    staking_tvl = {}
+    try:
+        async with limited_request("defillama", LLAMA_API_PROTOCOLS) as response:
+            response.raise_for_status()
+            async for protocol in iter_json_array(response, fields=("slug", "name", "chainTvls")):
+                chain_tvls = protocol.get("chainTvls") or {}
+                for name in (protocol.get("slug"), protocol.get("name")):
+                    if not name:
+                        continue
+                    name = name.lower()
+                    for key in ("staking", f"{name}-staking"):
+                        if key in chain_tvls:
+                            staking_tvl.setdefault(name, float(chain_tvls[key]))
+                            break
+    except Exception as e:
+        if not _staking_tvl:
+            raise
+        logging.error(f"Ошибка при обновлении TVL стейкинга DefiLlama, используются прежние данные: {e}")
+        return _staking_tvl
+
+    _staking_tvl, _staking_tvl_loaded_at = staking_tvl, time.monotonic()
+    return _staking_tvl
+
+
+async def get_current_tvl(name: str) -> Optional[float]:
+    """
+    Возвращает текущий TVL блокчейна, или токенов в стейкинге, если блокчейна с таким названием нет.
+    """
+
+    name = name.lower()
+
+    tvl = (await get_chains_tvl()).get(name)
+    if tvl is None:
+        tvl = (await get_staking_tvl()).get(name)
+
+    return tvl
@@ -6,7 +6,7 @@ from typing import Any, Optional, Callable
 from aiogram.fsm.context import FSMContext
 
 from bot.utils.common.sessions import redis_client
-from bot.utils.resources.files_worker.google_doc import load_document_for_garbage_list
+from bot.utils.resources.files_worker.google_doc import get_reference_lists
 from bot.utils.resources.bot_phrases.bot_phrase_handler import phrase_by_user, phrase_by_language
 from bot.utils.common.consts import (
     OVERALL_PROJECT_CATEGORY_PATTERN,
@@ -23,11 +23,6 @@ from bot.utils.common.consts import (
     NO_DATA_TEXT,
     CATEGORY_MAP,
     MAX_MESSAGE_LENGTH,
-    START_TITLE_FOR_STABLECOINS,
-    END_TITLE_FOR_STABLECOINS,
-    START_TITLE_FOR_SCAM_TOKENS,
-    START_TITLE_FOR_FUNDAMENTAL,
-    END_TITLE_FOR_FUNDAMENTAL,
     POSITIVE_PATTERN_EN,
     NEGATIVE_PATTERN_EN,
 )
@@ -45,9 +40,7 @@ async def validate_user_input(user_coin_name: str, message: types.Message, state
     """
 
     user_coin_name = user_coin_name.upper().replace(" ", "")
-    stablecoins = load_document_for_garbage_list(START_TITLE_FOR_STABLECOINS, END_TITLE_FOR_STABLECOINS)
-    scam_tokens = load_document_for_garbage_list(START_TITLE_FOR_SCAM_TOKENS)
-    fundamental_tokens = load_document_for_garbage_list(START_TITLE_FOR_FUNDAMENTAL, END_TITLE_FOR_FUNDAMENTAL)
+    reference_lists = await get_reference_lists()
 
     # Проверка на команду выхода
     if user_coin_name.lower() == "/exit":
@@ -55,15 +48,15 @@ async def validate_user_input(user_coin_name: str, message: types.Message, state
         return await phrase_by_user("calculations_end", message.from_user.id)
 
     # Проверка на стейблкоин
-    if user_coin_name in stablecoins:
+    if user_coin_name in reference_lists.stablecoins:
         return await phrase_by_user("stablecoins_answer", message.from_user.id)
 
     # Проверка на фундаментальный токен
-    if user_coin_name in fundamental_tokens:
+    if user_coin_name in reference_lists.fundamental:
         return await phrase_by_user("fundamental_tokens_answer", message.from_user.id)
 
     # Проверка на скам-токен
-    if user_coin_name in scam_tokens:
+    if user_coin_name in reference_lists.scam_tokens:
         return await phrase_by_user("scam_tokens_answer", message.from_user.id)
 
     return False